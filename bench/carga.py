@@ -0,0 +1,332 @@
+# bench/carga.py
+# Prueba de carga: miles de candidatos virtuales haciendo el examen a la vez sobre
+# un banco compartido, con hilos, procesos o asyncio.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Permitir 'python bench/carga.py' además de 'python -m bench.carga'
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from rich.console import Console
+from rich.table import Table
+
+from core import parser, exportador, registro_parser, sesion as sesion_examen
+from core.servidor import percentiles
+from bench import generador
+from bench.ejecutar import silencio
+
+console = Console()
+
+MODOS_CARGA = ('hilos', 'procesos', 'asyncio')
+FORMATOS_EXPORTACION = ('ninguno', 'txt', 'pdf', 'filas')
+FASES = ('responder', 'acumular', 'finalizar', 'exportar') # Calificar, guardar resultados, cerrar y exportar
+INTERVALO_MEMORIA = 1000 # Sesiones entre muestras de memoria
+VERSION_RESULTADOS = 1
+
+
+def memoria_rss():
+    """Memoria residente del proceso en bytes (/proc en Linux; si no, el pico de getrusage; 0 en Windows)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        try:
+            import resource # Solo POSIX
+        except ImportError:
+            return 0
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == 'darwin' else pico * 1024 # KB en Linux, bytes en macOS
+
+
+def elegir_respuesta(pregunta, acierto, aleatorio):
+    """La respuesta correcta con probabilidad 'acierto'; si no, una incorrecta con el mismo número de letras."""
+    if aleatorio.random() < acierto:
+        return list(pregunta.correctas)
+    letras = [chr(65 + i) for i in range(len(pregunta.opciones))]
+    k = len(pregunta.correctas) if pregunta.es_multiple else 1
+    correctas = sorted(pregunta.correctas)
+    for _ in range(8): # Con pocas opciones puede no existir una incorrecta válida
+        respuesta = sorted(aleatorio.sample(letras, k))
+        if respuesta != correctas:
+            return respuesta
+    return respuesta
+
+
+class Medidas:
+    """Duraciones (s) por fase, sesiones completadas y muestras de memoria; seguro entre hilos."""
+
+    def __init__(self):
+        self.fases = {fase: [] for fase in FASES}
+        self.sesiones = 0
+        self.respuestas = 0
+        self.aciertos = 0
+        self.memoria = [(0, memoria_rss())] # (sesiones completadas, bytes)
+        self.resultados = [] # Lo que la aplicación conserva de cada sesión terminada
+        self._cerrojo = threading.Lock()
+
+    def acumular(self, sesion):
+        """Guarda el resumen y las respuestas de la sesión, como hace la aplicación al terminar."""
+        inicio = time.perf_counter()
+        registro = (sesion.resumen(), sesion.resultados())
+        with self._cerrojo:
+            self.resultados.append(registro)
+        return time.perf_counter() - inicio
+
+    def anotar(self, tiempos, respuestas, aciertos):
+        with self._cerrojo:
+            for fase, valores in tiempos.items():
+                self.fases[fase].extend(valores)
+            self.sesiones += 1
+            self.respuestas += respuestas
+            self.aciertos += aciertos
+            if self.sesiones % INTERVALO_MEMORIA == 0:
+                self.memoria.append((self.sesiones, memoria_rss()))
+
+    def como_dict(self):
+        return {'fases': self.fases, 'sesiones': self.sesiones, 'respuestas': self.respuestas,
+                'aciertos': self.aciertos, 'memoria': self.memoria}
+
+
+def candidato(numero, preguntas, opciones, medidas, directorio):
+    """
+    Un candidato virtual, como generador: produce los segundos que 'piensa' antes de
+    cada respuesta (o la exportación, como función a ejecutar) y el conductor
+    (hilo o corrutina) decide cómo esperar. Anota los tiempos en 'medidas'.
+    """
+    aleatorio = random.Random(opciones['semilla'] * 1_000_003 + numero)
+    sesion = sesion_examen.SesionExamen(preguntas, candidato=f'candidato-{numero}',
+                                        num_preguntas=opciones['preguntas_por_sesion'], aleatorio=True,
+                                        semilla=aleatorio.random())
+    tiempos = {fase: [] for fase in FASES}
+    while not sesion.terminada:
+        if opciones['pensar'] > 0:
+            yield aleatorio.expovariate(1 / opciones['pensar'])
+        respuesta = elegir_respuesta(sesion.pregunta_actual(), opciones['acierto'], aleatorio)
+        inicio = time.perf_counter()
+        sesion.responder(respuesta)
+        tiempos['responder'].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    resumen = sesion.finalizar()
+    tiempos['finalizar'].append(time.perf_counter() - inicio)
+    tiempos['acumular'].append(medidas.acumular(sesion))
+
+    formato = opciones['exportar']
+    if formato != 'ninguno':
+        funcion = exportador.exportar_txt if formato == 'txt' else exportador.exportar_pdf
+        ruta = os.path.join(directorio, f"{sesion.candidato}.{formato}")
+
+        def exportar():
+            inicio = time.perf_counter()
+            if formato == 'filas': # Un archivo por hilo (y proceso) al que se añaden sus sesiones, sin competir
+                archivo = f"respuestas_{os.getpid()}_{threading.current_thread().name}.csv"
+                exportador.exportar_respuestas([sesion], os.path.join(directorio, archivo))
+            else:
+                funcion(sesion.resultados(), resumen['aciertos'], resumen['total'], ruta, sesion.acertadas)
+            tiempos['exportar'].append(time.perf_counter() - inicio)
+        yield exportar
+
+    medidas.anotar(tiempos, resumen['respondidas'], resumen['aciertos'])
+
+
+def _conducir_hilo(pasos):
+    for paso in pasos:
+        if callable(paso):
+            paso()
+        else:
+            time.sleep(paso)
+
+
+async def _conducir_corrutina(pasos, semaforo):
+    async with semaforo:
+        for paso in pasos:
+            if callable(paso):
+                await asyncio.to_thread(paso) # Exportar bloquea (disco, FPDF): fuera del bucle
+            else:
+                await asyncio.sleep(paso)
+
+
+def ejecutar_hilos(numeros, preguntas, opciones, medidas, directorio):
+    with ThreadPoolExecutor(max_workers=opciones['concurrencia'], thread_name_prefix='candidato') as hilos:
+        futuros = [hilos.submit(_conducir_hilo, candidato(n, preguntas, opciones, medidas, directorio))
+                   for n in numeros]
+        for futuro in futuros:
+            futuro.result() # Propagar errores de los candidatos
+
+
+def ejecutar_asyncio(numeros, preguntas, opciones, medidas, directorio):
+    async def principal():
+        semaforo = asyncio.Semaphore(opciones['concurrencia'])
+        await asyncio.gather(*(_conducir_corrutina(candidato(n, preguntas, opciones, medidas, directorio), semaforo)
+                               for n in numeros))
+    asyncio.run(principal())
+
+
+# Estado de cada proceso trabajador (modo 'procesos'): el banco se carga una vez por proceso
+_banco_proceso = None
+
+
+def _iniciar_proceso(ruta_banco):
+    global _banco_proceso
+    with silencio():
+        _banco_proceso = parser.cargar_preguntas(ruta_banco, registro=registro_parser.RegistroParser(nivel='ninguno'))
+
+
+def _lote_proceso(numeros, opciones, directorio):
+    medidas = Medidas()
+    ejecutar_hilos(numeros, _banco_proceso, opciones, medidas, directorio)
+    return medidas.como_dict()
+
+
+def ejecutar_procesos(numeros, ruta_banco, opciones, medidas, directorio):
+    """Reparte los candidatos entre procesos; cada uno los atiende con su parte de la concurrencia."""
+    num_procesos = min(opciones['procesos'], len(numeros)) or 1
+    por_proceso = dict(opciones, concurrencia=max(1, opciones['concurrencia'] // num_procesos))
+    lotes = [numeros[i::num_procesos] for i in range(num_procesos)]
+    with ProcessPoolExecutor(max_workers=num_procesos, initializer=_iniciar_proceso, initargs=(ruta_banco,)) as procesos:
+        parciales = list(procesos.map(_lote_proceso, lotes, [por_proceso] * num_procesos, [directorio] * num_procesos))
+    # Cada proceso conserva sus resultados: la memoria se suma muestra a muestra
+    medidas.memoria = [(0, sum(p['memoria'][0][1] for p in parciales))]
+    for k in range(1, min(len(p['memoria']) for p in parciales)):
+        medidas.memoria.append((sum(p['memoria'][k][0] for p in parciales), sum(p['memoria'][k][1] for p in parciales)))
+    for p in parciales:
+        for fase, valores in p['fases'].items():
+            medidas.fases[fase].extend(valores)
+        medidas.sesiones += p['sesiones']
+        medidas.respuestas += p['respuestas']
+        medidas.aciertos += p['aciertos']
+
+
+def crecimiento_memoria(muestras):
+    """MB por cada 1000 sesiones, por la pendiente entre la primera y la última muestra."""
+    if len(muestras) < 2 or muestras[-1][0] == muestras[0][0]:
+        return None
+    (s0, m0), (s1, m1) = muestras[0], muestras[-1]
+    return (m1 - m0) / (1024 * 1024) / (s1 - s0) * 1000
+
+
+def ejecutar(ruta_banco, opciones):
+    """Carga el banco, lanza los candidatos en el modo indicado y devuelve el informe (dict)."""
+    with silencio():
+        preguntas = parser.cargar_preguntas(ruta_banco, registro=registro_parser.RegistroParser(nivel='ninguno'))
+    if not preguntas:
+        raise ValueError(f"No se cargaron preguntas de '{ruta_banco}'.")
+
+    numeros = list(range(opciones['candidatos']))
+    medidas = Medidas()
+    with tempfile.TemporaryDirectory(prefix='examen-carga-') as directorio, silencio():
+        inicio = time.perf_counter()
+        if opciones['modo'] == 'hilos':
+            ejecutar_hilos(numeros, preguntas, opciones, medidas, directorio)
+        elif opciones['modo'] == 'asyncio':
+            ejecutar_asyncio(numeros, preguntas, opciones, medidas, directorio)
+        else:
+            ejecutar_procesos(numeros, ruta_banco, opciones, medidas, directorio)
+        duracion = time.perf_counter() - inicio
+
+    fases = {}
+    for fase, valores in medidas.fases.items():
+        if valores:
+            fases[fase] = {'muestras': len(valores), 'total_s': sum(valores), 'max_s': max(valores),
+                           **{f'{clave}_s': valor for clave, valor in percentiles(valores).items()}}
+    return {
+        'version': VERSION_RESULTADOS,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'opciones': opciones,
+        'preguntas_banco': len(preguntas),
+        'sesiones': medidas.sesiones,
+        'respuestas': medidas.respuestas,
+        'aciertos': medidas.aciertos,
+        'duracion_s': duracion,
+        'sesiones_por_s': medidas.sesiones / duracion if duracion > 0 else None,
+        'respuestas_por_s': medidas.respuestas / duracion if duracion > 0 else None,
+        'fases': fases,
+        'memoria': medidas.memoria,
+        'mb_por_1000_sesiones': crecimiento_memoria(medidas.memoria),
+    }
+
+
+def mostrar_informe(informe):
+    tabla = Table(title=f"Carga: {informe['sesiones']} sesiones ({informe['opciones']['modo']})")
+    tabla.add_column("Fase", style="cyan", no_wrap=True)
+    for columna in ("Muestras", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Máx (ms)", "Total (s)", "%"):
+        tabla.add_column(columna, justify="right")
+    trabajo = sum(f['total_s'] for f in informe['fases'].values()) or 1
+    for fase, f in informe['fases'].items():
+        tabla.add_row(fase, str(f['muestras']), f"{f['p50_s'] * 1000:.3f}", f"{f['p95_s'] * 1000:.3f}",
+                      f"{f['p99_s'] * 1000:.3f}", f"{f['max_s'] * 1000:.3f}", f"{f['total_s']:.2f}",
+                      f"{f['total_s'] / trabajo:.0%}")
+    console.print(tabla)
+
+    console.print(f"⏱️ {informe['duracion_s']:.2f} s: [bold]{informe['sesiones_por_s']:.1f} sesiones/s[/bold], "
+                  f"{informe['respuestas_por_s']:.0f} respuestas/s "
+                  f"({informe['aciertos'] / max(1, informe['respuestas']):.0%} aciertos)")
+    if informe['fases']:
+        limite = max(informe['fases'], key=lambda fase: informe['fases'][fase]['total_s'])
+        console.print(f"[yellow]Fase que más tiempo consume: {limite}[/yellow]")
+
+    memoria = Table(title="Memoria (RSS)")
+    memoria.add_column("Sesiones", justify="right")
+    memoria.add_column("MB", justify="right")
+    for sesiones, bytes_rss in informe['memoria']:
+        memoria.add_row(str(sesiones), f"{bytes_rss / (1024 * 1024):.1f}")
+    console.print(memoria)
+    if informe['mb_por_1000_sesiones'] is not None:
+        console.print(f"Crecimiento: [bold]{informe['mb_por_1000_sesiones']:.2f} MB por cada 1000 sesiones[/bold]")
+    else:
+        console.print(f"[yellow]⚠️ Menos de {INTERVALO_MEMORIA} sesiones: sin medida de crecimiento de memoria.[/yellow]")
+
+
+def main():
+    args = argparse.ArgumentParser(description="Prueba de carga con candidatos virtuales de Examen IA")
+    args.add_argument('--archivo', help='Banco de preguntas (.txt); por defecto se genera uno sintético')
+    args.add_argument('--preguntas', type=int, default=500, help='Tamaño del banco sintético')
+    args.add_argument('--candidatos', type=int, default=2000, help='Número de sesiones a simular')
+    args.add_argument('--concurrencia', type=int, default=100, help='Candidatos haciendo el examen a la vez')
+    args.add_argument('--modo', choices=MODOS_CARGA, default='hilos')
+    args.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos en el modo 'procesos'")
+    args.add_argument('--preguntas-por-sesion', type=int, default=40)
+    args.add_argument('--pensar', type=float, default=0.0,
+                      help='Tiempo medio (s) que piensa el candidato antes de cada respuesta (exponencial)')
+    args.add_argument('--acierto', type=float, default=0.7, help='Probabilidad de responder bien cada pregunta')
+    args.add_argument('--exportar', choices=FORMATOS_EXPORTACION, default='ninguno',
+                      help='Exportar los resultados de cada sesión al terminar')
+    args.add_argument('--semilla', type=int, default=0)
+    args.add_argument('--salida', default='carga_resultados.json', help='Informe JSON de salida')
+    a = args.parse_args()
+
+    opciones = {'candidatos': a.candidatos, 'concurrencia': max(1, a.concurrencia), 'modo': a.modo,
+                'procesos': max(1, a.procesos), 'preguntas_por_sesion': a.preguntas_por_sesion, 'pensar': a.pensar,
+                'acierto': a.acierto, 'exportar': a.exportar, 'semilla': a.semilla}
+    with tempfile.TemporaryDirectory(prefix='examen-carga-banco-') as directorio:
+        ruta_banco = a.archivo
+        if not ruta_banco:
+            ruta_banco = os.path.join(directorio, f'banco_{a.preguntas}.txt')
+            generador.generar_banco(ruta_banco, a.preguntas, proporcion_malformadas=0.0, semilla=a.semilla)
+        try:
+            informe = ejecutar(ruta_banco, opciones)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]❌ {e}[/red]")
+            return 1
+
+    mostrar_informe(informe)
+    with open(a.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    console.print(f"[green]✅ Informe guardado en {a.salida}[/green]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# bench/ejecutar.py
+# Benchmarks del parser, la calificación, la exportación y el diagnóstico sobre bancos sintéticos.
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Permitir 'python bench/ejecutar.py' además de 'python -m bench.ejecutar'
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from core import parser, examen_runner, exportador, diagnostico, registro_parser
+from bench import generador
+
+console = Console()
+
+TAMANOS_POR_DEFECTO = (1000, 10000, 100000)
+MAX_PDF = 2000 # Resultados exportados a PDF como máximo (FPDF es lento con miles de páginas)
+VERSION_RESULTADOS = 1
+
+
+@contextlib.contextmanager
+def silencio():
+    """Silencia la consola de los módulos medidos (sus mensajes falsearían los tiempos)."""
+    consolas = [m.console for m in (parser, exportador, diagnostico)]
+    anteriores = [c.quiet for c in consolas]
+    for c in consolas:
+        c.quiet = True
+    try:
+        yield
+    finally:
+        for c, anterior in zip(consolas, anteriores):
+            c.quiet = anterior
+
+
+def medir(funcion, repeticiones=3, memoria=True):
+    """
+    Ejecuta 'funcion' varias veces y devuelve los tiempos (s) y el pico de memoria
+    (bytes, con tracemalloc en una ejecución aparte para no afectar a los tiempos).
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return tiempos, pico
+
+
+def _respuestas_aleatorias(preguntas, aleatorio):
+    """Una respuesta por pregunta: la correcta o una letra al azar."""
+    resultados = []
+    for p in preguntas:
+        if aleatorio.random() < 0.6:
+            respuesta = list(p.correctas)
+        else:
+            respuesta = [chr(65 + aleatorio.randrange(len(p.opciones)))]
+        resultados.append((p, respuesta))
+    return resultados
+
+
+def diferencias_motores(ruta_banco):
+    """
+    Bloques en que los motores del parser no coinciden (número de pregunta o de
+    bloque fallido): el motor por defecto debe dar exactamente lo mismo que 'bloques'.
+    """
+    resultados = {}
+    for motor in parser.MOTORES:
+        problemas = []
+        with open(ruta_banco, 'r', encoding='utf-8') as f:
+            preguntas = [tuple(p) for p in parser.iter_preguntas_de(f, problemas, motor, mostrar_errores=False)]
+        resultados[motor] = (preguntas, problemas)
+    referencia_preguntas, referencia_problemas = resultados['bloques']
+    diferencias = []
+    for motor, (preguntas, problemas) in resultados.items():
+        diferencias.extend((motor, a[0]) for a, b in zip(preguntas, referencia_preguntas) if a != b)
+        if len(preguntas) != len(referencia_preguntas) or problemas != referencia_problemas:
+            diferencias.append((motor, 'total'))
+    return diferencias
+
+
+def cargar_como_cli(ruta_banco, **opciones):
+    """parser.cargar_preguntas como la llama la CLI: sin recolector de ciclos durante la carga."""
+    with parser.sin_recolector():
+        return parser.cargar_preguntas(ruta_banco, **opciones)
+
+
+def casos(ruta_banco, directorio):
+    """(nombre, funcion, unidades) de cada benchmark sobre un banco ya generado."""
+    preguntas = parser.cargar_preguntas(ruta_banco, registro=registro_parser.RegistroParser(nivel='ninguno'))
+    resultados = _respuestas_aleatorias(preguntas, random.Random(0))
+    aciertos = sum(examen_runner.es_respuesta_correcta(p, r) for p, r in resultados)
+    resultados_pdf = resultados[:MAX_PDF]
+    aciertos_pdf = sum(examen_runner.es_respuesta_correcta(p, r) for p, r in resultados_pdf)
+    log_completo = os.path.join(directorio, 'log_parser.txt')
+    # Las mismas respuestas repartidas en sesiones de 50 preguntas, para el lote
+    sesiones = [exportador.ResultadoSesion(f'candidato{i % 100}', str(i), resultados[j:j + 50],
+                                           sum(examen_runner.es_respuesta_correcta(p, r) for p, r in resultados[j:j + 50]),
+                                           len(resultados[j:j + 50]), None)
+                for i, j in enumerate(range(0, len(resultados), 50))]
+
+    def calificar():
+        for p, r in resultados:
+            examen_runner.es_respuesta_correcta(p, r)
+
+    return [
+        ('parser.cargar_preguntas', lambda: cargar_como_cli(
+            ruta_banco, registro=registro_parser.RegistroParser(nivel='ninguno')), len(preguntas)),
+        ('parser.cargar_preguntas[log completo]', lambda: cargar_como_cli(
+            ruta_banco, registro=registro_parser.RegistroParser(log_completo)), len(preguntas)),
+        ('parser.cargar_preguntas[bloques]', lambda: cargar_como_cli(
+            ruta_banco, motor='bloques', registro=registro_parser.RegistroParser(nivel='ninguno')), len(preguntas)),
+        ('examen_runner.es_respuesta_correcta', calificar, len(resultados)),
+        ('exportador.exportar_txt', lambda: exportador.exportar_txt(
+            resultados, aciertos, len(resultados), os.path.join(directorio, 'resultados.txt')), len(resultados)),
+        ('exportador.exportar_lote[txt]', lambda: exportador.exportar_lote(
+            sesiones, 'txt', directorio=os.path.join(directorio, 'lote')), len(resultados)),
+        ('exportador.exportar_lote[pdf]', lambda: exportador.exportar_lote(
+            sesiones[:MAX_PDF // 50], 'pdf', directorio=os.path.join(directorio, 'lote_pdf'), procesos=None),
+            sum(s.total for s in sesiones[:MAX_PDF // 50])),
+        ('exportador.exportar_pdf', lambda: exportador.exportar_pdf(
+            resultados_pdf, aciertos_pdf, len(resultados_pdf), os.path.join(directorio, 'resultados.pdf')),
+            len(resultados_pdf)),
+        ('diagnostico.diagnosticar_archivo', lambda: diagnostico.diagnosticar_archivo(ruta_banco), len(preguntas)),
+        ('diagnostico.analizar_preguntas_faltantes', lambda: diagnostico.analizar_preguntas_faltantes(
+            ruta_banco, rango_max=len(preguntas)), len(preguntas)),
+    ]
+
+
+def ejecutar(tamanos=TAMANOS_POR_DEFECTO, repeticiones=3, memoria=True, filtro=None, opciones_banco=None):
+    """Genera un banco por tamaño, ejecuta los benchmarks y devuelve el informe (dict)."""
+    resultados = []
+    motores_distintos = {}
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='examen-bench-') as directorio:
+        os.chdir(directorio) # El diagnóstico escribe su log en el directorio actual
+        try:
+            for tamano in tamanos:
+                ruta_banco = os.path.join(directorio, f'banco_{tamano}.txt')
+                bytes_banco = generador.generar_banco(ruta_banco, tamano, **(opciones_banco or {}))
+                console.print(f"[cyan]Banco de {tamano} preguntas ({bytes_banco / (1024 * 1024):.1f} MB)[/cyan]")
+                with silencio():
+                    diferencias = diferencias_motores(ruta_banco)
+                if diferencias:
+                    motores_distintos[tamano] = [list(d) for d in diferencias[:20]]
+                    console.print(f"[bold red]❌ Los motores del parser no coinciden en {len(diferencias)} bloques "
+                                  f"(primeros: {diferencias[:5]}).[/bold red]")
+                with silencio():
+                    lista_casos = casos(ruta_banco, directorio)
+                    for nombre, funcion, unidades in lista_casos:
+                        if filtro and filtro not in nombre:
+                            continue
+                        tiempos, pico = medir(funcion, repeticiones, memoria)
+                        mediana = statistics.median(tiempos)
+                        resultados.append({
+                            'nombre': nombre, 'preguntas': tamano, 'unidades': unidades,
+                            'segundos': tiempos, 'mediana_s': mediana, 'minimo_s': min(tiempos),
+                            'unidades_por_s': unidades / mediana if mediana > 0 else None,
+                            'pico_memoria_bytes': pico,
+                        })
+                        console.print(f"  {nombre}: {mediana:.4f} s", markup=False, highlight=False)
+        finally:
+            os.chdir(directorio_original)
+
+    return {
+        'version': VERSION_RESULTADOS,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'opciones_banco': opciones_banco or {},
+        'resultados': resultados,
+        'motores_distintos': motores_distintos, # Bloques en que 'estado' no da lo mismo que 'bloques', por tamaño
+    }
+
+
+def comparar(informe, anterior, tolerancia=0.2):
+    """
+    Compara las medianas con las de un informe anterior y muestra una tabla.
+    Devuelve la lista de (nombre, preguntas, ratio) que empeoraron más de 'tolerancia'.
+    """
+    previos = {(r['nombre'], r['preguntas']): r for r in anterior.get('resultados', [])}
+    tabla = Table(title="Comparación con el informe anterior")
+    tabla.add_column("Benchmark", overflow="fold")
+    for columna in ("Preguntas", "Antes (s)", "Ahora (s)", "Ratio", "Memoria (ratio)"):
+        tabla.add_column(columna, justify="right")
+
+    regresiones = []
+    for r in informe['resultados']:
+        previo = previos.get((r['nombre'], r['preguntas']))
+        if not previo or not previo['mediana_s']:
+            continue
+        ratio = r['mediana_s'] / previo['mediana_s']
+        ratio_memoria = ""
+        if r['pico_memoria_bytes'] and previo.get('pico_memoria_bytes'):
+            ratio_memoria = f"{r['pico_memoria_bytes'] / previo['pico_memoria_bytes']:.2f}"
+        color = "red" if ratio > 1 + tolerancia else ("green" if ratio < 1 - tolerancia else "white")
+        tabla.add_row(escape(r['nombre']), str(r['preguntas']), f"{previo['mediana_s']:.4f}", f"{r['mediana_s']:.4f}",
+                      f"[{color}]{ratio:.2f}[/{color}]", ratio_memoria)
+        if ratio > 1 + tolerancia:
+            regresiones.append((r['nombre'], r['preguntas'], ratio))
+    console.print(tabla)
+    return regresiones
+
+
+def main():
+    args = argparse.ArgumentParser(description="Benchmarks de Examen IA")
+    args.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS_POR_DEFECTO),
+                      help='Número de preguntas de cada banco sintético')
+    args.add_argument('--repeticiones', type=int, default=3)
+    args.add_argument('--sin-memoria', action='store_true', help='No medir el pico de memoria (más rápido)')
+    args.add_argument('--filtro', help='Ejecutar solo los benchmarks cuyo nombre contenga este texto')
+    args.add_argument('--multiples', type=float, default=0.2, help='Proporción de preguntas de selección múltiple')
+    args.add_argument('--multilinea', type=float, default=0.1, help='Proporción de enunciados/opciones en varias líneas')
+    args.add_argument('--malformadas', type=float, default=0.01, help='Proporción de bloques malformados')
+    args.add_argument('--salida', default='bench_resultados.json', help='Informe JSON de salida')
+    args.add_argument('--comparar', help='Informe JSON anterior con el que comparar')
+    args.add_argument('--tolerancia', type=float, default=0.2,
+                      help='Empeoramiento relativo admitido antes de considerar una regresión')
+    a = args.parse_args()
+
+    opciones_banco = {'proporcion_multiples': a.multiples, 'proporcion_multilinea': a.multilinea,
+                      'proporcion_malformadas': a.malformadas}
+    informe = ejecutar(a.tamanos, a.repeticiones, not a.sin_memoria, a.filtro, opciones_banco)
+    with open(a.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    console.print(f"[green]✅ Informe guardado en {a.salida}[/green]")
+    if informe['motores_distintos']:
+        return 1
+
+    if a.comparar:
+        with open(a.comparar, 'r', encoding='utf-8') as f:
+            regresiones = comparar(informe, json.load(f), a.tolerancia)
+        if regresiones:
+            console.print(f"[bold red]❌ {len(regresiones)} benchmarks empeoraron más de un {a.tolerancia:.0%}.[/bold red]")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
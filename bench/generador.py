@@ -0,0 +1,82 @@
+# bench/generador.py
+# Generador de bancos de preguntas sintéticos con el formato de test.txt.
+import argparse
+import random
+
+PALABRAS = ("sistema modelo datos aprendizaje red neuronal agente entorno función "
+            "algoritmo búsqueda conocimiento inferencia clasificación regresión "
+            "optimización heurística lógica visión lenguaje señal política valor").split()
+
+# Tipos de bloque malformado que se inyectan (cada uno falla por un motivo distinto)
+MALFORMADOS = ('sin_opciones', 'sin_respuesta', 'respuesta_fuera_de_rango', 'vacio')
+
+
+def _frase(aleatorio, minimo, maximo):
+    return " ".join(aleatorio.choice(PALABRAS) for _ in range(aleatorio.randint(minimo, maximo)))
+
+
+def _bloque_malformado(aleatorio, numero):
+    tipo = aleatorio.choice(MALFORMADOS)
+    if tipo == 'sin_opciones':
+        return f"{numero}:\n¿{_frase(aleatorio, 5, 12).capitalize()}?\nCorrect Answer: A\n\n"
+    if tipo == 'sin_respuesta':
+        return f"{numero}:\n¿{_frase(aleatorio, 5, 12).capitalize()}?\nA. {_frase(aleatorio, 2, 6)}\nB. {_frase(aleatorio, 2, 6)}\n\n"
+    if tipo == 'respuesta_fuera_de_rango':
+        return f"{numero}:\n¿{_frase(aleatorio, 5, 12).capitalize()}?\nA. {_frase(aleatorio, 2, 6)}\nB. {_frase(aleatorio, 2, 6)}\nCorrect Answer: F\n\n"
+    return f"{numero}:\n\n"
+
+
+def generar_bloques(num_preguntas, proporcion_multiples=0.2, proporcion_multilinea=0.1,
+                    proporcion_malformadas=0.0, min_opciones=3, max_opciones=6, semilla=0):
+    """
+    Genera el texto de cada bloque ('N:', enunciado, opciones y 'Correct Answer:').
+    'proporcion_multilinea' es la probabilidad de que el enunciado o una opción
+    ocupe más de una línea; 'proporcion_malformadas', la de inyectar un bloque
+    que el parser debe rechazar. Con la misma semilla el resultado es idéntico.
+    """
+    aleatorio = random.Random(semilla)
+    for numero in range(1, num_preguntas + 1):
+        if aleatorio.random() < proporcion_malformadas:
+            yield _bloque_malformado(aleatorio, numero)
+            continue
+
+        lineas = [f"{numero}:", f"¿{_frase(aleatorio, 6, 18).capitalize()}?"]
+        if aleatorio.random() < proporcion_multilinea:
+            lineas.append(_frase(aleatorio, 4, 10))
+
+        num_opciones = aleatorio.randint(min_opciones, max_opciones)
+        for k in range(num_opciones):
+            lineas.append(f"{chr(65 + k)}. {_frase(aleatorio, 2, 9).capitalize()}")
+            if aleatorio.random() < proporcion_multilinea / num_opciones:
+                lineas.append(f"   {_frase(aleatorio, 2, 6)}")
+
+        num_correctas = aleatorio.randint(2, min(3, num_opciones)) if aleatorio.random() < proporcion_multiples else 1
+        for k in sorted(aleatorio.sample(range(num_opciones), num_correctas)):
+            lineas.append(f"Correct Answer: {chr(65 + k)}")
+        yield "\n".join(lineas) + "\n\n"
+
+
+def generar_banco(ruta, num_preguntas, **opciones):
+    """Escribe en 'ruta' un banco sintético (ver generar_bloques). Devuelve el tamaño en bytes."""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for bloque in generar_bloques(num_preguntas, **opciones):
+            f.write(bloque)
+        return f.tell()
+
+
+def main():
+    args = argparse.ArgumentParser(description="Genera un banco de preguntas sintético")
+    args.add_argument('ruta', help='Archivo de salida (.txt)')
+    args.add_argument('-n', '--preguntas', type=int, default=1000, help='Número de preguntas')
+    args.add_argument('--multiples', type=float, default=0.2, help='Proporción de preguntas de selección múltiple')
+    args.add_argument('--multilinea', type=float, default=0.1, help='Proporción de enunciados/opciones en varias líneas')
+    args.add_argument('--malformadas', type=float, default=0.0, help='Proporción de bloques malformados')
+    args.add_argument('--semilla', type=int, default=0)
+    a = args.parse_args()
+    tamano = generar_banco(a.ruta, a.preguntas, proporcion_multiples=a.multiples, proporcion_multilinea=a.multilinea,
+                           proporcion_malformadas=a.malformadas, semilla=a.semilla)
+    print(f"{a.preguntas} preguntas escritas en {a.ruta} ({tamano / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# bench/navegacion_gui.py
+# Latencia de navegación de la GUI: recorre un examen completo adelante y atrás
+# con los manejadores reales de los botones y mide cada cambio de pregunta hasta
+# que Tk termina de redibujar. Necesita pantalla; sin ella arranca un Xvfb propio
+# (o: xvfb-run -a python -m bench.navegacion_gui).
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Permitir 'python bench/navegacion_gui.py' además de 'python -m bench.navegacion_gui'
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import tkinter as tk
+from rich.console import Console
+from rich.table import Table
+
+from core import parser, registro_parser
+from core.servidor import percentiles
+from bench import generador
+from bench.ejecutar import silencio
+from ui.gui import SimuladorExamenGUI
+from ui.widgets import GrupoOpciones
+
+console = Console()
+
+VERSION_RESULTADOS = 1
+
+
+class GrupoOpcionesSinReutilizar(GrupoOpciones):
+    """Referencia: destruye y crea los Checkbuttons y sus variables en cada pregunta (lo que hacía la GUI antes)."""
+
+    def mostrar(self, textos, marcadas=()):
+        for boton in self.botones:
+            boton.destroy()
+        self.botones, self.variables = [], []
+        for i, texto in enumerate(textos):
+            var = tk.BooleanVar(value=i in marcadas)
+            boton = tk.Checkbutton(self.parent, text=texto, variable=var, **self.estilo)
+            boton.pack(fill="x", anchor="w")
+            self.botones.append(boton)
+            self.variables.append(var)
+        self.visibles = len(textos)
+
+
+def iniciar_xvfb():
+    """Arranca Xvfb en una pantalla libre y la deja en DISPLAY. Devuelve el proceso (None si no hay Xvfb)."""
+    if not shutil.which('Xvfb'):
+        return None
+    lectura, escritura = os.pipe()
+    proceso = subprocess.Popen(['Xvfb', '-displayfd', str(escritura), '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                               pass_fds=(escritura,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(escritura)
+    with os.fdopen(lectura) as f:
+        pantalla = f.readline().strip() # Xvfb escribe el número de pantalla cuando está listo
+    if not pantalla:
+        proceso.terminate()
+        return None
+    os.environ['DISPLAY'] = f':{pantalla}'
+    return proceso
+
+
+def navegar(app, root, navegaciones, aleatorio):
+    """
+    Paseo aleatorio por el examen: 'Siguiente' (marcando una respuesta válida) o
+    'Anterior'. Devuelve los segundos de cada paso por dirección.
+    """
+    tiempos = {'adelante': [], 'atras': []}
+    ultima = len(app.preguntas_actuales) - 1
+    for _ in range(navegaciones):
+        atras = app.indice_actual == ultima or (app.indice_actual > 0 and aleatorio.random() < 0.4)
+        if not atras:
+            p = app.preguntas_actuales[app.indice_actual]
+            letras = [letra for _, letra in app.vars_opciones]
+            elegidas = set(aleatorio.sample(letras, len(p.correctas) if p.es_multiple else 1))
+            for var, letra in app.vars_opciones:
+                var.set(letra in elegidas)
+        inicio = time.perf_counter()
+        if atras:
+            app.pregunta_anterior()
+        else:
+            app.procesar_respuesta_y_avanzar()
+        root.update_idletasks() # Geometría y redibujado pendientes
+        tiempos['atras' if atras else 'adelante'].append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def ejecutar(ruta_banco, opciones):
+    """Abre la GUI sobre el banco, la recorre y devuelve el informe (dict)."""
+    with silencio():
+        preguntas = parser.cargar_preguntas(ruta_banco, registro=registro_parser.RegistroParser(nivel='ninguno'))
+    if not preguntas:
+        raise ValueError(f"No se cargaron preguntas de '{ruta_banco}'.")
+
+    anterior = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='examen-navegacion-') as directorio:
+        os.chdir(directorio) # Configuración y diario de la GUI en un directorio temporal
+        root = tk.Tk()
+        try:
+            app = SimuladorExamenGUI(root, preguntas, ruta_banco)
+            if not opciones['reutilizar']:
+                app.opciones = GrupoOpcionesSinReutilizar(app.frame_opciones, **app.opciones.estilo)
+            app.modo_examen = "examen_completo"
+            app.mode_var.set(app.modo_examen)
+            app.mostrar_pregunta_actual()
+            root.update()
+
+            inicio = time.perf_counter()
+            tiempos = navegar(app, root, opciones['navegaciones'], random.Random(opciones['semilla']))
+            duracion = time.perf_counter() - inicio
+            botones = len(app.opciones.botones)
+            app.diario.conservar_terminados = 0 # El diario del paseo no se guarda
+            app.diario.cerrar()
+        finally:
+            root.destroy()
+            os.chdir(anterior)
+
+    pasos = {}
+    for direccion, valores in tiempos.items():
+        if valores:
+            pasos[direccion] = {'muestras': len(valores), 'max_s': max(valores), 'media_s': sum(valores) / len(valores),
+                                **{f'{clave}_s': valor for clave, valor in percentiles(valores).items()}}
+    return {
+        'version': VERSION_RESULTADOS,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'tk': tk.TkVersion,
+        'opciones': opciones,
+        'preguntas_banco': len(preguntas),
+        'duracion_s': duracion,
+        'checkbuttons_al_final': botones,
+        'pasos': pasos,
+    }
+
+
+def mostrar_informe(informe):
+    modo = 'reutilizando' if informe['opciones']['reutilizar'] else 'sin reutilizar'
+    tabla = Table(title=f"Navegación GUI: {informe['opciones']['navegaciones']} pasos ({modo})")
+    tabla.add_column("Dirección", style="cyan", no_wrap=True)
+    for columna in ("Muestras", "Media (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Máx (ms)"):
+        tabla.add_column(columna, justify="right")
+    for direccion, p in informe['pasos'].items():
+        tabla.add_row(direccion, str(p['muestras']), f"{p['media_s'] * 1000:.3f}", f"{p['p50_s'] * 1000:.3f}",
+                      f"{p['p95_s'] * 1000:.3f}", f"{p['p99_s'] * 1000:.3f}", f"{p['max_s'] * 1000:.3f}")
+    console.print(tabla)
+    console.print(f"⏱️ {informe['duracion_s']:.2f} s en total; {informe['checkbuttons_al_final']} Checkbuttons al terminar")
+
+
+def main():
+    args = argparse.ArgumentParser(description="Latencia de navegación de la GUI de Examen IA (con Xvfb si no hay pantalla)")
+    args.add_argument('--archivo', help='Banco de preguntas (.txt); por defecto se genera uno sintético')
+    args.add_argument('--preguntas', type=int, default=200, help='Tamaño del banco sintético')
+    args.add_argument('--max-opciones', type=int, default=8, help='Máximo de opciones por pregunta del banco sintético')
+    args.add_argument('--navegaciones', type=int, default=2000, help='Pasos adelante/atrás a medir')
+    args.add_argument('--sin-reutilizar', action='store_true',
+                      help='Crear los Checkbuttons en cada pregunta (referencia para comparar)')
+    args.add_argument('--semilla', type=int, default=0)
+    args.add_argument('--salida', default='navegacion_resultados.json', help='Informe JSON de salida')
+    a = args.parse_args()
+
+    xvfb = None
+    if not os.environ.get('DISPLAY'):
+        xvfb = iniciar_xvfb()
+        if xvfb is None:
+            console.print("[red]❌ No hay pantalla (DISPLAY) ni Xvfb instalado. Instale Xvfb o use xvfb-run.[/red]")
+            return 1
+
+    opciones = {'navegaciones': a.navegaciones, 'reutilizar': not a.sin_reutilizar, 'semilla': a.semilla}
+    try:
+        with tempfile.TemporaryDirectory(prefix='examen-navegacion-banco-') as directorio:
+            ruta_banco = os.path.abspath(a.archivo) if a.archivo else None
+            if not ruta_banco:
+                ruta_banco = os.path.join(directorio, f'banco_{a.preguntas}.txt')
+                generador.generar_banco(ruta_banco, a.preguntas, proporcion_malformadas=0.0,
+                                        max_opciones=a.max_opciones, semilla=a.semilla)
+            try:
+                informe = ejecutar(ruta_banco, opciones)
+            except (OSError, ValueError, tk.TclError) as e:
+                console.print(f"[red]❌ {e}[/red]")
+                return 1
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    mostrar_informe(informe)
+    with open(a.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    console.print(f"[green]✅ Informe guardado en {a.salida}[/green]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+# core/almacen.py
+# Almacén de resultados en SQLite: sesiones, respuestas e identidad de cada pregunta
+# (archivo + número + hash del contenido), con índices para consultar el historial
+# de una pregunta o de un candidato sin recorrer los archivos exportados.
+import getpass
+import hashlib
+import os
+import sqlite3
+import time
+from rich.console import Console
+
+console = Console()
+
+RUTA_POR_DEFECTO = 'resultados.sqlite3'
+VERSION_ESQUEMA = 3
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS preguntas (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    hash TEXT NOT NULL, -- Enunciado, opciones y correctas: una pregunta editada es otra
+    num_opciones INTEGER, -- Para el análisis de ítems: las opciones que nadie elige también cuentan
+    mascara_correcta INTEGER, -- Clave (A = bit 0), aunque nadie haya acertado la pregunta todavía
+    UNIQUE (archivo, numero, hash)
+);
+CREATE TABLE IF NOT EXISTS sesiones (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT NOT NULL UNIQUE,
+    archivo TEXT NOT NULL,
+    candidato TEXT NOT NULL,
+    interfaz TEXT NOT NULL,
+    modo TEXT NOT NULL,
+    inicio REAL,
+    fin REAL NOT NULL,
+    total INTEGER NOT NULL,
+    respondidas INTEGER NOT NULL,
+    aciertos INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS respuestas (
+    id INTEGER PRIMARY KEY, -- Crece con cada intento: 'los últimos N' son los de mayor id
+    sesion_id INTEGER NOT NULL REFERENCES sesiones(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    pregunta_id INTEGER NOT NULL REFERENCES preguntas(id),
+    respuesta TEXT NOT NULL,
+    correcta INTEGER NOT NULL
+);
+-- Cubre 'intentos de una pregunta, del más reciente al más antiguo' sin leer la tabla
+CREATE INDEX IF NOT EXISTS idx_respuestas_pregunta ON respuestas (pregunta_id, id, correcta);
+CREATE INDEX IF NOT EXISTS idx_preguntas_numero ON preguntas (numero);
+CREATE INDEX IF NOT EXISTS idx_respuestas_sesion ON respuestas (sesion_id, posicion);
+CREATE INDEX IF NOT EXISTS idx_sesiones_candidato ON sesiones (candidato, fin);
+"""
+
+# Versión de origen -> sentencias para pasar a la siguiente
+MIGRACIONES = {
+    1: "ALTER TABLE preguntas ADD COLUMN num_opciones INTEGER;", # Las ya guardadas lo rellenan al volver a salir
+    2: "ALTER TABLE preguntas ADD COLUMN mascara_correcta INTEGER;", # Ídem
+}
+
+
+def hash_pregunta(pregunta):
+    """Hash del contenido de la pregunta (enunciado, opciones y respuestas correctas)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pregunta.enunciado.encode('utf-8'))
+    for opcion in pregunta.opciones:
+        h.update(b'\x1f' + opcion.encode('utf-8'))
+    h.update(b'\x1e' + ''.join(sorted(pregunta.correctas)).encode('utf-8'))
+    return h.hexdigest()
+
+
+class AlmacenResultados:
+    """
+    Base de datos SQLite de resultados (modo WAL: las consultas no bloquean a quien
+    escribe). Cada sesión se guarda en una sola transacción al terminar.
+    """
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL") # Con WAL, sin riesgo de corrupción
+        self.conexion.execute("PRAGMA foreign_keys=ON")
+        version = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self.conexion:
+                self.conexion.executescript(ESQUEMA)
+                self.conexion.execute(f"PRAGMA user_version={VERSION_ESQUEMA}")
+        elif version in MIGRACIONES:
+            with self.conexion:
+                while version < VERSION_ESQUEMA:
+                    self.conexion.executescript(MIGRACIONES[version])
+                    version += 1
+                self.conexion.execute(f"PRAGMA user_version={VERSION_ESQUEMA}")
+        elif version != VERSION_ESQUEMA:
+            self.conexion.close()
+            raise sqlite3.DatabaseError(f"Versión de esquema {version} no soportada en '{ruta}' "
+                                        f"(se esperaba {VERSION_ESQUEMA}).")
+        self._ids_preguntas = {} # (archivo, numero, hash) -> id, para no consultarlo en cada sesión
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _ids_de(self, archivo, preguntas):
+        """Id de cada pregunta (dando de alta las nuevas); se llama dentro de la transacción."""
+        claves = [(archivo, str(p.numero), hash_pregunta(p)) for p in preguntas]
+        datos = dict(zip(claves, ((len(p.opciones), p.mascara) for p in preguntas))) # Mismo hash: mismos datos
+        nuevas = [clave for clave in set(claves) if clave not in self._ids_preguntas]
+        if nuevas:
+            self.conexion.executemany(
+                "INSERT OR IGNORE INTO preguntas (archivo, numero, hash, num_opciones, mascara_correcta)"
+                " VALUES (?, ?, ?, ?, ?)", [(*clave, *datos[clave]) for clave in nuevas])
+            self.conexion.executemany( # Preguntas dadas de alta antes de existir las columnas
+                "UPDATE preguntas SET num_opciones = ?, mascara_correcta = ? WHERE archivo = ? AND numero = ?"
+                " AND hash = ? AND (num_opciones IS NULL OR mascara_correcta IS NULL)",
+                [(*datos[clave], *clave) for clave in nuevas])
+            for clave in nuevas:
+                self._ids_preguntas[clave] = self.conexion.execute(
+                    "SELECT id FROM preguntas WHERE archivo = ? AND numero = ? AND hash = ?", clave).fetchone()[0]
+        return [self._ids_preguntas[clave] for clave in claves]
+
+    def guardar_sesion(self, archivo, detalle, id_sesion=None, candidato='', interfaz='', modo='',
+                       inicio=None, fin=None, total=None):
+        """
+        Guarda una sesión y sus respuestas en una transacción. 'detalle' es la lista
+        de (pregunta, correcta, respuesta) de la CLI. Si la sesión 'id_sesion' ya
+        estaba guardada (p. ej. se interrumpió y se reanudó) se sustituye.
+        Devuelve el id de la sesión en la base de datos.
+        """
+        archivo = os.path.abspath(archivo)
+        id_sesion = id_sesion or os.urandom(16).hex()
+        try:
+            return self._guardar(archivo, detalle, id_sesion, candidato, interfaz, modo, inicio, fin, total)
+        except sqlite3.Error:
+            self._ids_preguntas.clear() # Pueden ser de altas que se acaban de deshacer
+            raise
+
+    def _guardar(self, archivo, detalle, id_sesion, candidato, interfaz, modo, inicio, fin, total):
+        aciertos = sum(1 for _, correcta, _ in detalle if correcta)
+        with self.conexion:
+            self.conexion.execute("DELETE FROM sesiones WHERE uuid = ?", (id_sesion,)) # Sus respuestas, en cascada
+            cursor = self.conexion.execute(
+                "INSERT INTO sesiones (uuid, archivo, candidato, interfaz, modo, inicio, fin, total, respondidas, aciertos)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (id_sesion, archivo, candidato, interfaz, modo, inicio, fin or time.time(),
+                 total if total is not None else len(detalle), len(detalle), aciertos))
+            fila_sesion = cursor.lastrowid
+            ids = self._ids_de(archivo, [pregunta for pregunta, _, _ in detalle])
+            self.conexion.executemany(
+                "INSERT INTO respuestas (sesion_id, posicion, pregunta_id, respuesta, correcta) VALUES (?, ?, ?, ?, ?)",
+                [(fila_sesion, posicion, id_pregunta, ''.join(sorted(respuesta or [])), int(bool(correcta)))
+                 for posicion, (id_pregunta, (_, correcta, respuesta)) in enumerate(zip(ids, detalle))])
+        return fila_sesion
+
+    def tasa_error(self, numero, archivo=None, ultimos=None):
+        """
+        (intentos, errores) de la pregunta 'numero' (en todas sus versiones y, si se
+        indica, solo del banco 'archivo'), sobre sus 'ultimos' intentos o todos.
+        """
+        sql = "SELECT id FROM preguntas WHERE numero = ?"
+        parametros = [str(numero)]
+        if archivo:
+            sql += " AND archivo = ?"
+            parametros.append(os.path.abspath(archivo))
+        ids = [fila[0] for fila in self.conexion.execute(sql, parametros)]
+        if not ids:
+            return 0, 0
+        marcas = ', '.join('?' * len(ids))
+        if ultimos is None:
+            fila = self.conexion.execute(
+                f"SELECT COUNT(*), COUNT(*) - TOTAL(correcta) FROM respuestas WHERE pregunta_id IN ({marcas})",
+                ids).fetchone()
+        else:
+            fila = self.conexion.execute(
+                f"SELECT COUNT(*), COUNT(*) - TOTAL(correcta) FROM (SELECT correcta FROM respuestas"
+                f" WHERE pregunta_id IN ({marcas}) ORDER BY id DESC LIMIT ?)", [*ids, ultimos]).fetchone()
+        return fila[0], int(fila[1])
+
+    def estadisticas_preguntas(self, archivo=None, limite=20):
+        """Las 'limite' preguntas con más proporción de errores: (archivo, numero, intentos, errores)."""
+        sql = ("SELECT p.archivo, p.numero, COUNT(*) AS intentos, COUNT(*) - TOTAL(r.correcta) AS errores"
+               " FROM respuestas r JOIN preguntas p ON p.id = r.pregunta_id")
+        parametros = []
+        if archivo:
+            sql += " WHERE p.archivo = ?"
+            parametros.append(os.path.abspath(archivo))
+        sql += " GROUP BY p.archivo, p.numero ORDER BY errores * 1.0 / intentos DESC, intentos DESC LIMIT ?"
+        parametros.append(limite)
+        return [(a, n, i, int(e)) for a, n, i, e in self.conexion.execute(sql, parametros)]
+
+    def historial_candidato(self, candidato, limite=50):
+        """Últimas sesiones del candidato, de la más reciente a la más antigua (dicts)."""
+        cursor = self.conexion.execute(
+            "SELECT uuid, archivo, interfaz, modo, inicio, fin, total, respondidas, aciertos FROM sesiones"
+            " WHERE candidato = ? ORDER BY fin DESC LIMIT ?", (candidato, limite))
+        columnas = [descripcion[0] for descripcion in cursor.description]
+        return [dict(zip(columnas, fila)) for fila in cursor]
+
+
+def candidato_por_defecto(config):
+    """Nombre con el que se guardan las sesiones de la CLI y la GUI: 'candidato' de la configuración o el usuario."""
+    if config.get('candidato'):
+        return config['candidato']
+    try:
+        return getpass.getuser()
+    except Exception: # Sin usuario en el entorno (p. ej. algunos contenedores)
+        return ''
+
+
+def guardar_desde_config(config, archivo, detalle, **datos):
+    """
+    Guarda la sesión en la base de datos 'resultados_db' de la configuración
+    (vacío: no se guarda). Los errores se avisan sin interrumpir el examen.
+    """
+    ruta = config.get('resultados_db', RUTA_POR_DEFECTO)
+    if not ruta or not detalle:
+        return None
+    datos.setdefault('candidato', candidato_por_defecto(config))
+    try:
+        with AlmacenResultados(ruta) as almacen:
+            return almacen.guardar_sesion(archivo, detalle, **datos)
+    except sqlite3.Error as e:
+        console.print(f"[yellow]⚠️ No se pudo guardar la sesión en '{ruta}': {e}[/yellow]")
+        return None
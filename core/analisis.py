@@ -0,0 +1,259 @@
+# core/analisis.py
+# Análisis de ítems (teoría clásica de los tests) sobre el historial del almacén de
+# resultados: dificultad (p), discriminación (punto-biserial) y opciones elegidas,
+# calculado con NumPy y acumulable: cada actualización solo lee las sesiones nuevas.
+import math
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_OPCIONES = 26 # Letras A-Z: columnas de las matrices por opción
+TAM_LOTE = 100_000 # Respuestas leídas de la base de datos por lote
+ORDENES = ('discriminacion', 'dificultad', 'intentos')
+DISCRIMINACION_MINIMA = 0.2 # Por debajo, el ítem apenas distingue a quien sabe de quien no
+P_MINIMA, P_MAXIMA = 0.2, 0.95 # Fuera de este rango, el ítem es demasiado difícil o fácil
+DISTRACTOR_MINIMO = 0.05 # Un distractor elegido menos que esto no distrae a nadie
+
+# Acumuladores por ítem (id de la pregunta en el almacén). Todos son sumas, así que
+# añadir sesiones nuevas da lo mismo que recalcular desde cero.
+_VECTORES = ('intentos', 'aciertos', 'blancos', 'n_resto', 'aciertos_resto', 'suma_resto', 'suma_resto2',
+             'suma_resto_acierto', 'mascara_correcta')
+_MATRICES = ('elegidas', 'resto_elegidas') # Ítem x opción
+
+
+def _requiere_numpy():
+    if np is None:
+        raise ImportError("El análisis de ítems requiere NumPy (`pip install numpy`).")
+
+
+def mascaras_texto(respuestas):
+    """Máscaras de bits (A = bit 0) de una secuencia de respuestas como 'AC', sin bucles en Python."""
+    _requiere_numpy()
+    if not len(respuestas):
+        return np.zeros(0, dtype=np.int64)
+    letras = np.asarray(respuestas, dtype=f'S{MAX_OPCIONES}').view(np.uint8).reshape(len(respuestas), MAX_OPCIONES)
+    letras = letras.astype(np.int64) - 65
+    return np.where(letras >= 0, np.left_shift(1, letras.clip(0)), 0).sum(axis=1)
+
+
+class AnalisisItems:
+    """
+    Estadísticas acumuladas de cada ítem. Para la discriminación se usa la
+    puntuación del resto de la sesión (aciertos sin contar el ítem, sobre las
+    demás respondidas), así el propio ítem no infla su correlación.
+    """
+
+    def __init__(self):
+        _requiere_numpy()
+        self.ultima_sesion = 0 # Mayor id de sesión del almacén ya incluido
+        for nombre in _VECTORES:
+            setattr(self, nombre, np.zeros(0, dtype=np.float64 if nombre.startswith('suma') else np.int64))
+        self.mascara_correcta[:] = -1
+        for nombre in _MATRICES:
+            setattr(self, nombre, np.zeros((0, MAX_OPCIONES), dtype=np.float64 if nombre.startswith('resto') else np.int64))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.intentos))
+
+    def _ampliar(self, num_items):
+        actual = len(self.intentos)
+        if num_items <= actual:
+            return
+        for nombre in _VECTORES:
+            vector = getattr(self, nombre)
+            relleno = np.full(num_items - actual, -1 if nombre == 'mascara_correcta' else 0, dtype=vector.dtype)
+            setattr(self, nombre, np.concatenate([vector, relleno]))
+        for nombre in _MATRICES:
+            matriz = getattr(self, nombre)
+            setattr(self, nombre, np.concatenate([matriz, np.zeros((num_items - actual, MAX_OPCIONES), matriz.dtype)]))
+
+    def agregar(self, items, mascaras, correctas, aciertos_sesion, respondidas_sesion):
+        """
+        Añade intentos (arrays de la misma longitud): id del ítem, máscara de la
+        respuesta, si fue correcta, y aciertos y respondidas de la sesión del intento.
+        """
+        items = np.asarray(items, dtype=np.int64)
+        if not len(items):
+            return
+        mascaras = np.asarray(mascaras, dtype=np.int64)
+        x = np.asarray(correctas, dtype=np.int64)
+        aciertos_sesion = np.asarray(aciertos_sesion, dtype=np.float64)
+        respondidas_sesion = np.asarray(respondidas_sesion, dtype=np.float64)
+        q = int(items.max()) + 1
+        self._ampliar(q)
+
+        def sumar(pesos=None, seleccion=slice(None)):
+            return np.bincount(items[seleccion], weights=None if pesos is None else pesos, minlength=q)[:q]
+
+        self.intentos[:q] += sumar().astype(np.int64)
+        self.aciertos[:q] += sumar(x).astype(np.int64)
+        self.blancos[:q] += sumar(mascaras == 0).astype(np.int64)
+        # Clave de los ítems sin la del almacén (guardados antes de existir la columna): la de un acierto
+        sin_clave = (x == 1) & (self.mascara_correcta[items] < 0)
+        self.mascara_correcta[items[sin_clave]] = mascaras[sin_clave]
+
+        # Puntuación del resto de la sesión (sin este ítem); indefinida si solo respondió este
+        con_resto = respondidas_sesion > 1
+        resto = np.zeros(len(items))
+        resto[con_resto] = (aciertos_sesion[con_resto] - x[con_resto]) / (respondidas_sesion[con_resto] - 1)
+        self.n_resto[:q] += sumar(seleccion=con_resto).astype(np.int64)
+        self.aciertos_resto[:q] += sumar(x[con_resto], con_resto).astype(np.int64)
+        self.suma_resto[:q] += sumar(resto[con_resto], con_resto)
+        self.suma_resto2[:q] += sumar(resto[con_resto] ** 2, con_resto)
+        self.suma_resto_acierto[:q] += sumar((resto * x)[con_resto], con_resto)
+
+        # Opciones elegidas: un (fila, letra) por cada bit de cada respuesta
+        bits = (mascaras[:, None] >> np.arange(MAX_OPCIONES)) & 1
+        filas, letras = np.nonzero(bits)
+        celdas = items[filas] * MAX_OPCIONES + letras
+        self.elegidas[:q] += np.bincount(celdas, minlength=q * MAX_OPCIONES)[:q * MAX_OPCIONES].reshape(q, MAX_OPCIONES)
+        self.resto_elegidas[:q] += np.bincount(celdas, weights=resto[filas], minlength=q * MAX_OPCIONES
+                                               )[:q * MAX_OPCIONES].reshape(q, MAX_OPCIONES)
+
+    def actualizar(self, almacen_resultados, tam_lote=TAM_LOTE):
+        """
+        Toma del almacén la clave de cada pregunta y añade las sesiones completas
+        posteriores a la última incluida. Devuelve el número de intentos añadidos.
+        """
+        claves = almacen_resultados.conexion.execute(
+            "SELECT id, mascara_correcta FROM preguntas WHERE mascara_correcta IS NOT NULL").fetchall()
+        if claves:
+            ids, mascaras = np.array(claves, dtype=np.int64).T
+            self._ampliar(int(ids.max()) + 1)
+            self.mascara_correcta[ids] = mascaras
+        cursor = almacen_resultados.conexion.execute(
+            "SELECT r.pregunta_id, r.respuesta, r.correcta, s.aciertos, s.respondidas, s.id"
+            " FROM sesiones s JOIN respuestas r ON r.sesion_id = s.id"
+            " WHERE s.id > ? AND s.respondidas = s.total ORDER BY s.id", (self.ultima_sesion,))
+        añadidos = 0
+        while True:
+            lote = cursor.fetchmany(tam_lote)
+            if not lote:
+                break
+            items, respuestas, correctas, aciertos, respondidas, sesiones = zip(*lote)
+            self.agregar(items, mascaras_texto(respuestas), correctas, aciertos, respondidas)
+            self.ultima_sesion = max(self.ultima_sesion, sesiones[-1])
+            añadidos += len(lote)
+        return añadidos
+
+    def estadisticas(self):
+        """Arrays por ítem: 'p' (proporción de aciertos) y 'discriminacion' (NaN si no se puede calcular)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p = np.where(self.intentos > 0, self.aciertos / np.maximum(self.intentos, 1), np.nan)
+            n = self.n_resto.astype(np.float64)
+            sx, sy = self.aciertos_resto.astype(np.float64), self.suma_resto
+            covarianza = n * self.suma_resto_acierto - sx * sy
+            varianza_x = n * sx - sx ** 2 # x es 0/1: la suma de cuadrados es la suma
+            varianza_y = n * self.suma_resto2 - sy ** 2
+            discriminacion = covarianza / np.sqrt(varianza_x * varianza_y)
+        discriminacion[~np.isfinite(discriminacion)] = np.nan
+        return {'p': p, 'discriminacion': discriminacion}
+
+    def informe(self, nombres, orden='discriminacion', min_intentos=1, limite=None, archivo=None):
+        """
+        Filas (dicts) de los ítems con al menos 'min_intentos' (y, si se indica, del
+        banco 'archivo'), de peor a mejor según 'orden'. 'nombres' es
+        {id: (archivo, numero, num_opciones)} (ver nombres_items).
+        """
+        if orden not in ORDENES:
+            raise ValueError(f"Orden desconocido: '{orden}'. Opciones: {', '.join(ORDENES)}")
+        stats = self.estadisticas()
+        ids = np.nonzero(self.intentos >= max(1, min_intentos))[0]
+        if archivo:
+            archivo = os.path.abspath(archivo)
+            ids = ids[np.isin(ids, [i for i, (a, *_) in nombres.items() if a == archivo])]
+        if orden == 'discriminacion': # Las NaN (sin varianza) al final
+            clave = np.where(np.isnan(stats['discriminacion'][ids]), np.inf, stats['discriminacion'][ids])
+        elif orden == 'dificultad':
+            clave = stats['p'][ids]
+        else:
+            clave = -self.intentos[ids]
+        ids = ids[np.argsort(clave, kind='stable')]
+        if limite:
+            ids = ids[:limite]
+        return [self._fila(int(i), stats, nombres.get(int(i), ('', str(i), None))) for i in ids]
+
+    def _fila(self, i, stats, nombre):
+        intentos = int(self.intentos[i])
+        correcta = int(self.mascara_correcta[i])
+        p, r = float(stats['p'][i]), float(stats['discriminacion'][i])
+        # Las del banco (también las que nadie elige); sin ese dato, hasta la última elegida o correcta
+        num_opciones = max(int(np.max(np.nonzero(self.elegidas[i])[0], initial=-1)) + 1, max(correcta, 0).bit_length(),
+                           min(nombre[2] or 0, MAX_OPCIONES))
+        opciones = []
+        for k in range(num_opciones):
+            elegidas = int(self.elegidas[i, k])
+            opciones.append({
+                'letra': chr(65 + k), 'correcta': correcta >= 0 and bool(correcta >> k & 1),
+                'tasa': elegidas / intentos, 'media_resto': self.resto_elegidas[i, k] / elegidas if elegidas else None,
+            })
+
+        alertas = []
+        if math.isnan(r):
+            alertas.append('sin datos para la discriminación')
+        elif r < 0:
+            alertas.append('discriminación negativa')
+        elif r < DISCRIMINACION_MINIMA:
+            alertas.append('discrimina poco')
+        if p < P_MINIMA:
+            alertas.append('muy difícil')
+        elif p > P_MAXIMA:
+            alertas.append('muy fácil')
+        distractores = [o for o in opciones if not o['correcta']]
+        if correcta >= 0 and correcta.bit_count() == 1 and any(o['tasa'] > p for o in distractores):
+            alertas.append('un distractor se elige más que la correcta')
+        if any(o['tasa'] < DISTRACTOR_MINIMO for o in distractores):
+            alertas.append('distractor que casi nadie elige')
+
+        return {
+            'id': i, 'archivo': nombre[0], 'numero': nombre[1], 'intentos': intentos, 'p': p,
+            'discriminacion': None if math.isnan(r) else r, 'blancos': int(self.blancos[i]) / intentos,
+            'correctas': ''.join(o['letra'] for o in opciones if o['correcta']), 'opciones': opciones,
+            'alertas': alertas,
+        }
+
+    def guardar(self, ruta):
+        """Guarda los acumuladores (.npz) para seguir actualizándolos en otra ejecución."""
+        with open(ruta, 'wb') as f:
+            np.savez(f, ultima_sesion=self.ultima_sesion,
+                     **{nombre: getattr(self, nombre) for nombre in _VECTORES + _MATRICES})
+
+    @classmethod
+    def cargar(cls, ruta):
+        analisis = cls()
+        with np.load(ruta) as datos:
+            analisis.ultima_sesion = int(datos['ultima_sesion'])
+            for nombre in _VECTORES + _MATRICES:
+                setattr(analisis, nombre, datos[nombre])
+        return analisis
+
+
+def nombres_items(almacen_resultados):
+    """{id: (archivo, numero, num_opciones)} de las preguntas del almacén (num_opciones puede ser None)."""
+    return {i: (archivo, numero, num_opciones) for i, archivo, numero, num_opciones in
+            almacen_resultados.conexion.execute("SELECT id, archivo, numero, num_opciones FROM preguntas")}
+
+
+def analizar(almacen_resultados, ruta_estado=None):
+    """
+    AnalisisItems al día con el almacén. Con 'ruta_estado' (.npz) se parte de lo
+    ya acumulado en ejecuciones anteriores y se guarda lo nuevo; si el estado no
+    corresponde a esta base de datos (p. ej. se recreó), se recalcula entero.
+    """
+    _requiere_numpy()
+    analisis = None
+    if ruta_estado and os.path.exists(ruta_estado):
+        try:
+            analisis = AnalisisItems.cargar(ruta_estado)
+        except (OSError, ValueError, KeyError):
+            analisis = None
+        ultima = almacen_resultados.conexion.execute("SELECT MAX(id) FROM sesiones").fetchone()[0] or 0
+        if analisis is not None and analisis.ultima_sesion > ultima:
+            analisis = None
+    analisis = analisis or AnalisisItems()
+    if analisis.actualizar(almacen_resultados) and ruta_estado:
+        analisis.guardar(ruta_estado)
+    return analisis
@@ -0,0 +1,176 @@
+# core/banco.py
+import sys
+from array import array
+from collections.abc import Sequence
+
+try:
+    from . import parser
+    from .calificador import letras_mascara
+    from . import perfilado
+except ImportError:
+    import parser
+    from calificador import letras_mascara
+    import perfilado
+
+TAM_TROZO = 1 << 16 # Textos acumulados antes de unirlos en un solo bloque de bytes
+
+
+class BancoPreguntas(Sequence):
+    """
+    Banco de preguntas en formato columnar.
+    Todos los textos (número, enunciado y opciones de cada pregunta, en ese orden)
+    van en un único bloque de bytes UTF-8, indexado por un array de offsets; cada
+    pregunta guarda el rango de textos que le corresponde y sus respuestas
+    correctas como máscara de bits. El acceso por índice devuelve una 'Pregunta'
+    construida al vuelo, así que el resto del código la usa igual que una lista.
+    """
+    __slots__ = ('_texto', '_offsets', '_primer_texto', '_mascaras')
+
+    def __init__(self, texto=b'', offsets=None, primer_texto=None, mascaras=None):
+        self._texto = texto
+        self._offsets = offsets if offsets is not None else array('Q', [0]) # Texto k: [offsets[k], offsets[k+1])
+        self._primer_texto = primer_texto if primer_texto is not None else array('I', [0]) # Pregunta i: textos [primer_texto[i], primer_texto[i+1])
+        self._mascaras = mascaras if mascaras is not None else array('I')
+
+    @classmethod
+    def desde_preguntas(cls, preguntas):
+        """Construye el banco a partir de cualquier iterable de Pregunta."""
+        constructor = ConstructorBanco()
+        for pregunta in preguntas:
+            constructor.append(pregunta)
+        return constructor.construir()
+
+    def __len__(self):
+        return len(self._mascaras)
+
+    def _texto_n(self, k):
+        return self._texto[self._offsets[k]:self._offsets[k + 1]].decode('utf-8')
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError('índice de pregunta fuera de rango')
+
+        inicio, fin = self._primer_texto[indice], self._primer_texto[indice + 1]
+        textos = [self._texto_n(k) for k in range(inicio, fin)]
+        mascara = self._mascaras[indice]
+        correctas = letras_mascara(mascara)
+        return parser.Pregunta(textos[0], textos[1], textos[2:], correctas, len(correctas) > 1, mascara)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"<BancoPreguntas: {len(self)} preguntas, {self.memoria_bytes() / 1024:.1f} KiB>"
+
+    def con_prefijo(self, prefijo):
+        """Copia del banco con 'prefijo' delante del número de cada pregunta (p. ej. 'tema1:')."""
+        extra = prefijo.encode('utf-8')
+        piezas = []
+        offsets = array('Q', [0])
+        desplazamiento = 0
+        for i in range(len(self)):
+            inicio, fin = self._primer_texto[i], self._primer_texto[i + 1]
+            piezas.append(extra)
+            piezas.append(self._texto[self._offsets[inicio]:self._offsets[fin]])
+            desplazamiento += len(extra)
+            offsets.extend(o + desplazamiento for o in self._offsets[inicio + 1:fin + 1])
+        return BancoPreguntas(b''.join(piezas), offsets, array('I', self._primer_texto), array('I', self._mascaras))
+
+    def mascara(self, indice):
+        """Máscara de bits de las respuestas correctas de la pregunta 'indice'."""
+        return self._mascaras[indice]
+
+    def mascaras(self):
+        """Array con la máscara de respuestas correctas de cada pregunta (para calificar_lote)."""
+        return self._mascaras
+
+    def num_opciones(self, indice):
+        return self._primer_texto[indice + 1] - self._primer_texto[indice] - 2
+
+    def num_multiples(self):
+        """Número de preguntas de selección múltiple (más de un bit en la máscara)."""
+        return sum(1 for m in self._mascaras if m & (m - 1))
+
+    def memoria_bytes(self):
+        """Memoria ocupada por el banco (textos, offsets y máscaras)."""
+        total = sys.getsizeof(self._texto)
+        for columna in (self._offsets, self._primer_texto, self._mascaras):
+            total += sys.getsizeof(columna)
+        return total
+
+
+class ConstructorBanco:
+    """
+    Acumula preguntas una a una (p. ej. desde parser.iter_preguntas) sin guardar
+    los objetos Pregunta; construir() devuelve el BancoPreguntas final.
+    """
+
+    def __init__(self):
+        self._trozos = [] # Bloques de bytes ya unidos
+        self._piezas = [] # Textos pendientes de unir
+        self._pos = 0
+        self._offsets = array('Q', [0])
+        self._primer_texto = array('I', [0])
+        self._mascaras = array('I')
+
+    def __len__(self):
+        return len(self._mascaras)
+
+    def append(self, pregunta):
+        for texto in (pregunta.numero, pregunta.enunciado, *pregunta.opciones):
+            codificado = texto.encode('utf-8')
+            self._pos += len(codificado)
+            self._offsets.append(self._pos)
+            self._piezas.append(codificado)
+        self._primer_texto.append(len(self._offsets) - 1)
+        self._mascaras.append(pregunta.mascara)
+
+        if len(self._piezas) >= TAM_TROZO:
+            self._trozos.append(b''.join(self._piezas))
+            self._piezas = []
+
+    def extender(self, banco, prefijo=''):
+        """
+        Añade al final todas las preguntas de otro BancoPreguntas sin reconstruirlas
+        (con 'prefijo', delante de cada número; ver BancoPreguntas.con_prefijo).
+        """
+        if prefijo:
+            banco = banco.con_prefijo(prefijo)
+        if self._piezas:
+            self._trozos.append(b''.join(self._piezas))
+            self._piezas = []
+        base_texto = len(self._offsets) - 1
+        self._trozos.append(banco._texto)
+        self._offsets.extend(self._pos + o for o in banco._offsets[1:])
+        self._pos += len(banco._texto)
+        self._primer_texto.extend(base_texto + k for k in banco._primer_texto[1:])
+        self._mascaras.extend(banco._mascaras)
+
+    def construir(self):
+        self._trozos.append(b''.join(self._piezas))
+        self._piezas = []
+        return BancoPreguntas(b''.join(self._trozos), self._offsets, self._primer_texto, self._mascaras)
+
+
+@perfilado.medido()
+def cargar_banco(ruta_archivo, procesos=1, **kwargs_parser):
+    """
+    Como parser.cargar_preguntas, pero devuelve un BancoPreguntas.
+    Con 'procesos' distinto de 1 (None = automático) los archivos grandes se
+    parsean por trozos en paralelo (ver carga_paralela).
+    """
+    if procesos != 1:
+        try:
+            from . import carga_paralela
+        except ImportError:
+            import carga_paralela
+        return carga_paralela.cargar_banco_paralelo(ruta_archivo, procesos, **kwargs_parser)
+
+    constructor = ConstructorBanco()
+    parser.cargar_preguntas(ruta_archivo, destino=constructor, **kwargs_parser)
+    return constructor.construir()
@@ -0,0 +1,217 @@
+# core/cache.py
+import hashlib
+import os
+import pickle
+from rich.console import Console
+
+try:
+    from . import banco, indice, parser, perfilado
+except ImportError:
+    import banco
+    import indice
+    import parser
+    import perfilado
+
+console = Console()
+
+DIR_CACHE_POR_DEFECTO = os.path.join(os.path.expanduser('~'), '.cache', 'examen-ia')
+MAX_MB_POR_DEFECTO = 512
+VERSION_CACHE = 2 # Incrementar si cambia el formato de lo que se guarda
+EXTENSION = '.cache'
+TAM_BLOQUE_HASH = 1 << 20
+# Argumentos del parser que no cambian las preguntas obtenidas: no forman parte de la clave
+OPCIONES_SIN_EFECTO = frozenset({'registro', 'problemas', 'num_esperado', 'procesos', 'progreso'})
+
+
+def _hash_archivo(ruta_archivo):
+    """Hash del contenido del archivo (se usa solo si tamaño/fecha no bastan)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(ruta_archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAM_BLOQUE_HASH), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _tipo_banco(kwargs_parser):
+    """
+    Tipo de entrada del banco según el motor y las demás opciones del parser que
+    influyen en el resultado: con otras opciones, otra entrada.
+    """
+    opciones = {k: v for k, v in kwargs_parser.items() if k not in OPCIONES_SIN_EFECTO}
+    tipo = opciones.pop('motor', parser.MOTOR_POR_DEFECTO)
+    if opciones:
+        tipo += '-' + hashlib.sha1(repr(sorted(opciones.items())).encode('utf-8')).hexdigest()[:12]
+    return tipo
+
+
+def _ruta_entrada(ruta_archivo, dir_cache, tipo=''):
+    """
+    Cada archivo de preguntas tiene una entrada por tipo de dato (banco, índice...),
+    nombrada por el hash de su ruta absoluta.
+    """
+    clave = hashlib.sha1(os.path.abspath(ruta_archivo).encode('utf-8')).hexdigest()
+    return os.path.join(dir_cache, clave + (f'.{tipo}' if tipo else '') + EXTENSION)
+
+
+def _leer_entrada(ruta_entrada, ruta_archivo, st):
+    """
+    Devuelve (cabecera, datos) si la entrada corresponde al archivo actual, o
+    (None, None) si no existe, es inválida o el archivo cambió. La cabecera va en
+    un pickle aparte para validarla sin cargar las preguntas. Si la fecha no
+    coincide pero el contenido sí, se marca la cabecera como 'actualizada'.
+    """
+    try:
+        with open(ruta_entrada, 'rb') as f:
+            cabecera = pickle.load(f)
+            if cabecera.get('version') != VERSION_CACHE or cabecera['tamano'] != st.st_size:
+                return None, None
+            if cabecera['mtime_ns'] != st.st_mtime_ns:
+                # Fecha distinta (copia, checkout...): comprobar el contenido
+                if _hash_archivo(ruta_archivo) != cabecera['hash']:
+                    return None, None
+                cabecera['mtime_ns'] = st.st_mtime_ns
+                cabecera['actualizada'] = True
+            return cabecera, pickle.load(f)
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None, None
+
+
+def _escribir_entrada(ruta_entrada, cabecera, datos):
+    """Escribe la entrada de forma atómica (archivo temporal + reemplazo)."""
+    temporal = f"{ruta_entrada}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        pickle.dump(cabecera, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta_entrada)
+
+
+def _desalojar(dir_cache, max_bytes):
+    """Elimina las entradas usadas hace más tiempo hasta que la caché quepa en 'max_bytes'."""
+    entradas = []
+    with os.scandir(dir_cache) as it:
+        for e in it:
+            if e.name.endswith(EXTENSION) and e.is_file():
+                st = e.stat()
+                entradas.append((st.st_mtime, st.st_size, e.path))
+
+    total = sum(tam for _, tam, _ in entradas)
+    for _, tam, ruta in sorted(entradas): # Las menos recientes primero (LRU)
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+            total -= tam
+        except OSError:
+            pass
+
+
+def _cargar_con_cache(ruta_archivo, construir, dir_cache=None, max_mb=MAX_MB_POR_DEFECTO, tipo=''):
+    """
+    Devuelve (datos, de_cache). Si la entrada de caché no corresponde al archivo
+    actual (mismo tamaño y fecha, o mismo contenido), llama a construir(), que
+    devuelve (datos, guardar), y guarda los datos si 'guardar' es verdadero.
+    """
+    dir_cache = dir_cache or DIR_CACHE_POR_DEFECTO
+    try:
+        st = os.stat(ruta_archivo)
+        os.makedirs(dir_cache, exist_ok=True)
+    except OSError:
+        return construir()[0], False # Quien construye informa del error
+
+    ruta_entrada = _ruta_entrada(ruta_archivo, dir_cache, tipo)
+    cabecera, datos = _leer_entrada(ruta_entrada, ruta_archivo, st)
+
+    if cabecera:
+        try:
+            if cabecera.pop('actualizada', False): # Guardar la fecha nueva para no recalcular el hash
+                _escribir_entrada(ruta_entrada, cabecera, datos)
+            else:
+                os.utime(ruta_entrada) # Marcar como usada recientemente (LRU)
+        except OSError:
+            pass
+        return datos, True
+
+    # --- Construir y guardar en caché ---
+    hash_contenido = _hash_archivo(ruta_archivo)
+    datos, guardar = construir()
+    if guardar and os.stat(ruta_archivo).st_mtime_ns == st.st_mtime_ns: # No cambió mientras se procesaba
+        cabecera = {
+            'version': VERSION_CACHE,
+            'ruta': os.path.abspath(ruta_archivo),
+            'tamano': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'hash': hash_contenido,
+        }
+        try:
+            _escribir_entrada(ruta_entrada, cabecera, datos)
+            _desalojar(dir_cache, max_mb * 1024 * 1024)
+        except OSError as e:
+            console.print(f"[yellow]⚠️ No se pudo guardar la caché de preguntas: {e}[/yellow]")
+    return datos, False
+
+
+@perfilado.medido()
+def cargar_preguntas(ruta_archivo, usar_cache=True, dir_cache=None, max_mb=MAX_MB_POR_DEFECTO, detalles=None,
+                     **kwargs_parser):
+    """
+    Carga el archivo como BancoPreguntas reutilizando el resultado guardado en
+    caché si el archivo no ha cambiado (mismo tamaño y fecha, o mismo contenido).
+    Los argumentos extra se pasan al parser cuando hay que parsear de nuevo; el
+    motor y los que cambian el resultado eligen entrada de caché (ver _tipo_banco).
+    Si se pasa el diccionario 'detalles', se rellena con 'de_cache' y 'problemas'.
+    """
+    if not usar_cache:
+        problemas = []
+        preguntas = banco.cargar_banco(ruta_archivo, problemas=problemas, **kwargs_parser)
+        de_cache = False
+    else:
+        def construir():
+            problemas = []
+            preguntas = banco.cargar_banco(ruta_archivo, problemas=problemas, **kwargs_parser)
+            return (preguntas, problemas), bool(preguntas)
+
+        (preguntas, problemas), de_cache = _cargar_con_cache(ruta_archivo, construir, dir_cache, max_mb,
+                                                             tipo=_tipo_banco(kwargs_parser))
+        if de_cache and problemas:
+            console.print(f"[yellow]⚠️ {len(problemas)} bloques tuvieron problemas durante el parseo (resultado en caché; use --no-cache para ver el detalle).[/yellow]")
+
+    if detalles is not None:
+        detalles['de_cache'] = de_cache
+        detalles['problemas'] = problemas
+    return preguntas
+
+
+@perfilado.medido()
+def cargar_perezoso(ruta_archivo, usar_cache=True, dir_cache=None, max_mb=MAX_MB_POR_DEFECTO):
+    """
+    Devuelve un BancoPerezoso: solo se indexan las cabeceras 'N:' (índice guardado
+    en caché) y cada pregunta se parsea cuando se usa.
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    if usar_cache:
+        offsets, _ = _cargar_con_cache(ruta_archivo, lambda: (indice.indexar_archivo(ruta_archivo), True),
+                                       dir_cache, max_mb, tipo='indice')
+    else:
+        offsets = indice.indexar_archivo(ruta_archivo)
+    return indice.BancoPerezoso(ruta_archivo, offsets)
+
+
+def cargar_desde_config(ruta_archivo, config, usar_cache=True, **kwargs_parser):
+    """Carga con caché usando las claves 'cache_dir' y 'cache_max_mb' de la configuración."""
+    return cargar_preguntas(
+        ruta_archivo,
+        usar_cache=usar_cache,
+        dir_cache=config.get('cache_dir'),
+        max_mb=config.get('cache_max_mb', MAX_MB_POR_DEFECTO),
+        **kwargs_parser
+    )
+
+
+def cargar_perezoso_desde_config(ruta_archivo, config, usar_cache=True):
+    """Como cargar_desde_config, pero devuelve un BancoPerezoso."""
+    return cargar_perezoso(
+        ruta_archivo,
+        usar_cache=usar_cache,
+        dir_cache=config.get('cache_dir'),
+        max_mb=config.get('cache_max_mb', MAX_MB_POR_DEFECTO),
+    )
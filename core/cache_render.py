@@ -0,0 +1,139 @@
+# core/cache_render.py
+# Caché de paneles ya renderizados (y datos del prompt) de cada pregunta en la CLI.
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from rich.panel import Panel
+from rich.segment import Segments
+
+try:
+    from . import perfilado
+except ImportError:
+    import perfilado
+
+TAM_CACHE_RENDER = 256 # Preguntas renderizadas que se conservan (LRU)
+
+
+class PreguntaRenderizada:
+    """Segmentos de los paneles de una pregunta para un ancho de terminal, y datos del prompt."""
+    __slots__ = ('titulo', 'enunciado', 'opciones', 'letras_validas', 'prompt_texto', 'teclas')
+
+    def __init__(self, titulo, enunciado, opciones, letras_validas, prompt_texto, teclas):
+        self.titulo = titulo
+        self.enunciado = enunciado
+        self.opciones = opciones
+        self.letras_validas = letras_validas
+        self.prompt_texto = prompt_texto
+        self.teclas = teclas
+
+
+def titulo_pregunta(pregunta, indice, total):
+    tipo_pregunta = ""
+    if pregunta.es_multiple:
+        tipo_pregunta = f" [cyan](Selección Múltiple - {len(pregunta.correctas)} opciones)[/cyan]"
+    return f"[bold yellow]Pregunta {indice}/{total} (#{pregunta.numero}){tipo_pregunta}[/bold yellow]"
+
+
+def panel_enunciado(pregunta, titulo):
+    return Panel.fit(f"[white]{pregunta.enunciado}[/white]", title=titulo, border_style="magenta", padding=(1, 2))
+
+
+def panel_opciones(pregunta):
+    opciones_texto = []
+    for idx, opcion_texto in enumerate(pregunta.opciones):
+        letra = chr(65 + idx)
+        opciones_texto.append(f"[bold cyan]{letra}.[/bold cyan] {opcion_texto}")
+    return Panel("\n".join(opciones_texto), title="Opciones", border_style="blue", padding=(1, 1))
+
+
+def datos_prompt(pregunta):
+    """(letras_validas, prompt_texto) para pedir la respuesta."""
+    letras_validas = [chr(65 + i) for i in range(len(pregunta.opciones))]
+    prompt_texto = f"Respuesta ({'/'.join(letras_validas)}):"
+    if pregunta.es_multiple:
+        prompt_texto = f"Selecciona {len(pregunta.correctas)} ({'/'.join(letras_validas)}, ej: AC):"
+    return letras_validas, prompt_texto
+
+
+def teclas_validas(letras_validas):
+    """Tecla ('a' o 'A') -> letra de opción, para validar cada pulsación con una búsqueda."""
+    teclas = {letra: letra for letra in letras_validas}
+    teclas.update({letra.lower(): letra for letra in letras_validas})
+    return teclas
+
+
+def clave_pregunta(pregunta):
+    """
+    Clave de caché con todo lo que se dibuja o se valida (Pregunta no es hashable:
+    sus listas). Dos preguntas con el mismo número y enunciado no se confunden.
+    """
+    return (pregunta.numero, pregunta.enunciado, tuple(pregunta.opciones), pregunta.mascara)
+
+
+class CacheRender:
+    """
+    Paneles de pregunta ya renderizados para el ancho actual de la consola, por
+    contenido de la pregunta (ver clave_pregunta). Si cambia el ancho del terminal, se descarta todo.
+    'precalentar' renderiza en un hilo aparte (p. ej. la siguiente pregunta
+    mientras se responde la actual); el título 'Pregunta i/total' depende de la
+    posición, así que si cambia solo se vuelve a renderizar ese panel.
+    """
+
+    def __init__(self, console, tam_maximo=TAM_CACHE_RENDER):
+        self.console = console
+        self.tam_maximo = tam_maximo
+        self._entradas = OrderedDict()
+        self._ancho = None
+        self._cerrojo = threading.Lock()
+        self._hilo = None
+
+    def _renderizar(self, panel):
+        return Segments(list(self.console.render(panel, self.console.options)), new_lines=False)
+
+    def _construir(self, pregunta, titulo):
+        letras_validas, prompt_texto = datos_prompt(pregunta)
+        return PreguntaRenderizada(titulo, self._renderizar(panel_enunciado(pregunta, titulo)),
+                                   self._renderizar(panel_opciones(pregunta)), letras_validas, prompt_texto,
+                                   teclas_validas(letras_validas))
+
+    def obtener(self, pregunta, indice, total):
+        """PreguntaRenderizada de 'pregunta' en la posición 'indice' de 'total' (la renderiza si falta)."""
+        clave = clave_pregunta(pregunta)
+        with self._cerrojo:
+            if self.console.width != self._ancho:
+                self._entradas.clear()
+                self._ancho = self.console.width
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+
+        titulo = titulo_pregunta(pregunta, indice, total)
+        if entrada is None:
+            with perfilado.tramo('cache_render.construir'):
+                entrada = self._construir(pregunta, titulo)
+        elif entrada.titulo != titulo:
+            entrada = PreguntaRenderizada(titulo, self._renderizar(panel_enunciado(pregunta, titulo)), entrada.opciones,
+                                          entrada.letras_validas, entrada.prompt_texto, entrada.teclas)
+        else:
+            return entrada
+
+        with self._cerrojo:
+            if self._ancho == self.console.width: # No guardar lo renderizado con un ancho ya obsoleto
+                self._entradas[clave] = entrada
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.tam_maximo:
+                    self._entradas.popitem(last=False)
+        return entrada
+
+    def precalentar(self, pregunta, indice, total):
+        """Renderiza la pregunta en un hilo de fondo para que 'obtener' la encuentre lista."""
+        if self._hilo is None:
+            self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cache-render')
+        self._hilo.submit(self.obtener, pregunta, indice, total)
+
+    def limpiar(self):
+        with self._cerrojo:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
@@ -0,0 +1,186 @@
+# core/calificacion_masiva.py
+# Calificación sin interfaz de hojas de respuestas (CSV o JSONL) contra un banco de preguntas.
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from rich.console import Console
+
+try:
+    from . import calificador, perfilado
+except ImportError:
+    import calificador
+    import perfilado
+
+console = Console()
+
+FORMATOS_HOJAS = ('jsonl', 'csv')
+TAM_TROZO_HOJAS = 500 # Hojas por tarea enviada a un proceso trabajador
+UMBRAL_PROCESOS = 4 << 20 # Archivos más pequeños se califican en el proceso actual
+SEPARADORES = ' ,;|/' # Separadores admitidos entre letras de una misma respuesta
+
+_mascaras_trabajador = None # Número de pregunta -> máscara correcta, en cada proceso trabajador
+
+
+def mascaras_banco(preguntas):
+    """Diccionario número de pregunta -> máscara de respuestas correctas."""
+    return {p.numero: p.mascara for p in preguntas}
+
+
+def letras_celda(valor):
+    """Letras marcadas en una respuesta: lista de letras o texto como 'AC', 'A;C' o 'a c'."""
+    if valor is None:
+        return []
+    if isinstance(valor, list):
+        return [str(v) for v in valor if v is not None]
+    return [c for c in str(valor) if c not in SEPARADORES]
+
+
+@lru_cache(maxsize=4096)
+def _leer_texto(valor):
+    """(letras, máscara) de una respuesta en texto; hay pocas distintas, así que se memorizan."""
+    letras = letras_celda(valor)
+    return ''.join(letras), calificador.mascara_respuesta(letras)
+
+
+def calificar_hoja(candidato, respuestas, mascaras):
+    """
+    Califica una hoja ({número: respuesta}) con la semántica de es_respuesta_correcta.
+    Los números que no están en el banco se devuelven aparte, en 'desconocidas'.
+    """
+    detalle = []
+    desconocidas = []
+    aciertos = 0
+    for numero, valor in respuestas.items():
+        numero = str(numero).strip()
+        mascara_correcta = mascaras.get(numero)
+        if mascara_correcta is None:
+            desconocidas.append(numero)
+            continue
+        if isinstance(valor, str):
+            respuesta, mascara = _leer_texto(valor)
+        else:
+            letras = letras_celda(valor)
+            respuesta, mascara = ''.join(letras), calificador.mascara_respuesta(letras)
+        correcta = mascara == mascara_correcta
+        aciertos += correcta
+        detalle.append({'numero': numero, 'respuesta': respuesta, 'correcta': correcta})
+
+    total = len(detalle)
+    resultado = {
+        'candidato': candidato, 'aciertos': aciertos, 'total': total,
+        'porcentaje': round(aciertos / total * 100, 2) if total else 0.0,
+        'detalle': detalle,
+    }
+    if desconocidas:
+        resultado['desconocidas'] = desconocidas
+    return resultado
+
+
+def _leer_hoja(formato, cabecera, registro):
+    """Devuelve (candidato, {número: respuesta}) de una línea JSONL o una fila CSV."""
+    if formato == 'csv':
+        # Primera columna: candidato; resto: una columna por pregunta (vacía = no incluida)
+        respuestas = {num: celda for num, celda in zip(cabecera[1:], registro[1:]) if celda.strip()}
+        return (registro[0] if registro else ''), respuestas
+
+    hoja = json.loads(registro)
+    if not isinstance(hoja, dict) or not isinstance(hoja.get('respuestas'), dict):
+        raise ValueError("Se esperaba un objeto con 'respuestas' como {número: respuesta}")
+    return hoja.get('candidato', hoja.get('id')), hoja['respuestas']
+
+
+def _iniciar_trabajador(mascaras):
+    global _mascaras_trabajador
+    _mascaras_trabajador = mascaras
+
+
+def _calificar_trozo(formato, cabecera, trozo, mascaras=None):
+    """Califica un trozo de (línea, registro). Devuelve (texto JSONL, hojas, errores)."""
+    if mascaras is None:
+        mascaras = _mascaras_trabajador
+    lineas = []
+    errores = 0
+    for num_linea, registro in trozo:
+        try:
+            candidato, respuestas = _leer_hoja(formato, cabecera, registro)
+            resultado = calificar_hoja(candidato, respuestas, mascaras)
+        except (ValueError, TypeError, AttributeError) as e:
+            resultado = {'linea': num_linea, 'error': str(e)}
+            errores += 1
+        lineas.append(json.dumps(resultado, ensure_ascii=False) + '\n')
+    return ''.join(lineas), len(trozo), errores
+
+
+def _abrir_hojas(f, formato):
+    """Devuelve (cabecera, generador de (línea, registro)) del archivo de respuestas."""
+    if formato == 'csv':
+        filas = csv.reader(f)
+        cabecera = [c.strip() for c in next(filas, [])]
+        return cabecera, ((filas.line_num, fila) for fila in filas if any(c.strip() for c in fila))
+    return None, ((n, linea) for n, linea in enumerate(f, 1) if linea.strip())
+
+
+def detectar_formato(ruta_respuestas):
+    return 'csv' if ruta_respuestas.lower().endswith('.csv') else 'jsonl'
+
+
+@perfilado.medido()
+def calificar_archivo(preguntas, ruta_respuestas, ruta_salida=None, formato=None, procesos=None):
+    """
+    Califica todas las hojas de 'ruta_respuestas' y escribe un resultado JSONL por
+    hoja (en el mismo orden) en 'ruta_salida'. Las hojas se leen y escriben por
+    trozos, sin cargar el archivo entero. 'procesos': None elige automáticamente
+    (varios procesos solo para archivos grandes), 1 califica en el proceso actual.
+    Devuelve un diccionario con las estadísticas.
+    """
+    formato = formato or detectar_formato(ruta_respuestas)
+    if formato not in FORMATOS_HOJAS:
+        raise ValueError(f"Formato de respuestas desconocido: '{formato}'. Opciones: {', '.join(FORMATOS_HOJAS)}")
+    ruta_salida = ruta_salida or os.path.splitext(ruta_respuestas)[0] + '_resultados.jsonl'
+    if procesos is None:
+        procesos = (os.cpu_count() or 1) if os.path.getsize(ruta_respuestas) >= UMBRAL_PROCESOS else 1
+
+    mascaras = mascaras_banco(preguntas)
+    hojas = errores = 0
+    inicio = time.perf_counter()
+
+    with open(ruta_respuestas, 'r', encoding='utf-8', newline='') as f, \
+         open(ruta_salida, 'w', encoding='utf-8') as salida:
+        cabecera, registros = _abrir_hojas(f, formato)
+        trozos = iter(lambda: list(islice(registros, TAM_TROZO_HOJAS)), [])
+
+        def escribir(resultado):
+            nonlocal hojas, errores
+            texto, n_hojas, n_errores = resultado
+            salida.write(texto)
+            hojas += n_hojas
+            errores += n_errores
+
+        if procesos <= 1:
+            for trozo in trozos:
+                escribir(_calificar_trozo(formato, cabecera, trozo, mascaras))
+        else:
+            with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=(mascaras,)) as pool:
+                # Pocas tareas en vuelo: memoria acotada y resultados en el orden del archivo
+                pendientes = deque()
+                for trozo in trozos:
+                    pendientes.append(pool.submit(_calificar_trozo, formato, cabecera, trozo))
+                    if len(pendientes) >= procesos * 2:
+                        escribir(pendientes.popleft().result())
+                while pendientes:
+                    escribir(pendientes.popleft().result())
+
+    segundos = time.perf_counter() - inicio
+    hojas_por_segundo = hojas / segundos if segundos > 0 else 0.0
+    console.print(f"[green]✅ {hojas} hojas calificadas en {segundos:.2f} s "
+                  f"({hojas_por_segundo:,.0f} hojas/s, {procesos} proceso(s)).[/green]")
+    console.print(f"[cyan]Resultados guardados en: {ruta_salida}[/cyan]")
+    if errores:
+        console.print(f"[yellow]⚠️ {errores} hojas no se pudieron leer (ver registros con 'error' en la salida).[/yellow]")
+    return {'hojas': hojas, 'errores': errores, 'segundos': segundos,
+            'hojas_por_segundo': hojas_por_segundo, 'procesos': procesos, 'ruta_salida': ruta_salida}
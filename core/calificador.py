@@ -0,0 +1,78 @@
+# core/calificador.py
+# Calificación por máscaras de bits: la letra 'A' es el bit 0, 'B' el bit 1, etc.
+# Una respuesta es correcta si su máscara coincide exactamente con la de la pregunta.
+
+try:
+    import numpy as np # Opcional: acelera calificar_lote
+except ImportError:
+    np = None
+
+MASCARA_INVALIDA = -1 # Respuesta con elementos que no son letras: nunca coincide
+
+_BIT_LETRA = {}
+for _k in range(26):
+    _BIT_LETRA[chr(65 + _k)] = 1 << _k
+    _BIT_LETRA[chr(97 + _k)] = 1 << _k # Minúsculas: equivalen a mayúsculas
+
+
+def mascara_letras(letras):
+    """Convierte una lista de letras ('A'..'Z') en una máscara de bits."""
+    mascara = 0
+    for letra in letras:
+        mascara |= 1 << (ord(letra) - 65)
+    return mascara
+
+
+def letras_mascara(mascara):
+    """Lista ordenada de letras de una máscara de bits."""
+    return [chr(65 + k) for k in range(mascara.bit_length()) if mascara >> k & 1]
+
+
+def mascara_respuesta(respuesta_usuario):
+    """
+    Máscara de la respuesta de un usuario: lista de letras o un solo string.
+    Ignora elementos vacíos y admite minúsculas. Si algún elemento no es una
+    letra A-Z (p. ej. 'AB' como un solo elemento) devuelve MASCARA_INVALIDA.
+    """
+    if not isinstance(respuesta_usuario, list):
+        # Convertir a lista si es un solo string (para consistencia)
+        respuesta_usuario = [respuesta_usuario] if isinstance(respuesta_usuario, str) else []
+
+    mascara = 0
+    for letra in respuesta_usuario:
+        if not letra:
+            continue
+        bit = _BIT_LETRA.get(letra)
+        if bit is None:
+            return MASCARA_INVALIDA
+        mascara |= bit
+    return mascara
+
+
+def mascaras_respuestas(respuestas):
+    """Convierte una secuencia de respuestas (listas de letras) en sus máscaras."""
+    return [mascara_respuesta(r) for r in respuestas]
+
+
+def calificar_lote(mascaras_correctas, mascaras_sesiones, usar_numpy=None):
+    """
+    Califica de una vez muchas sesiones sobre las mismas preguntas.
+    'mascaras_correctas': una máscara por pregunta (longitud Q).
+    'mascaras_sesiones': matriz sesiones x Q con la máscara de cada respuesta
+    (MASCARA_INVALIDA o cualquier valor negativo cuenta como no respondida).
+    Devuelve (aciertos, puntuaciones): matriz S x Q de booleanos y aciertos por
+    sesión. Con NumPy (si está disponible) son arrays; sin él, listas.
+    """
+    if usar_numpy is None:
+        usar_numpy = np is not None
+    if usar_numpy:
+        if np is None:
+            raise ImportError("calificar_lote(usar_numpy=True) requiere NumPy (`pip install numpy`).")
+        correctas = np.asarray(mascaras_correctas, dtype=np.int64)
+        sesiones = np.asarray(mascaras_sesiones, dtype=np.int64).reshape(-1, len(correctas))
+        aciertos = sesiones == correctas # Difusión: compara cada fila con las correctas
+        return aciertos, aciertos.sum(axis=1)
+
+    correctas = list(mascaras_correctas)
+    aciertos = [[r == c for r, c in zip(fila, correctas)] for fila in mascaras_sesiones]
+    return aciertos, [sum(fila) for fila in aciertos]
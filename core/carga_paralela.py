@@ -0,0 +1,132 @@
+# core/carga_paralela.py
+# Parseo de un archivo grande por trozos, en varios procesos.
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from rich.console import Console
+
+try:
+    from . import banco, parser, indice, perfilado
+    from .registro_parser import RegistroParser
+except ImportError:
+    import banco
+    import parser
+    import indice
+    import perfilado
+    from registro_parser import RegistroParser
+
+console = Console()
+
+UMBRAL_PARALELO = 16 << 20 # Archivos más pequeños se parsean en serie
+TAM_MIN_TROZO = 4 << 20
+TROZOS_POR_PROCESO = 4 # Más trozos que procesos para repartir mejor la carga
+
+
+def limites_trozos(ruta_archivo, num_trozos):
+    """
+    Offsets [0, ..., tamaño] que dividen el archivo en unos 'num_trozos' trozos,
+    cada uno empezando en una cabecera 'N:' (salvo el primero, que empieza en 0).
+    """
+    with open(ruta_archivo, 'rb') as f:
+        tamano = f.seek(0, 2)
+        limites = [0]
+        if tamano:
+            paso = max(tamano // max(num_trozos, 1), 1)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                pos = paso
+                while pos < tamano:
+                    m = indice.PATRON_CABECERA.search(datos, max(pos, limites[-1]))
+                    if not m:
+                        break
+                    limites.append(m.start() + 1)
+                    pos = limites[-1] + paso
+    limites.append(tamano)
+    return limites
+
+
+def _parsear_trozo(ruta_archivo, inicio, fin, motor, nivel_log, formato_log):
+    """
+    Parsea los bytes [inicio, fin) del archivo en un proceso trabajador.
+    Devuelve (banco, problemas, texto_log); los errores no se muestran aquí, sino
+    en el proceso principal y en el orden del archivo.
+    """
+    with open(ruta_archivo, 'rb') as f:
+        f.seek(inicio)
+        texto = f.read(fin - inicio).decode('utf-8')
+    texto = texto.replace('\r\n', '\n').replace('\r', '\n') # Igual que en modo texto
+
+    problemas = []
+    log = io.StringIO()
+    with RegistroParser(nivel=nivel_log, formato=formato_log).abrir(log) as registro, parser.sin_recolector():
+        constructor = banco.ConstructorBanco()
+        for pregunta in parser.iter_preguntas_de(io.StringIO(texto), problemas, motor, registro, mostrar_errores=False):
+            constructor.append(pregunta)
+    return constructor.construir(), problemas, log.getvalue()
+
+
+@perfilado.medido()
+def cargar_banco_paralelo(ruta_archivo, procesos=None, num_esperado=None, motor=parser.MOTOR_POR_DEFECTO,
+                          registro=None, problemas=None, progreso=None):
+    """
+    Como banco.cargar_banco, pero repartiendo trozos del archivo (alineados a las
+    cabeceras 'N:') entre 'procesos' procesos (None = núcleos disponibles).
+    Preguntas, errores y log se juntan en el orden del archivo, así que el
+    resultado es el mismo que en serie. Los archivos pequeños se parsean en serie.
+    'progreso(bytes, total)' se llama al juntar cada trozo (ver parser.iter_preguntas).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    try:
+        tamano = os.path.getsize(ruta_archivo)
+    except OSError:
+        tamano = 0 # El parser en serie informa del error
+    if procesos <= 1 or tamano < UMBRAL_PARALELO:
+        return banco.cargar_banco(ruta_archivo, num_esperado=num_esperado, motor=motor,
+                                  registro=registro, problemas=problemas, progreso=progreso)
+    if motor not in parser.MOTORES:
+        raise ValueError(f"Motor de parseo desconocido: '{motor}'. Opciones: {', '.join(parser.MOTORES)}")
+
+    num_trozos = min(procesos * TROZOS_POR_PROCESO, max(tamano // TAM_MIN_TROZO, procesos))
+    limites = limites_trozos(ruta_archivo, num_trozos)
+    preguntas_problematicas = problemas if problemas is not None else []
+    registro = parser.abrir_registro(registro)
+    constructor = banco.ConstructorBanco()
+
+    def juntar(resultado, fin):
+        banco_trozo, problemas_trozo, texto_log = resultado
+        for indice, (num_pregunta_str, error) in enumerate(problemas_trozo, len(preguntas_problematicas)):
+            parser.avisar_error_bloque(num_pregunta_str, error, indice)
+        preguntas_problematicas.extend(problemas_trozo)
+        registro.anexar(texto_log)
+        constructor.extender(banco_trozo)
+        if progreso:
+            progreso(fin, tamano)
+
+    try:
+        with ProcessPoolExecutor(procesos) as pool:
+            # Como mucho dos trozos por proceso en vuelo; se juntan en orden
+            pendientes = deque()
+            try:
+                for inicio, fin in zip(limites, limites[1:]):
+                    pendientes.append((pool.submit(_parsear_trozo, ruta_archivo, inicio, fin, motor,
+                                                   registro.nivel, registro.formato), fin))
+                    if len(pendientes) >= procesos * 2:
+                        futuro, fin_trozo = pendientes.popleft()
+                        juntar(futuro.result(), fin_trozo)
+                while pendientes:
+                    futuro, fin_trozo = pendientes.popleft()
+                    juntar(futuro.result(), fin_trozo)
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True) # No esperar a los trozos pendientes
+                raise
+    except Exception as e:
+        console.print(f"[bold red]❌ Error general al leer o procesar el archivo: {str(e)}[/bold red]")
+        registro.error_general(str(e))
+        return constructor.construir() # Lo que se haya podido parsear
+    finally:
+        registro.cerrar()
+
+    preguntas = constructor.construir()
+    parser.resumen_carga(preguntas, preguntas_problematicas, registro, num_esperado)
+    return preguntas
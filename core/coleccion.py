@@ -0,0 +1,160 @@
+# core/coleccion.py
+# Carga de varios archivos de preguntas (un directorio o un patrón glob) como un solo banco.
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from rich.console import Console
+from rich.table import Table
+
+try:
+    from . import banco, cache, parser, carga_paralela, perfilado
+    from .registro_parser import RegistroParser
+except ImportError:
+    import banco
+    import cache
+    import parser
+    import carga_paralela
+    import perfilado
+    from registro_parser import RegistroParser
+
+console = Console()
+
+EXTENSION_PREGUNTAS = '.txt'
+SEPARADOR_NUMERO = ':' # Número de pregunta con espacio de nombres: 'archivo:numero'
+
+
+def es_coleccion(ruta):
+    """True si 'ruta' es un directorio o un patrón glob (en lugar de un único archivo)."""
+    return os.path.isdir(ruta) or any(c in ruta for c in '*?[')
+
+
+def resolver_rutas(ruta):
+    """Archivos de preguntas (ordenados) de un directorio, un patrón glob o un solo archivo."""
+    ruta = os.path.expanduser(ruta)
+    if os.path.isdir(ruta):
+        return sorted(os.path.join(ruta, nombre) for nombre in os.listdir(ruta)
+                      if nombre.lower().endswith(EXTENSION_PREGUNTAS) and os.path.isfile(os.path.join(ruta, nombre)))
+    if es_coleccion(ruta):
+        return sorted(r for r in glob.glob(ruta, recursive=True) if os.path.isfile(r))
+    return [ruta]
+
+
+def nombres_archivos(rutas):
+    """
+    Prefijo de cada archivo para los números de pregunta: el nombre sin extensión o,
+    si dos archivos se llaman igual, la ruta relativa al directorio común.
+    """
+    nombres = [os.path.splitext(os.path.basename(r))[0] for r in rutas]
+    if len(set(nombres)) == len(nombres):
+        return nombres
+    comun = os.path.commonpath([os.path.abspath(r) for r in rutas])
+    return [os.path.splitext(os.path.relpath(os.path.abspath(r), comun))[0].replace(os.sep, '/') for r in rutas]
+
+
+def _iniciar_trabajador():
+    # Los mensajes de cada archivo se resumen en la tabla del proceso principal
+    for modulo in (parser, cache, carga_paralela):
+        modulo.console.quiet = True
+
+
+def _cargar_archivo(ruta_archivo, opciones_cache, motor, ruta_log, nivel_log, formato_log):
+    """Carga un archivo (con caché). Devuelve (banco, estadísticas, texto_log)."""
+    inicio = time.perf_counter()
+    detalles = {}
+    log = io.StringIO()
+    registro = RegistroParser(ruta_log, nivel_log, formato_log).abrir(log) # Se junta luego en 'ruta_log'
+    preguntas = cache.cargar_preguntas(ruta_archivo, detalles=detalles, motor=motor, registro=registro,
+                                       procesos=1, **opciones_cache)
+    registro.cerrar()
+    estadisticas = {
+        'ruta': ruta_archivo,
+        'preguntas': len(preguntas),
+        'problemas': len(detalles.get('problemas', [])),
+        'de_cache': detalles.get('de_cache', False),
+        'segundos': time.perf_counter() - inicio,
+    }
+    return preguntas, estadisticas, log.getvalue()
+
+
+def _cargar_archivo_trabajador(*tarea):
+    """_cargar_archivo en un proceso trabajador, que solo carga: sin recolector (ver parser.sin_recolector)."""
+    with parser.sin_recolector():
+        return _cargar_archivo(*tarea)
+
+
+def mostrar_estadisticas(estadisticas, nombres, segundos_total):
+    tabla = Table(title="Archivos de preguntas")
+    tabla.add_column("Archivo", style="cyan")
+    tabla.add_column("Preguntas", justify="right")
+    tabla.add_column("Problemas", justify="right")
+    tabla.add_column("Origen")
+    tabla.add_column("Tiempo (s)", justify="right")
+    for nombre, est in zip(nombres, estadisticas):
+        problemas = f"[yellow]{est['problemas']}[/yellow]" if est['problemas'] else "0"
+        tabla.add_row(nombre, str(est['preguntas']), problemas,
+                      "caché" if est['de_cache'] else "parseado", f"{est['segundos']:.3f}")
+    total_preguntas = sum(est['preguntas'] for est in estadisticas)
+    total_problemas = sum(est['problemas'] for est in estadisticas)
+    tabla.add_row("[bold]Total[/bold]", f"[bold]{total_preguntas}[/bold]", str(total_problemas), "",
+                  f"[bold]{segundos_total:.3f}[/bold]")
+    console.print(tabla)
+
+
+@perfilado.medido()
+def cargar_coleccion(ruta, config, usar_cache=True, motor=parser.MOTOR_POR_DEFECTO, registro=None, procesos=None,
+                     progreso=None):
+    """
+    Carga todos los archivos de un directorio o patrón glob como un solo
+    BancoPreguntas. Cada archivo se parsea (o se toma de la caché) en paralelo y
+    sus números de pregunta pasan a ser 'archivo:numero' para que no choquen.
+    Muestra una tabla con preguntas, problemas, origen y tiempo por archivo.
+    'progreso' (opcional) se llama como progreso(hechos, total, nombre) tras cada
+    archivo; si lanza una excepción, los archivos pendientes no llegan a parsearse.
+    """
+    rutas = resolver_rutas(ruta)
+    if not rutas:
+        console.print(f"[bold red]❌ No se encontraron archivos de preguntas en '{ruta}'.[/bold red]")
+        return banco.BancoPreguntas()
+
+    nombres = nombres_archivos(rutas)
+    opciones_cache = {'usar_cache': usar_cache, 'dir_cache': config.get('cache_dir'),
+                      'max_mb': config.get('cache_max_mb', cache.MAX_MB_POR_DEFECTO)}
+    registro = parser.abrir_registro(registro)
+    procesos = min(procesos or os.cpu_count() or 1, len(rutas))
+    inicio = time.perf_counter()
+
+    tareas = [(r, opciones_cache, motor, registro.ruta, registro.nivel, registro.formato) for r in rutas]
+    constructor = banco.ConstructorBanco()
+    estadisticas = []
+    try:
+        if procesos <= 1:
+            resultados = []
+            for nombre, tarea in zip(nombres, tareas):
+                resultados.append(_cargar_archivo(*tarea))
+                if progreso:
+                    progreso(len(resultados), len(tareas), nombre)
+        else:
+            with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador) as pool:
+                resultados = []
+                try:
+                    for nombre, resultado in zip(nombres, pool.map(_cargar_archivo_trabajador, *zip(*tareas))):
+                        resultados.append(resultado)
+                        if progreso:
+                            progreso(len(resultados), len(tareas), nombre)
+                except BaseException:
+                    pool.shutdown(wait=False, cancel_futures=True) # No esperar a los archivos pendientes
+                    raise
+
+        # Juntar en el orden de los archivos
+        for nombre, (preguntas, est, texto_log) in zip(nombres, resultados):
+            registro.archivo(est['ruta'])
+            registro.anexar(texto_log)
+            constructor.extender(preguntas, prefijo=nombre + SEPARADOR_NUMERO)
+            estadisticas.append(est)
+    finally:
+        registro.cerrar()
+
+    mostrar_estadisticas(estadisticas, nombres, time.perf_counter() - inicio)
+    return constructor.construir()
@@ -10,7 +10,21 @@ def cargar_configuracion():
     config = {
         'ultima_ruta': DEFAULT_RUTA_ARCHIVO,
         'ultimo_modo_interfaz': 'gui', # 'gui' o 'cli'
-        'ultimo_modo_examen_cli': '1' # Para el menú CLI
+        'ultimo_modo_examen_cli': '1', # Para el menú CLI
+        'cli_pantalla_alternativa': False, # Dibujar la CLI en la pantalla alternativa del terminal
+        'cli_entrada': 'linea', # 'linea' (respuesta + Enter) o 'tecla' (una pulsación)
+        'log_parser_ruta': 'log_parser.txt',
+        'log_parser_nivel': 'completo', # 'ninguno', 'errores' o 'completo'
+        'log_parser_formato': 'texto', # 'texto' o 'jsonl'
+        'diario_dir': 'diarios', # Diarios de sesión para --reanudar ('' o None: sin diario)
+        'diario_fsync_s': 1.0, # Segundos máximos entre fsync del diario
+        'diario_fsync_respuestas': 50, # ...o respuestas sin sincronizar antes de forzarlo
+        'diario_conservar': 20, # Diarios terminados (.diario.fin) que se guardan; 0: se borran al terminar
+        'resultados_db': 'resultados.sqlite3', # Almacén SQLite de sesiones y respuestas ('' o None: no guardar)
+        'candidato': '', # Nombre con el que se guardan las sesiones (vacío: el usuario del sistema)
+        'exportar_filas': 'respuestas_%Y%m%d.csv', # Archivo al que se añade una fila por respuesta (códigos strftime: uno por día; .jsonl, .gz)
+        'cache_dir': None, # None: ~/.cache/examen-ia
+        'cache_max_mb': 512 # Tamaño máximo de la caché de preguntas parseadas
     }
 
     if os.path.exists(CONFIG_FILE):
@@ -4,8 +4,15 @@ from rich.console import Console
 from rich.panel import Panel
 import os
 
+try:
+    from . import perfilado
+except ImportError:
+    import perfilado
+
 console = Console()
+LOG_DIAGNOSTICO = 'log_diagnostico.jsonl' # Log de errores (JSONL) que genera el diagnóstico
 
+@perfilado.medido()
 def diagnosticar_archivo(ruta_archivo):
     """
     Analiza en detalle el archivo de preguntas para detectar problemas.
@@ -66,31 +73,36 @@ def diagnosticar_archivo(ruta_archivo):
         preguntas_con_error = 0
 
         # Usamos el parser para un análisis más profundo
-        # Necesitamos importar Pregunta del parser
         try:
-            from .parser import cargar_preguntas, Pregunta
+            from . import parser, registro_parser
         except ImportError:
-            from parser import cargar_preguntas, Pregunta
+            import parser
+            import registro_parser
 
-        # Ejecutamos el parser en modo "silencioso" para diagnóstico
+        # Ejecutamos el parser en modo "silencioso", registrando solo los errores en JSONL
         console_original = parser.console # Guardar consola original
         parser.console = Console(quiet=True) # Suprimir output del parser
-        preguntas_parseadas = cargar_preguntas(ruta_archivo)
-        parser.console = console_original # Restaurar
+        registro = registro_parser.RegistroParser(LOG_DIAGNOSTICO, nivel='errores', formato='jsonl')
+        try:
+            preguntas_parseadas = parser.cargar_preguntas(ruta_archivo, registro=registro)
+        finally:
+            parser.console = console_original # Restaurar
 
         num_parseadas_ok = len(preguntas_parseadas)
         console.print(f"  - El parser logró cargar [bold {'green' if num_parseadas_ok == num_preguntas_detectadas else 'yellow'}] {num_parseadas_ok} / {num_preguntas_detectadas} [/] preguntas detectadas.")
 
-        # Revisar logs del parser si existe
-        log_parser = 'log_parser.txt'
-        if os.path.exists(log_parser):
-             with open(log_parser, 'r', encoding='utf-8') as log_f:
-                  log_content = log_f.read()
-                  if "*** ERROR" in log_content:
-                       preguntas_con_error = log_content.count("*** ERROR")
-                       problemas.append(f"[red]Se encontraron {preguntas_con_error} errores graves durante el parseo (ver {log_parser}).[/red]")
+        # Revisar los errores registrados por el parser
+        if os.path.exists(LOG_DIAGNOSTICO):
+             errores = registro_parser.leer_errores(LOG_DIAGNOSTICO)
+             if errores:
+                  preguntas_con_error = len(errores)
+                  problemas.append(f"[red]Se encontraron {preguntas_con_error} errores graves durante el parseo (ver {LOG_DIAGNOSTICO}).[/red]")
+                  for error in errores[:10]: # Mostrar solo los primeros
+                       console.print(f"  - [red]{error['mensaje']}[/red]")
+                  if len(errores) > 10:
+                       console.print(f"  - [grey50]... y {len(errores) - 10} más.[/grey50]")
         else:
-             console.print(f"  - No se encontró el archivo de log '{log_parser}'.")
+             console.print(f"  - No se encontró el archivo de log '{LOG_DIAGNOSTICO}'.")
 
 
         if num_parseadas_ok < num_preguntas_detectadas:
@@ -105,9 +117,10 @@ def diagnosticar_archivo(ruta_archivo):
     else:
         console.print("\n[bold green]✅ Diagnóstico básico no encontró problemas obvios de formato.[/bold green]")
 
-    console.print(f"\n[grey50]Para un análisis más detallado, revise el archivo [bold]{log_parser}[/bold] si fue generado.[/grey50]")
+    console.print(f"\n[grey50]Para un análisis más detallado, revise el archivo [bold]{LOG_DIAGNOSTICO}[/bold] si fue generado.[/grey50]")
 
 
+@perfilado.medido()
 def analizar_preguntas_faltantes(ruta_archivo, rango_max=63): # Asumir 63 por defecto basado en script anterior
     """Detecta huecos y duplicados en la numeración de preguntas."""
     console.print(Panel(f"[bold cyan]Análisis de Numeración en: {ruta_archivo}[/bold cyan]", expand=False))
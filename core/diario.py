@@ -0,0 +1,271 @@
+# core/diario.py
+# Diario de sesiones: cada respuesta se añade a un archivo en cuanto se da, para
+# poder reanudar el examen (--reanudar) si el programa se cierra a mitad.
+#
+# Formato (texto, una línea por registro, campos separados por tabuladores):
+#   S <id> <cabecera JSON>           inicio de sesión (orden, modo, archivo...)
+#   R <id> <indice> <letras> <numero> respuesta a la pregunta 'indice' (la última gana)
+#   F <id>                           sesión terminada
+# Varias sesiones pueden compartir un diario (p. ej. en un servidor): un solo fsync
+# cubre las respuestas de todas.
+import glob
+import json
+import os
+import threading
+import time
+from rich.console import Console
+
+try:
+    from . import sesion as sesion_examen
+except ImportError:
+    import sesion as sesion_examen
+
+console = Console()
+
+VERSION_DIARIO = 1
+EXTENSION = '.diario'
+SUFIJO_TERMINADO = '.fin' # Se añade al cerrar un diario sin sesiones pendientes
+FSYNC_INTERVALO_S = 1.0
+FSYNC_RESPUESTAS = 50
+CONSERVAR_TERMINADOS = 20 # Diarios '.fin' que se guardan; los más antiguos se borran
+
+
+class EstadoSesion:
+    """Una sesión leída de un diario: cabecera, respuestas (letras, numero) por orden y si terminó."""
+    __slots__ = ('id', 'cabecera', 'respuestas', 'terminada')
+
+    def __init__(self, id_sesion, cabecera):
+        self.id = id_sesion
+        self.cabecera = cabecera
+        self.respuestas = []
+        self.terminada = False
+
+
+class Diario:
+    """
+    Archivo de diario abierto para añadir. Cada registro se pasa al sistema al
+    escribirlo (sobrevive a que se cierre el programa); el fsync (que sobreviva a
+    un corte de luz) se agrupa: cada 'intervalo_s' segundos desde un hilo aparte,
+    o en cuanto hay 'max_pendientes' registros sin sincronizar.
+    """
+
+    def __init__(self, ruta, intervalo_s=FSYNC_INTERVALO_S, max_pendientes=FSYNC_RESPUESTAS,
+                 conservar_terminados=CONSERVAR_TERMINADOS):
+        self.ruta = ruta
+        self.conservar_terminados = conservar_terminados
+        self.intervalo_s = intervalo_s
+        self.max_pendientes = max(1, max_pendientes)
+        self._archivo = open(ruta, 'a', encoding='utf-8', newline='\n')
+        self._cerrojo = threading.Lock()
+        self._pendientes = 0
+        self._abiertas = set() # Sesiones iniciadas y no terminadas
+        self._cerrado = threading.Event()
+        self._hilo = None
+        if intervalo_s > 0:
+            self._hilo = threading.Thread(target=self._sincronizar_periodicamente, name='diario-fsync', daemon=True)
+            self._hilo.start()
+
+    def _escribir(self, linea):
+        with self._cerrojo:
+            self._archivo.write(linea)
+            self._archivo.flush()
+            self._pendientes += 1
+            lleno = self._pendientes >= self.max_pendientes
+        if lleno:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """fsync de todo lo escrito hasta ahora (no hace nada si no hay registros pendientes)."""
+        with self._cerrojo:
+            if not self._pendientes or self._archivo.closed:
+                return
+            self._pendientes = 0
+            descriptor = self._archivo.fileno()
+        os.fsync(descriptor) # Fuera del cerrojo: las demás sesiones siguen escribiendo
+
+    def _sincronizar_periodicamente(self):
+        while not self._cerrado.wait(self.intervalo_s):
+            try:
+                self.sincronizar()
+            except (OSError, ValueError): # Archivo cerrado entre la comprobación y el fsync
+                pass
+
+    def iniciar_sesion(self, id_sesion, orden, modo, **datos):
+        """
+        Anota el inicio de una sesión: 'orden' son los índices en el banco de sus
+        preguntas y 'modo' uno de sesion.MODOS_SESION; 'datos' va también a la cabecera.
+        """
+        cabecera = {'version': VERSION_DIARIO, 'modo': modo, 'orden': list(orden), **datos}
+        self._abiertas.add(id_sesion)
+        self._escribir(f"S\t{id_sesion}\t{json.dumps(cabecera, ensure_ascii=False)}\n")
+
+    def continuar_sesion(self, id_sesion):
+        """Sigue anotando una sesión que se inició en este diario y se está reanudando."""
+        self._abiertas.add(id_sesion)
+
+    def anotar(self, id_sesion, indice, respuesta, numero):
+        """Anota la respuesta (lista de letras) a la pregunta 'indice' de la sesión."""
+        self._escribir(f"R\t{id_sesion}\t{indice}\t{''.join(respuesta)}\t{numero}\n")
+
+    def terminar_sesion(self, id_sesion):
+        self._abiertas.discard(id_sesion)
+        self._escribir(f"F\t{id_sesion}\n")
+
+    def cerrar(self):
+        """
+        Sincroniza y cierra. Si no quedan sesiones sin terminar, renombra el diario a
+        '.fin' y borra los terminados que pasen de 'conservar_terminados' (0: este también).
+        """
+        if self._archivo.closed:
+            return
+        self._cerrado.set()
+        self.sincronizar()
+        with self._cerrojo:
+            self._archivo.close()
+        if self._abiertas:
+            return
+        try:
+            if self.conservar_terminados > 0:
+                os.replace(self.ruta, self.ruta + SUFIJO_TERMINADO)
+                podar_terminados(os.path.dirname(self.ruta), self.conservar_terminados)
+            else:
+                os.remove(self.ruta)
+        except OSError as e:
+            console.print(f"[yellow]⚠️ No se pudo retirar el diario terminado '{self.ruta}': {e}[/yellow]")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class _DiarioNulo:
+    """Sustituto sin efecto cuando el diario está desactivado o no se pudo crear."""
+    ruta = None
+
+    def iniciar_sesion(self, id_sesion, orden, modo, **datos):
+        pass
+
+    def continuar_sesion(self, id_sesion):
+        pass
+
+    def anotar(self, id_sesion, indice, respuesta, numero):
+        pass
+
+    def terminar_sesion(self, id_sesion):
+        pass
+
+    def sincronizar(self):
+        pass
+
+    def cerrar(self):
+        pass
+
+
+DIARIO_NULO = _DiarioNulo()
+
+
+def podar_terminados(directorio, conservar=CONSERVAR_TERMINADOS):
+    """Borra los diarios terminados de 'directorio' salvo los 'conservar' más recientes. Devuelve cuántos borró."""
+    rutas = sorted(glob.glob(os.path.join(directorio or '.', '*' + EXTENSION + SUFIJO_TERMINADO)),
+                   key=os.path.getmtime, reverse=True)
+    borrados = 0
+    for ruta in rutas[max(conservar, 0):]:
+        try:
+            os.remove(ruta)
+            borrados += 1
+        except FileNotFoundError: # Otro proceso que cerraba a la vez
+            pass
+    return borrados
+
+
+def crear_desde_config(config, ruta=None):
+    """
+    Abre el diario 'ruta' (para reanudar) o uno nuevo en 'diario_dir' de la
+    configuración. Si está desactivado ('diario_dir' vacío) o no se puede crear,
+    devuelve DIARIO_NULO para que el examen siga sin diario.
+    """
+    directorio = config.get('diario_dir', 'diarios')
+    if ruta is None and not directorio:
+        return DIARIO_NULO
+    try:
+        if ruta is None:
+            os.makedirs(directorio, exist_ok=True)
+            ruta = os.path.join(directorio, f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}{EXTENSION}")
+        return Diario(ruta, intervalo_s=config.get('diario_fsync_s', FSYNC_INTERVALO_S),
+                      max_pendientes=config.get('diario_fsync_respuestas', FSYNC_RESPUESTAS),
+                      conservar_terminados=config.get('diario_conservar', CONSERVAR_TERMINADOS))
+    except OSError as e:
+        console.print(f"[yellow]⚠️ No se pudo abrir el diario de la sesión ({e}); las respuestas no se guardarán "
+                      f"hasta exportar.[/yellow]")
+        return DIARIO_NULO
+
+
+def leer(ruta):
+    """
+    Lee un diario y devuelve {id: EstadoSesion}, en orden de inicio. Una última
+    línea incompleta (corte a mitad de escritura) se descarta.
+    """
+    with open(ruta, 'r', encoding='utf-8', newline='\n') as f:
+        lineas = f.read().split('\n')
+    lineas.pop() # Lo que sigue al último '\n': vacío, o un registro a medio escribir
+
+    sesiones = {}
+    for linea in lineas:
+        campos = linea.split('\t', 4)
+        if campos[0] == 'R': # El caso frecuente primero: una línea por respuesta
+            estado = sesiones.get(campos[1])
+            if estado is None:
+                continue
+            respuestas = estado.respuestas
+            indice = int(campos[2])
+            if indice == len(respuestas):
+                respuestas.append((campos[3], campos[4]))
+            elif indice < len(respuestas):
+                respuestas[indice] = (campos[3], campos[4]) # Respuesta cambiada al volver atrás
+        elif campos[0] == 'S':
+            sesiones[campos[1]] = EstadoSesion(campos[1], json.loads('\t'.join(campos[2:])))
+        elif campos[0] == 'F' and campos[1] in sesiones:
+            sesiones[campos[1]].terminada = True
+    return sesiones
+
+
+def buscar_pendiente(config, ruta_diario=None, ruta_archivo=None):
+    """
+    (ruta_diario, EstadoSesion) de la última sesión sin terminar: en 'ruta_diario'
+    o, si no se indica, en los diarios de 'diario_dir' (del más reciente al más
+    antiguo). Con 'ruta_archivo', solo las de ese banco de preguntas. None si no hay.
+    """
+    if ruta_diario:
+        rutas = [ruta_diario]
+    else:
+        directorio = config.get('diario_dir', 'diarios') or 'diarios'
+        rutas = sorted(glob.glob(os.path.join(directorio, '*' + EXTENSION)), key=os.path.getmtime, reverse=True)
+    archivo = os.path.abspath(ruta_archivo) if ruta_archivo else None
+    for ruta in rutas:
+        try:
+            sesiones = leer(ruta)
+        except (OSError, ValueError) as e:
+            console.print(f"[yellow]⚠️ Diario ilegible '{ruta}': {e}[/yellow]")
+            continue
+        for estado in reversed(list(sesiones.values())):
+            if not estado.terminada and (archivo is None or estado.cabecera.get('archivo') == archivo):
+                return ruta, estado
+    return None
+
+
+def restaurar_sesion(preguntas, estado):
+    """
+    SesionExamen de 'estado' con sus respuestas ya aplicadas, para seguir en la
+    pregunta siguiente. Lanza ValueError si el banco no es el del diario.
+    """
+    cabecera = estado.cabecera
+    orden = cabecera['orden']
+    if orden and max(orden) >= len(preguntas):
+        raise ValueError("El banco de preguntas tiene menos preguntas que cuando se inició la sesión.")
+    examen = sesion_examen.SesionExamen(preguntas, candidato=cabecera.get('candidato', ''),
+                                        modo=cabecera.get('modo', 'examen'), orden=orden, id_sesion=estado.id)
+    examen.inicio = cabecera.get('inicio', examen.inicio)
+    examen.reproducir(estado.respuestas)
+    return examen
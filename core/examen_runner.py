@@ -1,25 +1,37 @@
 # core/examen_runner.py
-import random
+import contextlib
 import os
+import statistics
 import time
 from rich.console import Console
+from rich.control import Control, ControlType
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm # Confirm para sí/no
-from rich.progress import track
+from rich.text import Text
 
 # Requerido para que funcione desde main.py
 try:
     # Intenta importar como si core fuera un paquete
-    from . import parser, exportador, diagnostico, config as app_config
+    from . import parser, exportador, diagnostico, calificador, perfilado, cache_render, teclado, sesion, diario, almacen, config as app_config
 except ImportError:
     # Si falla (ej. ejecutado directamente), importa normalmente
     import parser
     import exportador
     import diagnostico
+    import calificador
+    import perfilado
+    import cache_render
+    import teclado
+    import sesion
+    import diario
+    import almacen
     import config as app_config
 
 
 console = Console()
+cache_preguntas = cache_render.CacheRender(console) # Paneles ya renderizados de cada pregunta
+MODOS_ENTRADA = ('linea', 'tecla') # Respuesta con Enter o con una sola pulsación
+modo_entrada = 'linea' # Lo fija iniciar_cli según la configuración
 
 # --- Lógica Común ---
 def es_respuesta_correcta(pregunta: parser.Pregunta, respuesta_usuario):
@@ -27,48 +39,53 @@ def es_respuesta_correcta(pregunta: parser.Pregunta, respuesta_usuario):
     Valida si la respuesta proporcionada por el usuario es correcta.
     'respuesta_usuario' debe ser una lista de strings (letras).
     """
-    if not isinstance(respuesta_usuario, list):
-        # Convertir a lista si es un solo string (para consistencia)
-        respuesta_usuario = [respuesta_usuario] if isinstance(respuesta_usuario, str) else []
-
-    # Comparar conjuntos para ignorar orden y duplicados
-    respuesta_set = set(r.upper() for r in respuesta_usuario if r) # Limpiar y asegurar mayúsculas
-    correctas_set = set(pregunta.correctas) # Ya están en mayúsculas y validadas por el parser
-
-    # Debug detallado (opcional, comentar para producción)
-    # console.print(f"[grey50]Debug Check: Usuario={respuesta_set} vs Correctas={correctas_set}[/grey50]")
-
-    return respuesta_set == correctas_set
+    # Comparar máscaras de bits: ignora orden, duplicados y mayúsculas/minúsculas
+    return calificador.mascara_respuesta(respuesta_usuario) == pregunta.mascara
 
 # --- Lógica Específica de CLI ---
 
-def mostrar_pregunta_cli(pregunta: parser.Pregunta, indice, total):
-    """Muestra la pregunta formateada para la CLI usando Rich."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+def limpiar_pantalla():
+    """Limpia el terminal con códigos de escape (sin lanzar 'clear'/'cls' en un proceso aparte)."""
+    with perfilado.tramo('examen_runner.limpiar_pantalla'):
+        console.clear() # No hace nada si la salida no es un terminal
 
-    tipo_pregunta = ""
-    if pregunta.es_multiple:
-        tipo_pregunta = f" [cyan](Selección Múltiple - {len(pregunta.correctas)} opciones)[/cyan]"
-
-    titulo_panel = f"[bold yellow]Pregunta {indice}/{total} (#{pregunta.numero}){tipo_pregunta}[/bold yellow]"
-    panel_pregunta = Panel.fit(f"[white]{pregunta.enunciado}[/white]", title=titulo_panel, border_style="magenta", padding=(1, 2))
-    console.print(panel_pregunta)
 
-    opciones_texto = []
-    for idx, opcion_texto in enumerate(pregunta.opciones):
-        letra = chr(65 + idx)
-        opciones_texto.append(f"[bold cyan]{letra}.[/bold cyan] {opcion_texto}")
+def cabecera_progreso(descripcion, indice, total, ancho_barra=40):
+    """Línea de progreso del examen; se dibuja con cada pregunta en lugar de una barra 'track' aparte."""
+    completas = ancho_barra * (indice - 1) // max(total, 1)
+    fondo = "━" if console.color_system else " " # Sin colores, la parte pendiente se deja en blanco
+    return Text.assemble((descripcion, "bold"), " ", ("━" * completas, "bar.complete"),
+                         (fondo * (ancho_barra - completas), "bar.back"), " ", (f"{indice - 1}/{total}", "cyan"))
 
-    panel_opciones = Panel("\n".join(opciones_texto), title="Opciones", border_style="blue", padding=(1,1))
-    console.print(panel_opciones)
 
-def esperar_respuesta_cli(pregunta: parser.Pregunta) -> list[str]:
+@perfilado.medido()
+def mostrar_pregunta_cli(pregunta: parser.Pregunta, indice, total, descripcion=None):
+    """
+    Muestra la pregunta formateada para la CLI usando Rich. Los paneles salen
+    de la caché de renderizado; devuelve la PreguntaRenderizada (datos del prompt).
+    """
+    renderizada = cache_preguntas.obtener(pregunta, indice, total)
+    with console: # Limpiar y dibujar en una sola escritura, sin parpadeo
+        limpiar_pantalla()
+        if descripcion:
+            console.print(cabecera_progreso(descripcion, indice, total))
+        console.print(renderizada.enunciado)
+        console.print(renderizada.opciones)
+    return renderizada
+
+@perfilado.medido()
+def esperar_respuesta_cli(pregunta: parser.Pregunta, renderizada=None) -> list[str]:
     """Espera y valida la respuesta del usuario en modo CLI."""
     num_correctas = len(pregunta.correctas)
-    letras_validas = [chr(65 + i) for i in range(len(pregunta.opciones))]
-    prompt_texto = f"Respuesta ({'/'.join(letras_validas)}):"
-    if pregunta.es_multiple:
-        prompt_texto = f"Selecciona {num_correctas} ({'/'.join(letras_validas)}, ej: AC):"
+    if renderizada is not None:
+        letras_validas, prompt_texto = renderizada.letras_validas, renderizada.prompt_texto
+        teclas = renderizada.teclas
+    else:
+        letras_validas, prompt_texto = cache_render.datos_prompt(pregunta)
+        teclas = cache_render.teclas_validas(letras_validas)
+
+    if modo_entrada == 'tecla':
+        return _esperar_tecla(pregunta, teclas, prompt_texto)
 
     while True:
         try:
@@ -106,6 +123,77 @@ def esperar_respuesta_cli(pregunta: parser.Pregunta) -> list[str]:
              # Podríamos decidir qué hacer aquí, por ahora reintentamos
 
 
+def _esperar_tecla(pregunta, teclas, prompt_texto):
+    """
+    Respuesta con teclas sueltas: en selección única basta una pulsación; en
+    múltiple, cada letra se marca o desmarca y Enter confirma.
+    """
+    num_correctas = len(pregunta.correctas)
+    if pregunta.es_multiple:
+        prompt_texto += " [grey50](letras para marcar, Enter para confirmar)[/grey50]"
+    seleccion = []
+    console.print(f"[bold green]{prompt_texto}[/bold green] ", end="")
+    try:
+        with teclado.teclas() as leer:
+            while True:
+                tecla = leer()
+                if tecla == teclado.FIN:
+                    raise KeyboardInterrupt
+                letra = teclas.get(tecla)
+
+                if not pregunta.es_multiple:
+                    if letra:
+                        console.print(f"[bold cyan]{letra}[/bold cyan]")
+                        return [letra]
+                    if tecla is not teclado.OTRA:
+                        console.bell()
+                    continue
+
+                if letra:
+                    if letra in seleccion:
+                        seleccion.remove(letra)
+                    else:
+                        seleccion.append(letra)
+                elif tecla == teclado.ENTER and len(seleccion) == num_correctas:
+                    console.print()
+                    return sorted(seleccion)
+                else:
+                    console.bell() # Tecla no válida o cantidad incorrecta al confirmar
+                    continue
+                # Redibujar la línea del prompt con la selección actual
+                console.control(Control.move_to_column(0), Control((ControlType.ERASE_IN_LINE, 2)))
+                console.print(f"[bold green]{prompt_texto}[/bold green] [bold cyan]{' '.join(sorted(seleccion))}[/bold cyan]",
+                              end="")
+    except KeyboardInterrupt:
+        console.print("[yellow]\nInterrupción detectada. Volviendo al menú...[/yellow]")
+        return ["INTERRUPT"] # Señal para salir del modo
+
+
+def pausar(mensaje="Presione Enter para continuar..."):
+    """Espera a que se pulse Enter (con la entrada 'tecla', cualquier tecla)."""
+    if modo_entrada != 'tecla':
+        input(mensaje)
+        return
+    console.print(mensaje.replace("Enter", "una tecla"), end="")
+    with teclado.teclas() as leer:
+        tecla = leer()
+    console.print()
+    if tecla == teclado.FIN:
+        raise KeyboardInterrupt
+
+
+def mostrar_latencias(latencias):
+    """Tiempo que tardó cada respuesta (desde que se mostró la pregunta): media, mediana y p95."""
+    if not latencias:
+        return
+    ordenadas = sorted(latencias)
+    p95 = ordenadas[max(0, -(-len(ordenadas) * 95 // 100) - 1)]
+    console.print(f"[cyan]⏱️ Tiempo por respuesta ({len(latencias)} respuestas, entrada '{modo_entrada}'): "
+                  f"media {statistics.fmean(latencias):.2f} s, mediana {statistics.median(ordenadas):.2f} s, "
+                  f"p95 {p95:.2f} s[/cyan]")
+
+
+@perfilado.medido()
 def mostrar_feedback_cli(pregunta: parser.Pregunta, respuesta_usuario: list[str]):
     """Muestra el feedback detallado en la CLI."""
     es_correcta = es_respuesta_correcta(pregunta, respuesta_usuario)
@@ -134,9 +222,11 @@ def mostrar_feedback_cli(pregunta: parser.Pregunta, respuesta_usuario: list[str]
     console.print("="*70 + "\n")
 
 
-def mostrar_resultado_cli(resultados: list[tuple], total_preguntas: int, ruta_archivo: str):
+@perfilado.medido()
+def mostrar_resultado_cli(resultados: list[tuple], total_preguntas: int, ruta_archivo: str, latencias=None,
+                          id_sesion=None):
     """Muestra el resultado final y ofrece exportación en CLI."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    limpiar_pantalla()
     console.print(Panel("[bold]📊 Resultados Finales 📊[/bold]", style="bold blue", expand=False))
 
     aciertos = sum(1 for _, correcta, _ in resultados if correcta)
@@ -144,6 +234,7 @@ def mostrar_resultado_cli(resultados: list[tuple], total_preguntas: int, ruta_ar
 
     estilo_puntuacion = "green" if puntuacion >= 80 else ("yellow" if puntuacion >= 60 else "red")
     console.print(f"\n[bold {estilo_puntuacion}]Puntuación Final: {puntuacion:.2f}% ({aciertos} de {total_preguntas})[/bold {estilo_puntuacion}]\n")
+    mostrar_latencias(latencias)
 
     # Ver detalle
     if Confirm.ask("¿Desea ver el detalle de las respuestas?", default=False):
@@ -170,86 +261,145 @@ def mostrar_resultado_cli(resultados: list[tuple], total_preguntas: int, ruta_ar
         default_filename_txt = f"resultados_{base_name}_{timestamp}.txt"
         default_filename_pdf = f"resultados_{base_name}_{timestamp}.pdf"
 
-        formato = Prompt.ask("Formato de exportación", choices=["txt", "pdf", "ambos"], default="txt")
+        formato = Prompt.ask("Formato de exportación ('filas': una fila por respuesta, para análisis)",
+                             choices=["txt", "pdf", "ambos", "filas"], default="txt")
 
         try:
             # Adaptar resultados al formato esperado por exportador si es necesario
             # El exportador espera lista de tuplas: (pregunta_obj, respuesta_usuario_lista)
             resultados_export = [(p, resp) for p, _, resp in resultados]
+            correctas = [correcta for _, correcta, _ in resultados] # Ya calificadas: el exportador no repite
 
             if formato in ["txt", "ambos"]:
-                exportador.exportar_txt(resultados_export, aciertos, total_preguntas, default_filename_txt)
+                exportador.exportar_txt(resultados_export, aciertos, total_preguntas, default_filename_txt, correctas)
                 console.print(f"[green]✅ Resultados exportados a {default_filename_txt}[/green]")
             if formato in ["pdf", "ambos"]:
-                exportador.exportar_pdf(resultados_export, aciertos, total_preguntas, default_filename_pdf)
+                exportador.exportar_pdf(resultados_export, aciertos, total_preguntas, default_filename_pdf, correctas)
                 console.print(f"[green]✅ Resultados exportados a {default_filename_pdf}[/green]")
+            if formato == "filas":
+                config = app_config.cargar_configuracion()
+                # Las respuestas restauradas de un diario no tienen tiempo: las latencias son las últimas
+                tiempos = [None] * (len(resultados) - len(latencias or [])) + list(latencias or [])
+                sesion_export = exportador.ResultadoSesion(almacen.candidato_por_defecto(config), id_sesion or '',
+                                                           resultados_export, aciertos, total_preguntas, correctas, tiempos)
+                exportador.exportar_respuestas([sesion_export], config.get('exportar_filas') or 'respuestas_%Y%m%d.csv')
         except Exception as e:
             console.print(f"[red]❌ Error al exportar resultados: {e}[/red]")
 
 
-def modo_paso_a_paso_cli(preguntas: list, ruta_archivo: str):
-    """Modo CLI con feedback inmediato."""
-    if not preguntas:
-         console.print("[red]No hay preguntas cargadas para este modo.[/red]")
-         return
-
-    aciertos = 0
-    resultados_finales = [] # Para resumen aunque no se use mucho aquí
+def abrir_sesion(preguntas, ruta_archivo: str, modo: str, aleatorio=False, num_preguntas=None, reanudar=None):
+    """
+    SesionExamen nueva (o la de 'reanudar' = (ruta_diario, estado), con sus
+    respuestas ya aplicadas) y el diario donde se anota cada respuesta.
+    """
+    config = app_config.cargar_configuracion()
+    if reanudar is not None:
+        ruta_diario, estado = reanudar
+        examen = diario.restaurar_sesion(preguntas, estado)
+        registro = diario.crear_desde_config(config, ruta_diario)
+        registro.continuar_sesion(examen.id)
+        console.print(f"[cyan]Reanudando la sesión en la pregunta {examen.indice + 1} de {len(examen)}.[/cyan]")
+    else:
+        examen = sesion.SesionExamen(preguntas, num_preguntas=num_preguntas, aleatorio=aleatorio, modo=modo)
+        registro = diario.crear_desde_config(config)
+        registro.iniciar_sesion(examen.id, examen.orden, modo, inicio=examen.inicio,
+                                archivo=os.path.abspath(ruta_archivo), interfaz='cli')
+    return examen, registro
 
-    for i, pregunta in enumerate(track(preguntas, description="📝 Resolviendo paso a paso..."), start=1):
-        mostrar_pregunta_cli(pregunta, i, len(preguntas))
-        respuesta_usuario = esperar_respuesta_cli(pregunta)
 
-        if respuesta_usuario == ["INTERRUPT"]: break # Salir si se interrumpió
+def cerrar_sesion(examen, registro, ruta_archivo: str):
+    """
+    Cierra el diario (la sesión queda pendiente de reanudar si no se respondieron
+    todas) y guarda la sesión en el almacén de resultados.
+    """
+    if examen.terminada:
+        registro.terminar_sesion(examen.id)
+    registro.cerrar()
+    almacen.guardar_desde_config(app_config.cargar_configuracion(), ruta_archivo, examen.detalle(),
+                                 id_sesion=examen.id, interfaz='cli', modo=examen.modo, inicio=examen.inicio,
+                                 total=len(examen))
 
-        es_correcta = es_respuesta_correcta(pregunta, respuesta_usuario)
-        if es_correcta:
-            aciertos += 1
 
-        mostrar_feedback_cli(pregunta, respuesta_usuario)
-        resultados_finales.append((pregunta, es_correcta, respuesta_usuario))
+def modo_paso_a_paso_cli(preguntas: list, ruta_archivo: str, aleatorio=False, num_preguntas=None, reanudar=None):
+    """Modo CLI con feedback inmediato."""
+    if not preguntas:
+         console.print("[red]No hay preguntas cargadas para este modo.[/red]")
+         return
 
-        # Pausa antes de la siguiente
-        if i < len(preguntas):
-             try:
-                  input("Presione Enter para continuar...")
-             except KeyboardInterrupt:
-                  console.print("[yellow]\nInterrupción detectada. Finalizando modo...[/yellow]")
-                  break
+    examen, registro = abrir_sesion(preguntas, ruta_archivo, 'paso_a_paso', aleatorio, num_preguntas, reanudar)
+    latencias = [] # Segundos desde que se muestra cada pregunta hasta que se responde
+
+    try:
+        while not examen.terminada:
+            i = examen.indice + 1
+            pregunta = examen.pregunta_actual()
+            renderizada = mostrar_pregunta_cli(pregunta, i, len(examen), "📝 Resolviendo paso a paso...")
+            if i < len(examen):
+                cache_preguntas.precalentar(examen.pregunta_en(i), i + 1, len(examen)) # Mientras se responde
+            inicio = time.perf_counter()
+            respuesta_usuario = esperar_respuesta_cli(pregunta, renderizada)
+
+            if respuesta_usuario == ["INTERRUPT"]: break # Salir si se interrumpió
+            latencias.append(time.perf_counter() - inicio)
+
+            examen.responder(respuesta_usuario)
+            registro.anotar(examen.id, i - 1, respuesta_usuario, pregunta.numero)
+            mostrar_feedback_cli(pregunta, respuesta_usuario)
+
+            # Pausa antes de la siguiente
+            if not examen.terminada:
+                 try:
+                      pausar()
+                 except KeyboardInterrupt:
+                      console.print("[yellow]\nInterrupción detectada. Finalizando modo...[/yellow]")
+                      break
+    finally:
+        cerrar_sesion(examen, registro, ruta_archivo)
 
 
     console.print("\n[bold blue]--- Fin del Modo Paso a Paso ---[/bold blue]")
+    resultados_finales = examen.detalle()
     if resultados_finales:
-        mostrar_resultado_cli(resultados_finales, len(resultados_finales), ruta_archivo)
+        mostrar_resultado_cli(resultados_finales, len(resultados_finales), ruta_archivo, latencias, examen.id)
 
 
-def modo_examen_cli(preguntas: list, ruta_archivo: str):
+def modo_examen_cli(preguntas: list, ruta_archivo: str, aleatorio=False, reanudar=None):
     """Modo CLI tipo examen sin feedback inmediato, muestra resultado al final."""
     if not preguntas:
          console.print("[red]No hay preguntas cargadas para este modo.[/red]")
          return
 
-    respuestas_usuario_final = [] # Lista de tuplas: (pregunta_obj, correcta_bool, respuesta_usr_list)
+    examen, registro = abrir_sesion(preguntas, ruta_archivo, 'examen', aleatorio, reanudar=reanudar)
+    latencias = [] # Segundos desde que se muestra cada pregunta hasta que se responde
 
     interrumpido = False
-    for i, pregunta in enumerate(track(preguntas, description="📝 Completando examen..."), start=1):
-        mostrar_pregunta_cli(pregunta, i, len(preguntas))
-        respuesta_usuario = esperar_respuesta_cli(pregunta)
-
-        if respuesta_usuario == ["INTERRUPT"]:
-             interrumpido = True
-             break
-
-        es_correcta = es_respuesta_correcta(pregunta, respuesta_usuario)
-        respuestas_usuario_final.append((pregunta, es_correcta, respuesta_usuario))
-        # No mostrar feedback aquí
+    try:
+        while not examen.terminada:
+            i = examen.indice + 1
+            pregunta = examen.pregunta_actual()
+            renderizada = mostrar_pregunta_cli(pregunta, i, len(examen), "📝 Completando examen...")
+            if i < len(examen):
+                cache_preguntas.precalentar(examen.pregunta_en(i), i + 1, len(examen)) # Mientras se responde
+            inicio = time.perf_counter()
+            respuesta_usuario = esperar_respuesta_cli(pregunta, renderizada)
+
+            if respuesta_usuario == ["INTERRUPT"]:
+                 interrumpido = True
+                 break
+            latencias.append(time.perf_counter() - inicio)
+
+            examen.responder(respuesta_usuario) # No mostrar feedback aquí
+            registro.anotar(examen.id, i - 1, respuesta_usuario, pregunta.numero)
+    finally:
+        cerrar_sesion(examen, registro, ruta_archivo)
 
     console.print("\n[bold blue]--- Fin del Examen ---[/bold blue]")
     if interrumpido:
-         console.print("[yellow]El examen fue interrumpido.[/yellow]")
+         console.print("[yellow]El examen fue interrumpido; puede continuarlo con --reanudar.[/yellow]")
 
+    respuestas_usuario_final = examen.detalle() # Lista de tuplas: (pregunta_obj, correcta_bool, respuesta_usr_list)
     if respuestas_usuario_final:
-         mostrar_resultado_cli(respuestas_usuario_final, len(preguntas), ruta_archivo) # Mostrar resultado sobre el total original
+         mostrar_resultado_cli(respuestas_usuario_final, len(examen), ruta_archivo, latencias, examen.id) # Mostrar resultado sobre el total original
 
 
 def modo_practica_limitada_cli(preguntas_totales: list, ruta_archivo: str):
@@ -275,16 +425,28 @@ def modo_practica_limitada_cli(preguntas_totales: list, ruta_archivo: str):
              console.print("[yellow]\nSelección cancelada.[/yellow]")
              return
 
-    preguntas_seleccionadas = random.sample(preguntas_totales, num_preguntas)
     console.print(f"\n[cyan]Iniciando práctica con {num_preguntas} preguntas aleatorias...[/cyan]")
-    # Usamos el modo paso a paso para la práctica
-    modo_paso_a_paso_cli(preguntas_seleccionadas, ruta_archivo)
+    # Usamos el modo paso a paso para la práctica; la sesión sortea los índices, así que
+    # con un banco perezoso solo se parsean las preguntas elegidas
+    modo_paso_a_paso_cli(preguntas_totales, ruta_archivo, aleatorio=True, num_preguntas=num_preguntas)
+
+
+def reanudar_cli(preguntas, ruta_archivo: str, reanudar):
+    """Continúa en su modo la sesión del diario 'reanudar' = (ruta_diario, estado)."""
+    ruta_diario, estado = reanudar
+    try:
+        if estado.cabecera.get('modo') == 'paso_a_paso':
+            modo_paso_a_paso_cli(preguntas, ruta_archivo, reanudar=reanudar)
+        else:
+            modo_examen_cli(preguntas, ruta_archivo, reanudar=reanudar)
+    except ValueError as e:
+        console.print(f"[bold red]❌ No se puede reanudar la sesión de '{ruta_diario}': {e}[/bold red]")
 
 
 def menu_diagnostico_cli(ruta_archivo: str):
     """Muestra menú de diagnóstico CLI."""
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        limpiar_pantalla()
         console.print(Panel("[bold blue]🔧 Menú de Diagnóstico 🔧[/bold blue]", expand=False))
         console.print(f"[cyan]Archivo actual: {ruta_archivo}[/cyan]\n")
         console.print("1. Diagnóstico General (Formato Básico)")
@@ -311,7 +473,7 @@ def menu_diagnostico_cli(ruta_archivo: str):
 
 def mostrar_menu_cli(config_actual: dict) -> str:
     """Muestra el menú principal de CLI y devuelve la opción seleccionada."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    limpiar_pantalla()
     ultimo_modo = config_actual.get('ultimo_modo_examen_cli', '1')
 
     menu_texto = (
@@ -336,31 +498,55 @@ def mostrar_menu_cli(config_actual: dict) -> str:
 
     return opcion
 
-def iniciar_cli(preguntas: list, ruta_archivo: str, modo_directo: str = None):
+def elegir_modo_entrada(entrada):
+    """Fija cómo se responde en la CLI ('linea' o 'tecla'); sin terminal, siempre 'linea'."""
+    global modo_entrada
+    if entrada not in MODOS_ENTRADA:
+        console.print(f"[yellow]⚠️ Modo de entrada desconocido '{entrada}'; se usará 'linea'.[/yellow]")
+        entrada = 'linea'
+    elif entrada == 'tecla' and not teclado.disponible():
+        console.print("[yellow]⚠️ La entrada no es un terminal: se responderá con Enter (modo 'linea').[/yellow]")
+        entrada = 'linea'
+    modo_entrada = entrada
+
+
+def iniciar_cli(preguntas: list, ruta_archivo: str, modo_directo: str = None, entrada: str = None, reanudar=None):
     """Bucle principal para la interfaz de línea de comandos."""
     console.print("[bold green]--- Interfaz de Línea de Comandos Activada ---[/bold green]")
 
     config = app_config.cargar_configuracion() # Cargar config para menú
+    elegir_modo_entrada(entrada or config.get('cli_entrada', 'linea'))
+
+    # Pantalla alternativa del terminal (como vim o less): al salir se recupera lo que había antes
+    pantalla = console.screen(hide_cursor=False) if config.get('cli_pantalla_alternativa') else contextlib.nullcontext()
+    with pantalla:
+        if reanudar is not None:
+            reanudar_cli(preguntas, ruta_archivo, reanudar)
+        if reanudar is None or not modo_directo:
+            _bucle_cli(preguntas, ruta_archivo, modo_directo, config)
+
+    # Guardar configuración al salir del bucle CLI
+    app_config.guardar_configuracion({'ultimo_modo_examen_cli': config.get('ultimo_modo_examen_cli', '1')})
+    console.print("[bold cyan]Saliendo del modo CLI.[/bold cyan]")
 
+
+def _bucle_cli(preguntas, ruta_archivo, modo_directo, config):
     modo = modo_directo # Usar modo directo si se pasó por argumento
 
     while True:
         if not modo: # Si no hay modo directo, mostrar menú
             modo = mostrar_menu_cli(config)
 
-        preguntas_a_usar = list(preguntas) # Copiar para no modificar la original con shuffle
-
-        # Aleatorizar si corresponde
-        if modo in ['2', '4', '5']:
-            random.shuffle(preguntas_a_usar)
+        # La sesión guarda el orden como índices del banco (sin copiarlo ni desordenarlo)
+        aleatorio = modo in ['2', '4']
 
         # Ejecutar modo
         if modo == '1' or modo == '2':
-             modo_paso_a_paso_cli(preguntas_a_usar, ruta_archivo)
+             modo_paso_a_paso_cli(preguntas, ruta_archivo, aleatorio)
         elif modo == '3' or modo == '4':
-             modo_examen_cli(preguntas_a_usar, ruta_archivo)
+             modo_examen_cli(preguntas, ruta_archivo, aleatorio)
         elif modo == '5':
-             modo_practica_limitada_cli(preguntas_a_usar, ruta_archivo)
+             modo_practica_limitada_cli(preguntas, ruta_archivo)
         elif modo == '6':
              menu_diagnostico_cli(ruta_archivo)
         elif modo == '7':
@@ -372,8 +558,4 @@ def iniciar_cli(preguntas: list, ruta_archivo: str, modo_directo: str = None):
 
         # Resetear modo para volver a mostrar el menú en la siguiente iteración
         modo = None
-        input("\nPresione Enter para volver al menú principal...")
-
-    # Guardar configuración al salir del bucle CLI
-    app_config.guardar_configuracion({'ultimo_modo_examen_cli': config.get('ultimo_modo_examen_cli', '1')})
-    console.print("[bold cyan]Saliendo del modo CLI.[/bold cyan]")
\ No newline at end of file
+        input("\nPresione Enter para volver al menú principal...")
\ No newline at end of file
@@ -1,14 +1,27 @@
 # core/exportador.py
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from fpdf import FPDF
+import csv
+import gzip
+import io
+import json
+import math
+import threading
 import time
 import os
+import re
 from rich.console import Console
 
 # Requerido para que funcione desde main.py o examen_runner.py
 try:
     from . import parser # Asume que parser está en el mismo directorio
+    from . import perfilado, calificador
 except ImportError:
     import parser # Fallback si se ejecuta de otra forma
+    import perfilado
+    import calificador
 
 console = Console()
 
@@ -18,39 +31,69 @@ def clean_text(text):
     # Reemplazar caracteres no compatibles
     return text.encode('latin-1', 'replace').decode('latin-1')
 
-def exportar_txt(resultados: list[tuple], aciertos: int, total: int, ruta='resultados.txt'):
+TAM_BUFFER = 1 << 16 # Escrituras de 64 KiB: miles de líneas por llamada al sistema
+FORMATOS_LOTE = ('txt', 'pdf')
+TAM_TROZO_PDF = 8 # Sesiones por tarea al exportar PDF en paralelo
+FORMATOS_FILAS = ('csv', 'jsonl')
+COLUMNAS_FILAS = ('sesion', 'candidato', 'posicion', 'numero', 'mascara', 'letras', 'correcta', 'tiempo_ms')
+FILAS_POR_ESCRITURA = 20_000 # Filas que se acumulan antes de cada escritura (un miembro gzip cada una)
+MAX_BLOQUES_PDF = 50_000 # Textos recordados por InformePDF antes de vaciar la caché
+FECHA_CREACION_PDF = re.compile(r'/CreationDate \(D:\d{14}\)')
+
+# Resultados de una sesión listos para exportar; 'correctas' es la corrección de cada
+# respuesta ya calculada (o None para calificarlas al exportar) y 'tiempos' los
+# segundos que tardó cada una (opcional, para exportar_respuestas)
+ResultadoSesion = namedtuple('ResultadoSesion', ['candidato', 'id', 'resultados', 'aciertos', 'total', 'correctas',
+                                                 'tiempos'], defaults=(None,))
+
+
+def resultado_de_sesion(sesion):
+    """ResultadoSesion de una sesion.SesionExamen, reutilizando su corrección."""
+    resultados = sesion.resultados()
+    return ResultadoSesion(sesion.candidato, sesion.id, resultados, sesion.aciertos, len(resultados),
+                           sesion.acertadas, sesion.tiempos)
+
+
+def _correctas_de(resultados, correctas=None):
+    """La corrección ya calculada o, si no se da, la de calificar cada respuesta por su máscara."""
+    if correctas is not None:
+        return correctas
+    return [calificador.mascara_respuesta(respuesta) == pregunta.mascara for pregunta, respuesta in resultados]
+
+
+def escribir_txt(f, resultados, aciertos, total, correctas=None, progreso=None):
+    """
+    Escribe el informe TXT de una sesión en el flujo de texto 'f'.
+    'progreso' (opcional) se llama como progreso(hechas, total) tras cada respuesta.
+    """
+    f.write(f"Resultados del Examen - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    puntuacion = (aciertos / total) * 100 if total > 0 else 0
+    f.write(f"Puntuación: {puntuacion:.2f}% ({aciertos}/{total})\n\n")
+    f.write("--- Detalle de Respuestas ---\n")
+
+    for i, ((pregunta, respuesta_usuario), correcta) in enumerate(zip(resultados, _correctas_de(resultados, correctas)), 1):
+        estado = 'Correcta' if correcta else 'Incorrecta'
+        resp_usr_str = ", ".join(sorted(respuesta_usuario)) if respuesta_usuario else "(ninguna)"
+        bloque = (f"\n{i}. Pregunta #{pregunta.numero}: {estado}\n"
+                  f"   Enunciado: {pregunta.enunciado}\n"
+                  f"   Tu respuesta: {resp_usr_str}\n")
+        if not correcta:
+            bloque += f"   Respuesta correcta: {', '.join(sorted(pregunta.correctas))}\n"
+        f.write(bloque)
+        if progreso:
+            progreso(i, len(resultados))
+
+
+@perfilado.medido()
+def exportar_txt(resultados: list[tuple], aciertos: int, total: int, ruta='resultados.txt', correctas=None):
     """
     Exporta los resultados a un archivo TXT.
     'resultados' es una lista de tuplas: (pregunta_obj, respuesta_usuario_lista)
+    'correctas' (opcional): si cada respuesta fue correcta, para no volver a calificarlas.
     """
     try:
-        with open(ruta, 'w', encoding='utf-8') as f:
-            f.write(f"Resultados del Examen - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            puntuacion = (aciertos / total) * 100 if total > 0 else 0
-            f.write(f"Puntuación: {puntuacion:.2f}% ({aciertos}/{total})\n\n")
-            f.write("--- Detalle de Respuestas ---\n")
-
-            for i, (pregunta, respuesta_usuario) in enumerate(resultados, 1):
-                # Necesitamos re-evaluar la corrección aquí si no viene en los datos
-                # Asumimos que es_respuesta_correcta está disponible o la reimportamos
-                try:
-                     from .examen_runner import es_respuesta_correcta
-                except ImportError:
-                     from examen_runner import es_respuesta_correcta # Fallback
-
-                correcta = es_respuesta_correcta(pregunta, respuesta_usuario)
-                estado = 'Correcta' if correcta else 'Incorrecta'
-                resp_usr_str = ", ".join(sorted(respuesta_usuario)) if respuesta_usuario else "(ninguna)"
-                resp_corr_str = ", ".join(sorted(pregunta.correctas))
-
-                f.write(f"\n{i}. Pregunta #{pregunta.numero}: {estado}\n")
-                f.write(f"   Enunciado: {pregunta.enunciado}\n") # Guardar enunciado
-                # Opciones (opcional pero útil)
-                # for idx, opt_txt in enumerate(pregunta.opciones):
-                #      f.write(f"     {chr(65+idx)}. {opt_txt}\n")
-                f.write(f"   Tu respuesta: {resp_usr_str}\n")
-                if not correcta:
-                    f.write(f"   Respuesta correcta: {resp_corr_str}\n")
+        with open(ruta, 'w', encoding='utf-8', buffering=TAM_BUFFER) as f:
+            escribir_txt(f, resultados, aciertos, total, correctas)
 
         console.print(f"[green]Resultados guardados en TXT: {ruta}[/green]")
 
@@ -58,67 +101,364 @@ def exportar_txt(resultados: list[tuple], aciertos: int, total: int, ruta='resul
         console.print(f"[red]Error al exportar a TXT: {e}[/red]")
 
 
-def exportar_pdf(resultados: list[tuple], aciertos: int, total: int, ruta='resultados.pdf'):
+class InformePDF(FPDF):
+    """
+    FPDF que recuerda cómo reparte multi_cell cada texto en líneas (y su espaciado)
+    y lo repite sin volver a medirlo letra a letra: los enunciados son los mismos en
+    todos los informes de un examen. El PDF resultante es idéntico al de FPDF.
+    """
+    bloques = {} # Clave del texto y su formato -> operaciones; compartido por los informes del proceso
+
+    def multi_cell(self, w, h, txt='', border=0, align='J', fill=0, split_only=False):
+        if border or fill or split_only or self.unifontsubset or self.x != self.l_margin:
+            return super().multi_cell(w, h, txt, border, align, fill, split_only)
+        clave = (txt, self.font_family, self.font_style, self.font_size_pt, w, h, align,
+                 self.w, self.l_margin, self.r_margin, self.c_margin)
+        operaciones = self.bloques.get(clave)
+        if operaciones is None:
+            if len(self.bloques) >= MAX_BLOQUES_PDF:
+                self.bloques.clear()
+            operaciones = self.bloques[clave] = self._grabar(w, h, txt, align)
+        for tipo, valor, texto in operaciones:
+            if tipo == 'celda':
+                self.cell(valor, h, texto, 0, 2, align, 0)
+            else: # Cambio del espaciado entre palabras (justificado)
+                self.ws = valor
+                self._out(texto)
+        self.x = self.l_margin
+
+    def _grabar(self, w, h, txt, align):
+        """Operaciones que haría multi_cell, sin dibujar nada: ('celda', ancho, texto) y ('tw', ws, salida)."""
+        operaciones = []
+        ws = self.ws
+        self.cell = lambda ancho, alto=0, texto='', *args, **kwargs: operaciones.append(('celda', ancho, texto))
+        self._out = lambda texto: operaciones.append(('tw', self.ws, texto))
+        try:
+            super().multi_cell(w, h, txt, 0, align, 0)
+        finally:
+            del self.cell, self._out # Vuelven a ser los métodos de la clase
+            self.ws = ws
+            self.x = self.l_margin
+        return operaciones
+
+
+def guardar_pdf(pdf, ruta, fecha=None):
+    """
+    Escribe el PDF en 'ruta'. Con 'fecha' ('AAAAMMDDhhmmss') fija la fecha de
+    creación del documento, así dos ejecuciones con los mismos datos dan los mismos bytes.
+    """
+    pdf.close()
+    if fecha:
+        pdf.buffer = FECHA_CREACION_PDF.sub(f'/CreationDate (D:{fecha})', pdf.buffer, count=1)
+    pdf.output(ruta, 'F')
+
+
+def documento_pdf(resultados, aciertos, total, correctas=None, progreso=None):
+    """FPDF con el informe de una sesión (sin escribir). 'progreso' como en escribir_txt."""
+    pdf = InformePDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12) # Usar fuente estándar compatible
+
+    # Título
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, txt="Resultados del Examen", ln=True, align='C')
+    pdf.ln(5)
+
+    # Puntuación
+    pdf.set_font("Arial", 'B', 14)
+    puntuacion = (aciertos / total) * 100 if total > 0 else 0
+    pdf.cell(0, 10, txt=f"Puntuacion: {puntuacion:.2f}% ({aciertos}/{total})", ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font("Arial", size=10) # Tamaño más pequeño para detalles
+
+    for i, ((pregunta, respuesta_usuario), correcta) in enumerate(zip(resultados, _correctas_de(resultados, correctas)), 1):
+        estado = 'Correcta' if correcta else 'Incorrecta'
+        resp_usr_str = ", ".join(sorted(respuesta_usuario)) if respuesta_usuario else "(ninguna)"
+        resp_corr_str = ", ".join(sorted(pregunta.correctas))
+
+        # Encabezado de pregunta
+        pdf.set_font("Arial", 'B', 10)
+        pdf.multi_cell(0, 5, txt=clean_text(f"{i}. Pregunta #{pregunta.numero}: {estado}"))
+        pdf.set_font("Arial", size=10)
+
+        # Enunciado (limpiado)
+        pdf.multi_cell(0, 5, txt=clean_text(f"   Enunciado: {pregunta.enunciado}"))
+
+        # Respuesta Usuario
+        pdf.multi_cell(0, 5, txt=clean_text(f"   Tu respuesta: {resp_usr_str}"))
+
+        # Respuesta Correcta (si falló)
+        if not correcta:
+            pdf.set_font("Arial", 'I', 10) # Cursiva para la correcta
+            pdf.multi_cell(0, 5, txt=clean_text(f"   Respuesta correcta: {resp_corr_str}"))
+            pdf.set_font("Arial", size=10) # Volver a normal
+
+        pdf.ln(4) # Espacio entre preguntas
+
+        # Control de salto de página (simple)
+        if pdf.get_y() > 260: # Cerca del final de la página
+            pdf.add_page()
+            pdf.set_font("Arial", size=10) # Restablecer fuente en nueva página
+        if progreso:
+            progreso(i, len(resultados))
+    return pdf
+
+
+@perfilado.medido()
+def exportar_pdf(resultados: list[tuple], aciertos: int, total: int, ruta='resultados.pdf', correctas=None,
+                 fecha=None):
     """
     Exporta los resultados a un archivo PDF.
     'resultados' es una lista de tuplas: (pregunta_obj, respuesta_usuario_lista)
+    'correctas' (opcional): si cada respuesta fue correcta, para no volver a calificarlas.
+    'fecha' (opcional, 'AAAAMMDDhhmmss'): fecha de creación fija, como en exportar_lote;
+    con la misma fecha, el PDF es idéntico byte a byte al del lote.
     """
     try:
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12) # Usar fuente estándar compatible
+        guardar_pdf(documento_pdf(resultados, aciertos, total, correctas), ruta, fecha)
+        console.print(f"[green]Resultados guardados en PDF: {ruta}[/green]")
+
+    except Exception as e:
+        console.print(f"[red]Error al exportar a PDF: {e}[/red]")
+        console.print("[yellow]Asegúrate de que la librería FPDF está instalada (`pip install fpdf`).[/yellow]")
 
-        # Título
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, txt="Resultados del Examen", ln=True, align='C')
-        pdf.ln(5)
 
-        # Puntuación
-        pdf.set_font("Arial", 'B', 14)
-        puntuacion = (aciertos / total) * 100 if total > 0 else 0
-        pdf.cell(0, 10, txt=f"Puntuacion: {puntuacion:.2f}% ({aciertos}/{total})", ln=True, align='C')
-        pdf.ln(10)
+def nombre_candidato(candidato):
+    """Nombre de archivo seguro para un candidato."""
+    return re.sub(r'[^\w.-]', '_', candidato or '') or 'anonimo'
 
-        pdf.set_font("Arial", size=10) # Tamaño más pequeño para detalles
 
-        for i, (pregunta, respuesta_usuario) in enumerate(resultados, 1):
-            # Re-evaluar corrección
+def _exportar_trozo_pdf(trozo, directorio, fecha):
+    """Escribe el PDF de cada sesión del trozo (también en un proceso trabajador). Devuelve (archivos, páginas, errores)."""
+    archivos = paginas = 0
+    errores = []
+    for sesion in trozo:
+        try:
+            pdf = documento_pdf(sesion.resultados, sesion.aciertos, sesion.total, sesion.correctas)
+            guardar_pdf(pdf, os.path.join(directorio, f"{nombre_candidato(sesion.candidato)}_{sesion.id}.pdf"), fecha)
+            archivos += 1
+            paginas += pdf.page
+        except Exception as e:
+            errores.append(f"sesión {sesion.id} ({sesion.candidato}): {e}")
+    return archivos, paginas, errores
+
+
+@perfilado.medido()
+def exportar_lote(sesiones, formato='txt', ruta=None, directorio=None, procesos=1, fecha=None):
+    """
+    Exporta muchas sesiones (iterable de ResultadoSesion o de sesion.SesionExamen)
+    sin tenerlas todas en memoria:
+    - 'ruta': un informe TXT combinado con todas las sesiones.
+    - 'directorio': un archivo por candidato (TXT, con sus sesiones una tras otra)
+      o uno por sesión (PDF, '<candidato>_<id>.pdf').
+    Los PDF se reparten entre 'procesos' procesos (None: todos los núcleos) y llevan
+    todos la misma fecha de creación ('fecha', 'AAAAMMDDhhmmss'; por defecto, la de
+    inicio del lote): la salida no depende del número de procesos.
+    Devuelve {'sesiones', 'archivos', 'errores', 'segundos'} (y 'paginas', 'paginas_s' en PDF).
+    """
+    if formato not in FORMATOS_LOTE:
+        raise ValueError(f"Formato desconocido: '{formato}'. Opciones: {', '.join(FORMATOS_LOTE)}")
+    if (ruta is None) == (directorio is None):
+        raise ValueError("Indica 'ruta' (informe combinado) o 'directorio' (un archivo por candidato).")
+    if ruta is not None and formato != 'txt':
+        raise ValueError("El informe combinado solo está disponible en TXT.")
+
+    inicio = time.perf_counter()
+    sesiones = (s if isinstance(s, ResultadoSesion) else resultado_de_sesion(s) for s in sesiones)
+    cuenta = {'sesiones': 0, 'archivos': 0, 'errores': 0}
+    if ruta is not None:
+        with open(ruta, 'w', encoding='utf-8', buffering=TAM_BUFFER) as f:
+            suma_porcentajes = 0.0
+            for sesion in sesiones:
+                f.write(f"\n===== Candidato: {sesion.candidato or '(anónimo)'} - Sesión {sesion.id} =====\n")
+                escribir_txt(f, sesion.resultados, sesion.aciertos, sesion.total, sesion.correctas)
+                suma_porcentajes += sesion.aciertos / sesion.total * 100 if sesion.total else 0
+                cuenta['sesiones'] += 1
+            media = suma_porcentajes / cuenta['sesiones'] if cuenta['sesiones'] else 0
+            f.write(f"\n===== Sesiones: {cuenta['sesiones']}  Puntuación media: {media:.2f}% =====\n")
+        cuenta['archivos'] = 1
+    elif formato == 'txt':
+        os.makedirs(directorio, exist_ok=True)
+        vistos = set() # Candidatos con archivo TXT ya creado en este lote: sus siguientes sesiones se añaden
+        for sesion in sesiones:
+            nombre = nombre_candidato(sesion.candidato)
             try:
-                 from .examen_runner import es_respuesta_correcta
-            except ImportError:
-                 from examen_runner import es_respuesta_correcta # Fallback
-            correcta = es_respuesta_correcta(pregunta, respuesta_usuario)
-            estado = 'Correcta' if correcta else 'Incorrecta'
-            resp_usr_str = ", ".join(sorted(respuesta_usuario)) if respuesta_usuario else "(ninguna)"
-            resp_corr_str = ", ".join(sorted(pregunta.correctas))
-
-            # Encabezado de pregunta
-            pdf.set_font("Arial", 'B', 10)
-            pdf.multi_cell(0, 5, txt=clean_text(f"{i}. Pregunta #{pregunta.numero}: {estado}"))
-            pdf.set_font("Arial", size=10)
-
-            # Enunciado (limpiado)
-            pdf.multi_cell(0, 5, txt=clean_text(f"   Enunciado: {pregunta.enunciado}"))
-
-            # Respuesta Usuario
-            pdf.multi_cell(0, 5, txt=clean_text(f"   Tu respuesta: {resp_usr_str}"))
-
-            # Respuesta Correcta (si falló)
-            if not correcta:
-                pdf.set_font("Arial", 'I', 10) # Cursiva para la correcta
-                pdf.multi_cell(0, 5, txt=clean_text(f"   Respuesta correcta: {resp_corr_str}"))
-                pdf.set_font("Arial", size=10) # Volver a normal
-
-            pdf.ln(4) # Espacio entre preguntas
-
-            # Control de salto de página (simple)
-            if pdf.get_y() > 260: # Cerca del final de la página
-                pdf.add_page()
-                pdf.set_font("Arial", size=10) # Restablecer fuente en nueva página
-
-        pdf.output(ruta)
-        console.print(f"[green]Resultados guardados en PDF: {ruta}[/green]")
+                with open(os.path.join(directorio, f"{nombre}.txt"), 'a' if nombre in vistos else 'w',
+                          encoding='utf-8', buffering=TAM_BUFFER) as f:
+                    escribir_txt(f, sesion.resultados, sesion.aciertos, sesion.total, sesion.correctas)
+                cuenta['archivos'] += nombre not in vistos
+                vistos.add(nombre)
+            except Exception as e:
+                console.print(f"[red]Error al exportar la sesión {sesion.id} ({sesion.candidato}): {e}[/red]")
+                cuenta['errores'] += 1
+            cuenta['sesiones'] += 1
+    else:
+        os.makedirs(directorio, exist_ok=True)
+        procesos = procesos or os.cpu_count() or 1
+        fecha = fecha or time.strftime('%Y%m%d%H%M%S')
+        cuenta['paginas'] = 0
+        trozos = iter(lambda: list(islice(sesiones, TAM_TROZO_PDF)), [])
+
+        def juntar(trozo, resultado):
+            archivos, paginas, errores = resultado
+            cuenta['sesiones'] += len(trozo)
+            cuenta['archivos'] += archivos
+            cuenta['paginas'] += paginas
+            cuenta['errores'] += len(errores)
+            for error in errores:
+                console.print(f"[red]Error al exportar la {error}[/red]")
+
+        if procesos <= 1:
+            for trozo in trozos:
+                juntar(trozo, _exportar_trozo_pdf(trozo, directorio, fecha))
+        else:
+            with ProcessPoolExecutor(procesos) as pool:
+                # Pocas tareas en vuelo: la memoria no crece con el número de sesiones
+                pendientes = deque()
+                for trozo in trozos:
+                    pendientes.append((trozo, pool.submit(_exportar_trozo_pdf, trozo, directorio, fecha)))
+                    if len(pendientes) >= procesos * 2:
+                        trozo_hecho, futuro = pendientes.popleft()
+                        juntar(trozo_hecho, futuro.result())
+                while pendientes:
+                    trozo_hecho, futuro = pendientes.popleft()
+                    juntar(trozo_hecho, futuro.result())
+
+    segundos = time.perf_counter() - inicio
+    cuenta['segundos'] = round(segundos, 3)
+    detalle = ''
+    if 'paginas' in cuenta:
+        cuenta['paginas_s'] = round(cuenta['paginas'] / segundos, 1) if segundos > 0 else 0.0
+        detalle = f", {cuenta['paginas']} páginas, {cuenta['paginas_s']:,.1f} páginas/s, {procesos} proceso(s)"
+    console.print(f"[green]✅ {cuenta['sesiones']} sesiones exportadas en {cuenta['archivos']} archivo(s) "
+                  f"({cuenta['segundos']:.2f} s{detalle}).[/green]")
+    return cuenta
+
+# --- Filas para análisis (una por sesión y pregunta) ---
+
+_cerrojo_filas = threading.Lock() # Las sesiones del servidor terminan en hilos distintos
+
+
+def formato_filas(ruta):
+    """'csv' o 'jsonl' según la extensión de 'ruta' (sin contar '.gz')."""
+    base = ruta[:-3] if ruta.lower().endswith('.gz') else ruta
+    formato = os.path.splitext(base)[1].lower().lstrip('.')
+    if formato not in FORMATOS_FILAS:
+        raise ValueError(f"Extensión no soportada para exportar filas: '{ruta}'. Usa .csv o .jsonl (y .gz para comprimir).")
+    return formato
+
+
+def filas_sesion(sesion):
+    """Filas (tuplas con COLUMNAS_FILAS) de un ResultadoSesion: una por pregunta respondida."""
+    tiempos = sesion.tiempos if sesion.tiempos is not None else ()
+    for i, ((pregunta, respuesta), correcta) in enumerate(zip(sesion.resultados, _correctas_de(sesion.resultados,
+                                                                                               sesion.correctas))):
+        tiempo = tiempos[i] if i < len(tiempos) else None
+        yield (sesion.id, sesion.candidato, i + 1, str(pregunta.numero), calificador.mascara_respuesta(respuesta),
+               ''.join(sorted(respuesta or [])), int(bool(correcta)),
+               None if tiempo is None or math.isnan(tiempo) else round(tiempo * 1000))
+
+
+def _texto_filas(filas, formato):
+    if formato == 'jsonl':
+        return ''.join(json.dumps(dict(zip(COLUMNAS_FILAS, fila)), ensure_ascii=False) + '\n' for fila in filas)
+    texto = io.StringIO()
+    csv.writer(texto, lineterminator='\n').writerows(filas)
+    return texto.getvalue()
+
+
+def _añadir(ruta, texto, formato):
+    """Añade 'texto' al final de 'ruta' en una sola escritura (con gzip, como un miembro más del archivo)."""
+    with _cerrojo_filas:
+        nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        if nuevo and formato == 'csv':
+            texto = ','.join(COLUMNAS_FILAS) + '\n' + texto
+        datos = texto.encode('utf-8')
+        if ruta.lower().endswith('.gz'):
+            datos = gzip.compress(datos, compresslevel=6, mtime=0)
+        with open(ruta, 'ab') as f:
+            f.write(datos)
+
+
+@perfilado.medido()
+def exportar_respuestas(sesiones, ruta):
+    """
+    Añade a 'ruta' una fila por (sesión, pregunta) de 'sesiones' (iterable de
+    ResultadoSesion o sesion.SesionExamen): número de pregunta, letras elegidas
+    como máscara de bits y como texto, si fue correcta y el tiempo en ms.
+    'ruta' termina en .csv o .jsonl (más .gz para comprimir) y admite códigos de
+    time.strftime ('respuestas_%Y%m%d.csv': un archivo por día). Lo que ya tenía
+    el archivo no se reescribe. Devuelve (ruta, filas añadidas).
+    """
+    ruta = time.strftime(ruta)
+    formato = formato_filas(ruta)
+    if os.path.dirname(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    total = 0
+    pendientes = []
+    for sesion in sesiones:
+        pendientes.extend(filas_sesion(sesion if isinstance(sesion, ResultadoSesion) else resultado_de_sesion(sesion)))
+        if len(pendientes) >= FILAS_POR_ESCRITURA:
+            _añadir(ruta, _texto_filas(pendientes, formato), formato)
+            total += len(pendientes)
+            pendientes = []
+    if pendientes:
+        _añadir(ruta, _texto_filas(pendientes, formato), formato)
+        total += len(pendientes)
+    console.print(f"[green]{total} respuestas añadidas a: {ruta}[/green]")
+    return ruta, total
+
+
+def _fmt(valor, formato='.3f'):
+    return '-' if valor is None else format(valor, formato)
+
+
+@perfilado.medido()
+def exportar_analisis_txt(filas: list[dict], ruta='analisis_items.txt'):
+    """
+    Exporta el informe de análisis de ítems (analisis.AnalisisItems.informe) a TXT,
+    en el orden recibido (de peor a mejor ítem).
+    """
+    try:
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(f"Análisis de Ítems - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Ítems: {len(filas)}  (p = proporción de aciertos; r = discriminación punto-biserial)\n")
+            for fila in filas:
+                f.write(f"\nPregunta #{fila['numero']} ({os.path.basename(fila['archivo'])}): "
+                        f"p={_fmt(fila['p'])} r={_fmt(fila['discriminacion'])} "
+                        f"intentos={fila['intentos']} en blanco={fila['blancos']:.1%}\n")
+                for opcion in fila['opciones']:
+                    marca = '*' if opcion['correcta'] else ' '
+                    f.write(f"   {marca} {opcion['letra']}. {opcion['tasa']:6.1%}  "
+                            f"media del resto: {_fmt(opcion['media_resto'], '.2f')}\n")
+                if fila['alertas']:
+                    f.write(f"   Revisar: {'; '.join(fila['alertas'])}\n")
+
+        console.print(f"[green]Análisis de ítems guardado en TXT: {ruta}[/green]")
 
     except Exception as e:
-        console.print(f"[red]Error al exportar a PDF: {e}[/red]")
-        console.print("[yellow]Asegúrate de que la librería FPDF está instalada (`pip install fpdf`).[/yellow]")
\ No newline at end of file
+        console.print(f"[red]Error al exportar el análisis a TXT: {e}[/red]")
+
+
+@perfilado.medido()
+def exportar_analisis_csv(filas: list[dict], ruta='analisis_items.csv'):
+    """Exporta el informe de análisis de ítems a CSV: una fila por ítem, una columna por opción."""
+    try:
+        num_opciones = max((len(fila['opciones']) for fila in filas), default=0)
+        letras = [chr(65 + k) for k in range(num_opciones)]
+        with open(ruta, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['archivo', 'numero', 'intentos', 'p', 'discriminacion', 'blancos', 'correctas',
+                               *(f'opcion_{letra}' for letra in letras), 'alertas'])
+            for fila in filas:
+                tasas = [f"{opcion['tasa']:.4f}" for opcion in fila['opciones']]
+                escritor.writerow([fila['archivo'], fila['numero'], fila['intentos'], f"{fila['p']:.4f}",
+                                   '' if fila['discriminacion'] is None else f"{fila['discriminacion']:.4f}",
+                                   f"{fila['blancos']:.4f}", fila['correctas'],
+                                   *tasas, *[''] * (num_opciones - len(tasas)), '; '.join(fila['alertas'])])
+
+        console.print(f"[green]Análisis de ítems guardado en CSV: {ruta}[/green]")
+
+    except Exception as e:
+        console.print(f"[red]Error al exportar el análisis a CSV: {e}[/red]")
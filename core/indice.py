@@ -0,0 +1,133 @@
+# core/indice.py
+# Índice de offsets de las cabeceras 'N:' y banco que parsea cada pregunta solo al usarla.
+import mmap
+import random
+import re
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+try:
+    from . import parser
+except ImportError:
+    import parser
+
+TAM_LRU = 1024 # Preguntas ya parseadas que se conservan en memoria
+
+# Mismas cabeceras que el motor 'estado' ('N:' sola en su línea), sobre los bytes del archivo
+PATRON_CABECERA = re.compile(rb'\n(\d+):[ \t]*(?=\r?\n|\Z)')
+PATRON_CABECERA_INICIAL = re.compile(rb'(\d+):[ \t]*(?=\r?\n|\Z)')
+
+
+def indexar_archivo(ruta_archivo):
+    """
+    Recorre el archivo (con mmap, sin decodificarlo) y devuelve un array con el
+    offset en bytes de cada cabecera 'N:', más el tamaño del archivo al final:
+    el bloque i ocupa [offsets[i], offsets[i+1]).
+    """
+    offsets = array('Q')
+    with open(ruta_archivo, 'rb') as f:
+        tamano = f.seek(0, 2)
+        if tamano:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                if PATRON_CABECERA_INICIAL.match(datos):
+                    offsets.append(0)
+                offsets.extend(m.start() + 1 for m in PATRON_CABECERA.finditer(datos))
+    offsets.append(tamano)
+    return offsets
+
+
+class BancoPerezoso(Sequence):
+    """
+    Banco de preguntas respaldado por el archivo y su índice de offsets: cada
+    pregunta se lee y se parsea al acceder a ella, y las últimas TAM_LRU se
+    conservan. Un bloque con formato inválido lanza ValueError al acceder por
+    índice; al iterar, con muestra() o indices_validos() simplemente se omite.
+    """
+
+    def __init__(self, ruta_archivo, offsets, tam_lru=TAM_LRU):
+        self.ruta_archivo = ruta_archivo
+        self._offsets = offsets
+        self._tam_lru = tam_lru
+        self._lru = OrderedDict()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __repr__(self):
+        return f"<BancoPerezoso: {len(self)} bloques, {len(self._lru)} en memoria>"
+
+    def _leer_bloque(self, indice):
+        inicio, fin = self._offsets[indice], self._offsets[indice + 1]
+        with open(self.ruta_archivo, 'rb') as f:
+            f.seek(inicio)
+            texto = f.read(fin - inicio).decode('utf-8')
+        # Mismos saltos de línea que al leer el archivo en modo texto
+        return texto.replace('\r\n', '\n').replace('\r', '\n')
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError('índice de pregunta fuera de rango')
+
+        pregunta = self._lru.get(indice)
+        if pregunta is not None:
+            self._lru.move_to_end(indice)
+            return pregunta
+        pregunta = parser.analizar_bloque(self._leer_bloque(indice))
+        self._lru[indice] = pregunta
+        if len(self._lru) > self._tam_lru:
+            self._lru.popitem(last=False)
+        return pregunta
+
+    def __iter__(self):
+        for i in range(len(self)):
+            try:
+                yield self[i]
+            except ValueError:
+                continue
+
+    def es_valido(self, indice):
+        """Si el bloque 'indice' se puede parsear (queda en la LRU si es así)."""
+        try:
+            self[indice]
+        except ValueError:
+            return False
+        return True
+
+    def indices_validos(self, num_preguntas=None, aleatorio=None):
+        """
+        Índices de hasta 'num_preguntas' bloques válidos: los primeros en orden o,
+        con 'aleatorio' (un random.Random), distintos elegidos al azar. Solo se
+        parsean los elegidos (y los que haya que descartar por formato inválido).
+        """
+        num_preguntas = len(self) if num_preguntas is None else num_preguntas
+        if aleatorio is None:
+            elegidos = []
+            for indice in range(len(self)):
+                if len(elegidos) >= num_preguntas:
+                    break
+                if self.es_valido(indice):
+                    elegidos.append(indice)
+            return elegidos
+        elegidos = []
+        vistos = set()
+        while len(elegidos) < num_preguntas and len(vistos) < len(self):
+            indice = aleatorio.randrange(len(self))
+            if indice in vistos:
+                continue
+            vistos.add(indice)
+            if self.es_valido(indice):
+                elegidos.append(indice)
+        return elegidos
+
+    def muestra(self, num_preguntas, aleatorio=random):
+        """Hasta 'num_preguntas' preguntas válidas distintas elegidas al azar (ver indices_validos)."""
+        return [self[i] for i in self.indices_validos(num_preguntas, aleatorio)]
+
+    def memoria_bytes(self):
+        """Memoria del índice (las preguntas en la LRU no se cuentan)."""
+        return self._offsets.itemsize * len(self._offsets)
@@ -1,178 +1,416 @@
 # core/parser.py
+import contextlib
+import gc
+import io
+import os
 import re
 from collections import namedtuple
 from rich.console import Console
-import os # Necesario para el log
+
+try:
+    from .registro_parser import RegistroParser, LOG_FILE
+    from .calificador import mascara_letras
+    from . import perfilado
+except ImportError:
+    from registro_parser import RegistroParser, LOG_FILE
+    from calificador import mascara_letras
+    import perfilado
 
 console = Console()
-Pregunta = namedtuple('Pregunta', ['numero', 'enunciado', 'opciones', 'correctas', 'es_multiple'])
-LOG_FILE = 'log_parser.txt'
 
-def cargar_preguntas(ruta_archivo, num_esperado=None): # Añadido num_esperado opcional
+
+class Pregunta(namedtuple('Pregunta', ['numero', 'enunciado', 'opciones', 'correctas', 'es_multiple', 'mascara'])):
     """
-    Carga las preguntas desde el archivo, con mejor tolerancia a variaciones de formato.
+    Pregunta cargada del archivo. 'mascara' es la máscara de bits de 'correctas'
+    (A = bit 0); si no se indica se calcula al crearla, para calificar sin
+    reconstruir conjuntos en cada respuesta.
     """
-    preguntas = []
-    preguntas_problematicas = []
+    __slots__ = ()
+
+    def __new__(cls, numero, enunciado, opciones, correctas, es_multiple, mascara=None):
+        if mascara is None:
+            mascara = mascara_letras(correctas)
+        return super().__new__(cls, numero, enunciado, opciones, correctas, es_multiple, mascara)
+
+    def _replace(self, **cambios):
+        if 'correctas' in cambios and 'mascara' not in cambios:
+            cambios['mascara'] = mascara_letras(cambios['correctas'])
+        return super()._replace(**cambios)
+
 
-    # Limpiar log anterior al inicio
-    if os.path.exists(LOG_FILE):
+# Patrones compilados una sola vez a nivel de módulo
+# Línea de inicio de pregunta: dígitos, dos puntos y espacios opcionales (ej. "12:")
+PATRON_INICIO_PREGUNTA = re.compile(r'(\d+):[ \t]*')
+PATRON_OPCION = re.compile(r'([A-Z])\.(.*)') # Captura letra y texto
+PATRON_CORRECTA = re.compile(r'Correct Answer:\s*([A-Z])(?:[.\s]|$)', re.IGNORECASE) # Más robusto
+
+MOTOR_POR_DEFECTO = 'estado' # 'estado' (máquina de estados) o 'bloques' (anterior)
+MAX_ERRORES_PANTALLA = 20 # Bloques inválidos que se muestran uno a uno al cargar
+
+_nueva_pregunta = tuple.__new__ # Pregunta ya validada y con su máscara: sin pasar por Pregunta.__new__
+
+
+def _construir_pregunta(num_pregunta_str, enunciado_lines, opciones, correctas_raw):
+    """
+    Valida las partes extraídas de un bloque y construye la Pregunta.
+    Lanza ValueError si el bloque no tiene un formato válido.
+    """
+    int(num_pregunta_str) # Validar que sea un número
+    enunciado = " ".join(enunciado_lines).strip()
+
+    if not enunciado:
+         raise ValueError("Enunciado vacío.")
+    if not opciones:
+        raise ValueError("No se encontraron opciones.")
+    if not correctas_raw:
+        raise ValueError("No se encontró 'Correct Answer:'.")
+
+    # Validar que las letras correctas correspondan a opciones existentes ('correctas_raw' no tiene repetidas)
+    num_opciones = len(opciones)
+    mascara = 0
+    for letra in correctas_raw:
+        if ord(letra) - 65 < num_opciones:
+            mascara |= 1 << (ord(letra) - 65)
+
+    if not mascara:
+         letras_opciones_validas = [chr(65 + k) for k in range(num_opciones)]
+         raise ValueError(f"Las respuestas correctas indicadas ({correctas_raw}) no coinciden con las opciones válidas ({letras_opciones_validas}).")
+
+    # Mismas letras que las de la máscara, ordenadas (casi siempre hay una sola)
+    correctas = [letra for letra in correctas_raw if ord(letra) - 65 < num_opciones]
+    if len(correctas) > 1:
+        correctas.sort()
+    # Campos: numero, enunciado, opciones, correctas (validadas), es_multiple, mascara
+    return _nueva_pregunta(Pregunta, (num_pregunta_str, enunciado, opciones, correctas, len(correctas) > 1, mascara))
+
+
+# --- Motor 'bloques': agrupa cada pregunta y luego la analiza ---
+
+def _parsear_bloque(num_pregunta_str, contenido_pregunta):
+    """
+    Convierte el contenido de un bloque (texto tras 'N:') en una Pregunta.
+    Devuelve (pregunta, correctas_raw). Lanza ValueError si el formato no es válido.
+    """
+    # Dividir el contenido en líneas limpias
+    lineas = [l.strip() for l in contenido_pregunta.split('\n') if l.strip()]
+    if not lineas:
+         raise ValueError("Bloque de pregunta vacío.")
+
+    enunciado_lines = []
+    opciones = []
+    opcion_actual = None
+    correctas_raw = []
+    estado = 'enunciado' # Estados: enunciado, opcion
+
+    for linea in lineas:
+        match_opcion = PATRON_OPCION.match(linea)
+        match_correcta = PATRON_CORRECTA.match(linea)
+
+        if match_opcion:
+            estado = 'opcion'
+            if opcion_actual: # Guardar la opción anterior completa
+                opciones.append(" ".join(opcion_actual).strip())
+            opcion_actual = [match_opcion.group(2).strip()]
+
+        elif match_correcta:
+            # Solo nos interesa la letra
+            letra_correcta = match_correcta.group(1).upper()
+            if letra_correcta not in correctas_raw:
+                 correctas_raw.append(letra_correcta)
+
+        # Si no es inicio de opción ni respuesta, añadir al elemento actual
+        elif estado == 'enunciado':
+            enunciado_lines.append(linea)
+        elif estado == 'opcion' and opcion_actual:
+            opcion_actual.append(linea)
+
+    # Guardar la última opción
+    if opcion_actual:
+        opciones.append(" ".join(opcion_actual).strip())
+
+    return _construir_pregunta(num_pregunta_str, enunciado_lines, opciones, correctas_raw), correctas_raw
+
+
+def _iter_bloques(f):
+    """
+    Lee el archivo línea a línea y genera pares (numero_str, contenido) por cada
+    bloque 'N:'. El texto anterior a la primera pregunta se ignora.
+    """
+    num_actual = None
+    lineas_bloque = []
+
+    for linea in f: # Los finales de línea ya vienen normalizados a '\n'
+        linea = linea.rstrip('\n')
+        match_inicio = PATRON_INICIO_PREGUNTA.fullmatch(linea)
+        if match_inicio:
+            if num_actual is not None:
+                yield num_actual, '\n'.join(lineas_bloque)
+            num_actual = match_inicio.group(1)
+            lineas_bloque = []
+        elif num_actual is not None:
+            lineas_bloque.append(linea)
+
+    if num_actual is not None:
+        yield num_actual, '\n'.join(lineas_bloque)
+
+
+def _motor_bloques(lineas, al_error):
+    """Genera (pregunta, correctas_raw) agrupando primero cada bloque completo."""
+    for num_pregunta_str, contenido_pregunta in _iter_bloques(lineas):
         try:
-            os.remove(LOG_FILE)
-        except OSError as e:
-            console.print(f"[yellow]No se pudo limpiar el log anterior: {e}[/yellow]")
+            yield _parsear_bloque(num_pregunta_str, contenido_pregunta)
+        except Exception as e:
+            al_error(num_pregunta_str, e, contenido_pregunta)
 
 
-    try:
-        with open(ruta_archivo, 'r', encoding='utf-8') as f:
-            contenido = f.read()
+# --- Motor 'estado': una sola pasada sobre el texto ---
 
-        # Normalizar finales de línea y añadir uno al inicio/final para asegurar matches
-        contenido = '\n' + contenido.replace('\r\n', '\n').replace('\r', '\n') + '\n'
+TAM_LECTURA = 1 << 20 # Caracteres leídos por iteración (el archivo nunca se carga entero)
 
-        # Patrón mejorado para detectar números de pregunta (más robusto a espacios)
-        # Busca: salto de línea, dígitos, dos puntos, espacio opcional, salto de línea
-        patron_pregunta = r'\n(\d+):[ \t]*\n'
+# Los patrones de este motor empiezan por el literal '\n', lo que permite al motor
+# de 're' saltar directamente de un salto de línea al siguiente.
+# Cabecera 'N:' en su propia línea; el '\n' final no se consume y queda en el contenido
+PATRON_INICIO_BLOQUE = re.compile(r'\n(\d+):[ \t]*(?=\n)')
+# Línea clave de un bloque: opción ('A. texto') o respuesta ('Correct Answer: A').
+# Con split() el bloque queda tokenizado: [texto, letra_opcion, texto_opcion, letra_correcta, texto, ...]
+PATRON_LINEA_CLAVE = re.compile(
+    r'\n[^\S\n]*(?:([A-Z])\.(.*)|(?i:Correct Answer:[^\S\n]*([A-Z]))(?=[.\s]|$).*)',
+    re.MULTILINE
+)
 
-        # Dividir en bloques usando el patrón
-        # El resultado es [numero1, contenido1, numero2, contenido2, ...]
-        bloques = re.split(patron_pregunta, contenido)
 
-        # El primer elemento suele ser vacío si el archivo empieza con el patrón, lo quitamos
-        if bloques and bloques[0].strip() == '':
-            bloques = bloques[1:]
+def _lineas_limpias(texto):
+    """Devuelve las líneas no vacías (y sin espacios sobrantes) de un texto."""
+    return [l.strip() for l in texto.split('\n') if l.strip()]
 
-        if not bloques:
-             console.print("[red]No se pudo dividir el archivo en bloques de preguntas. ¿Formato incorrecto?[/red]")
-             return []
 
-        # Procesar bloques en pares (número de pregunta + contenido)
-        i = 0
-        while i < len(bloques) - 1:
-            num_pregunta_str = "?"
-            try:
-                num_pregunta_str = bloques[i].strip()
-                num_pregunta = int(num_pregunta_str) # Validar que sea un número
-                contenido_pregunta = bloques[i + 1]
-
-                # Dividir el contenido en líneas limpias
-                lineas = [l.strip() for l in contenido_pregunta.split('\n') if l.strip()]
-                if not lineas:
-                     raise ValueError("Bloque de pregunta vacío.")
-
-                # --- Extracción Mejorada ---
-                enunciado_lines = []
-                opciones = []
-                opcion_actual = None
-                correctas_raw = [] # Guardamos las líneas completas de 'Correct Answer'
-
-                patron_opcion = re.compile(r'^([A-Z])\.(.*)') # Captura letra y texto
-                patron_correcta = re.compile(r'^Correct Answer:\s*([A-Z])(?:[.\s]|$)', re.IGNORECASE) # Más robusto
-
-                estado = 'enunciado' # Estados: enunciado, opcion, correcta
-
-                for j, linea in enumerate(lineas):
-                    match_opcion = patron_opcion.match(linea)
-                    match_correcta = patron_correcta.match(linea)
-
-                    if match_opcion:
-                        estado = 'opcion'
-                        if opcion_actual: # Guardar la opción anterior completa
-                            opciones.append(" ".join(opcion_actual['texto']).strip())
-
-                        letra_opcion = match_opcion.group(1)
-                        texto_inicial_opcion = match_opcion.group(2).strip()
-                        opcion_actual = {'letra': letra_opcion, 'texto': [texto_inicial_opcion]}
-
-                    elif match_correcta:
-                        # Solo nos interesa la letra
-                        letra_correcta = match_correcta.group(1).upper()
-                        if letra_correcta not in correctas_raw:
-                             correctas_raw.append(letra_correcta)
-                        # Continuamos procesando por si hay más texto en la línea (aunque no debería)
-                        if estado == 'opcion' and opcion_actual:
-                            pass # No añadir "Correct Answer" al texto de la opción
-                        elif estado == 'enunciado':
-                            pass # Tampoco al enunciado
-
-                    # Si no es inicio de opción ni respuesta, añadir al elemento actual
-                    elif estado == 'enunciado':
-                        enunciado_lines.append(linea)
-                    elif estado == 'opcion' and opcion_actual:
-                        # Añadir línea a la opción actual si no es una línea de "Correct Answer" redundante
-                        if not patron_correcta.match(linea):
-                             opcion_actual['texto'].append(linea.strip())
-
-                # Guardar la última opción
-                if opcion_actual:
-                    opciones.append(" ".join(opcion_actual['texto']).strip())
-
-                enunciado = " ".join(enunciado_lines).strip()
-
-                if not enunciado:
-                     raise ValueError("Enunciado vacío.")
-                if not opciones:
-                    raise ValueError("No se encontraron opciones.")
-                if not correctas_raw:
-                    raise ValueError("No se encontró 'Correct Answer:'.")
-
-                # Validar que las letras correctas correspondan a opciones existentes
-                letras_opciones_validas = [chr(65 + k) for k in range(len(opciones))]
-                correctas = sorted(list(set(letra for letra in correctas_raw if letra in letras_opciones_validas)))
-
-                if not correctas:
-                     raise ValueError(f"Las respuestas correctas indicadas ({correctas_raw}) no coinciden con las opciones válidas ({letras_opciones_validas}).")
-
-
-                es_multiple = len(correctas) > 1
-
-                # Logging detallado
-                with open(LOG_FILE, 'a', encoding='utf-8') as log:
-                    log.write(f"--- Pregunta {num_pregunta_str} ---\n")
-                    log.write(f"Enunciado: {enunciado}\n")
-                    log.write(f"Opciones ({len(opciones)}): {letras_opciones_validas}\n")
-                    for idx, opt_text in enumerate(opciones):
-                         log.write(f"  {chr(65+idx)}. {opt_text}\n")
-                    log.write(f"Correctas Detectadas (raw): {correctas_raw}\n")
-                    log.write(f"Correctas Validadas: {correctas}\n")
-                    log.write(f"Es Múltiple: {es_multiple}\n\n")
-
-
-                preguntas.append(Pregunta(
-                    numero=num_pregunta_str, # Guardar como string por si acaso
-                    enunciado=enunciado,
-                    opciones=opciones,
-                    correctas=correctas, # Lista de letras correctas validadas
-                    es_multiple=es_multiple
-                ))
+def _analizar_contenido(num_pregunta_str, contenido):
+    """
+    Máquina de estados (enunciado -> opcion -> correcta) sobre las líneas clave de
+    un bloque. Las líneas sin marca continúan el enunciado o la opción en curso.
+    Devuelve (pregunta, correctas_raw). Lanza ValueError si el formato no es válido.
+    'contenido' empieza por el salto de línea que sigue a la cabecera.
+    """
+    partes = PATRON_LINEA_CLAVE.split(contenido)
+    enunciado = partes[0].strip()
+    if '\n' in enunciado:
+        enunciado_lines = _lineas_limpias(enunciado)
+    else:
+        enunciado_lines = [enunciado] if enunciado else []
+    continuaciones = ''.join(partes[4::4])
+    if not continuaciones or continuaciones.isspace():
+        # Lo habitual: cada opción y cada respuesta en una línea; sin recorrer los tokens uno a uno
+        opciones = [texto_opcion.strip() for texto_opcion in partes[2::4] if texto_opcion is not None]
+        correctas_raw = [letra.upper() for letra in partes[3::4] if letra is not None]
+        if len(correctas_raw) > 1:
+            correctas_raw = list(dict.fromkeys(correctas_raw))
+        if not (enunciado_lines or opciones or correctas_raw):
+             raise ValueError("Bloque de pregunta vacío.")
+        return _construir_pregunta(num_pregunta_str, enunciado_lines, opciones, correctas_raw), correctas_raw
+
+    opciones = []
+    correctas_raw = []
+    tokens = iter(partes)
+    next(tokens)
+    for letra_opcion, texto_opcion, letra_correcta, texto in zip(tokens, tokens, tokens, tokens):
+        if letra_opcion is not None:
+            opciones.append(texto_opcion.strip())
+        else:
+            letra_correcta = letra_correcta.upper()
+            if letra_correcta not in correctas_raw:
+                 correctas_raw.append(letra_correcta)
+
+        if texto and not texto.isspace(): # Líneas de continuación (poco habitual)
+            if opciones:
+                opciones[-1] = " ".join([opciones[-1]] + _lineas_limpias(texto)).strip()
+            else:
+                enunciado_lines.extend(_lineas_limpias(texto))
+
+    if not (enunciado_lines or opciones or correctas_raw):
+         raise ValueError("Bloque de pregunta vacío.")
+
+    return _construir_pregunta(num_pregunta_str, enunciado_lines, opciones, correctas_raw), correctas_raw
+
+
+def analizar_bloque(texto):
+    """
+    Analiza un bloque suelto (cabecera 'N:' y su contenido) con el motor 'estado'.
+    Se usa para cargar preguntas individuales a partir de un índice de offsets.
+    Lanza ValueError si el bloque no es válido.
+    """
+    cabecera, _, resto = texto.partition('\n')
+    m = PATRON_INICIO_PREGUNTA.fullmatch(cabecera)
+    if not m:
+        raise ValueError(f"El bloque no empieza por una cabecera 'N:': {cabecera[:40]!r}")
+    return _analizar_contenido(m.group(1), '\n' + resto)[0]
+
 
+def _motor_estado(f, al_error):
+    """
+    Genera (pregunta, correctas_raw) leyendo el texto una sola vez por trozos.
+    Cada trozo se divide por las cabeceras 'N:' con un patrón ya compilado y el
+    último bloque (posiblemente incompleto) se arrastra a la siguiente lectura.
+    """
+    num_pendiente = None
+    contenido_pendiente = '\n' # Permite detectar una cabecera en la primera línea
+
+    while True:
+        datos = f.read(TAM_LECTURA)
+        final = not datos
+        texto = contenido_pendiente + (datos if datos else '\n') # '\n' final: cabecera en la última línea
+
+        partes = PATRON_INICIO_BLOQUE.split(texto)
+        # partes = [resto_del_bloque_pendiente, num1, contenido1, num2, contenido2, ...]
+        bloques = [(num_pendiente, partes[0])]
+        bloques.extend(zip(partes[1::2], partes[2::2]))
+        if not final:
+            num_pendiente, contenido_pendiente = bloques.pop()
+
+        for num_pregunta_str, contenido in bloques:
+            if num_pregunta_str is None:
+                continue # Texto anterior a la primera pregunta
+            try:
+                yield _analizar_contenido(num_pregunta_str, contenido)
             except Exception as e:
-                error_msg = f"Error procesando bloque después de pregunta '{num_pregunta_str}': {str(e)}"
-                preguntas_problematicas.append((num_pregunta_str, str(e)))
-                console.print(f"[red]❌ {error_msg}[/red]")
-                with open(LOG_FILE, 'a', encoding='utf-8') as log:
-                     log.write(f"*** ERROR en pregunta ~{num_pregunta_str} ***\n{error_msg}\n")
-                     # Intentar loguear el bloque problemático
-                     if 'contenido_pregunta' in locals():
-                          log.write("--- Bloque de contenido ---\n")
-                          log.write(contenido_pregunta + "\n-------------------------\n\n")
+                al_error(num_pregunta_str, e, contenido.strip('\n'))
 
+        if final:
+            break
 
-            i += 2 # Avanzar al siguiente par (número + contenido)
 
-    except FileNotFoundError:
-         console.print(f"[bold red]❌ Error: Archivo no encontrado en '{ruta_archivo}'[/bold red]")
-         return []
-    except Exception as e:
-        console.print(f"[bold red]❌ Error general al leer o procesar el archivo: {str(e)}[/bold red]")
-        # Loguear el error general también
-        with open(LOG_FILE, 'a', encoding='utf-8') as log:
-            log.write(f"*** ERROR GENERAL ***\n{str(e)}\n")
-        return preguntas # Devolver lo que se haya podido parsear
+MOTORES = {
+    'estado': _motor_estado,
+    'bloques': _motor_bloques,
+}
 
-    # --- Resumen Final del Parseo ---
+
+def mensaje_error_bloque(num_pregunta_str, error):
+    return f"Error procesando bloque después de pregunta '{num_pregunta_str}': {error}"
+
+
+def avisar_error_bloque(num_pregunta_str, error, indice):
+    """
+    Muestra el error del bloque número 'indice' (desde 0) de la carga. Pasados
+    MAX_ERRORES_PANTALLA solo se avisa una vez: el resto queda en el log y en el
+    resumen (dibujar miles de errores costaba más que parsear el archivo).
+    """
+    if indice < MAX_ERRORES_PANTALLA:
+        console.print(f"[red]❌ {mensaje_error_bloque(num_pregunta_str, error)}[/red]")
+    elif indice == MAX_ERRORES_PANTALLA:
+        console.print(f"[yellow]⚠️ Más de {MAX_ERRORES_PANTALLA} bloques con errores; el resto no se muestra aquí "
+                      f"(ver el resumen y el log).[/yellow]")
+
+
+def iter_preguntas_de(f, problemas=None, motor=MOTOR_POR_DEFECTO, registro=None, mostrar_errores=True):
+    """
+    Como iter_preguntas, pero sobre un archivo de texto ya abierto (o un StringIO).
+    Con mostrar_errores=False los bloques inválidos solo se anotan en 'problemas' y en el log.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de parseo desconocido: '{motor}'. Opciones: {', '.join(MOTORES)}")
+    if registro is None:
+        registro = RegistroParser(nivel='ninguno')
+
+    errores = 0
+
+    def al_error(num_pregunta_str, e, contenido_pregunta):
+        nonlocal errores
+        if problemas is not None:
+            problemas.append((num_pregunta_str, str(e)))
+        if mostrar_errores:
+            avisar_error_bloque(num_pregunta_str, e, errores)
+        errores += 1
+        registro.error(num_pregunta_str, mensaje_error_bloque(num_pregunta_str, e), contenido_pregunta)
+
+    log_completo = registro.nivel == 'completo'
+    for pregunta, correctas_raw in MOTORES[motor](f, al_error):
+        if log_completo:
+            registro.pregunta(pregunta, correctas_raw)
+        yield pregunta
+
+
+class _LecturaConAviso(io.RawIOBase):
+    """Archivo binario que llama a progreso(bytes_leidos, total) antes de cada lectura del disco."""
+
+    def __init__(self, archivo, progreso):
+        self._archivo = archivo
+        self._progreso = progreso
+        self._total = os.fstat(archivo.fileno()).st_size
+        self._leidos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        self._progreso(self._leidos, self._total) # Puede lanzar una excepción para cancelar la carga
+        n = self._archivo.readinto(destino)
+        self._leidos += n or 0
+        return n
+
+    def close(self):
+        self._archivo.close()
+        super().close()
+
+
+def abrir_texto(ruta_archivo, progreso=None):
+    """Abre el archivo como texto UTF-8; con 'progreso', avisando de los bytes leídos (ver _LecturaConAviso)."""
+    if progreso is None:
+        return open(ruta_archivo, 'r', encoding='utf-8')
+    lectura = _LecturaConAviso(open(ruta_archivo, 'rb', buffering=0), progreso)
+    return io.TextIOWrapper(io.BufferedReader(lectura), encoding='utf-8')
+
+
+def iter_preguntas(ruta_archivo, problemas=None, motor=MOTOR_POR_DEFECTO, registro=None, progreso=None):
+    """
+    Genera las preguntas del archivo una a una, leyéndolo de forma incremental.
+    Si se pasa la lista 'problemas', se añaden ahí las tuplas (numero, error)
+    de los bloques que no se pudieron procesar.
+    'motor' selecciona el analizador: 'estado' (por defecto) o 'bloques'.
+    'registro' es un RegistroParser ya abierto; sin él no se escribe log.
+    'progreso' (opcional) se llama como progreso(bytes_leidos, total) antes de
+    leer cada trozo del archivo; si lanza una excepción, la carga se detiene.
+    Lanza FileNotFoundError si el archivo no existe.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de parseo desconocido: '{motor}'. Opciones: {', '.join(MOTORES)}")
+    with abrir_texto(ruta_archivo, progreso) as f:
+        yield from iter_preguntas_de(f, problemas, motor, registro)
+
+
+@contextlib.contextmanager
+def sin_recolector():
+    """
+    Desactiva el recolector de ciclos durante el bloque y deja después el estado que
+    tenía. Al crear cientos de miles de preguntas (que no forman ciclos) cada pasada
+    completa recorre todo el banco. Afecta a todo el proceso, también a los demás
+    hilos: solo lo usan los puntos de entrada (CLI, lotes y procesos trabajadores).
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+def abrir_registro(registro):
+    """Abre el registro del parser (por defecto, log completo en LOG_FILE); si falla, sigue sin log."""
+    if registro is None:
+        registro = RegistroParser(LOG_FILE)
+    try:
+        registro.abrir()
+    except OSError as e:
+        console.print(f"[yellow]No se pudo abrir el log del parser '{registro.ruta}': {e}[/yellow]")
+        registro = RegistroParser(nivel='ninguno')
+    return registro
+
+
+def resumen_carga(preguntas, preguntas_problematicas, registro, num_esperado=None):
+    """Muestra el resumen final del parseo."""
     if preguntas_problematicas:
-        console.print(f"[yellow]⚠️ {len(preguntas_problematicas)} bloques tuvieron problemas durante el parseo (ver detalles arriba y en {LOG_FILE}).[/yellow]")
+        detalle_log = f" y en {registro.ruta}" if registro.activo else ""
+        console.print(f"[yellow]⚠️ {len(preguntas_problematicas)} bloques tuvieron problemas durante el parseo (ver detalles arriba{detalle_log}).[/yellow]")
 
     # Verificar número esperado si se proporcionó
     if num_esperado is not None and len(preguntas) != num_esperado:
@@ -182,4 +420,38 @@ def cargar_preguntas(ruta_archivo, num_esperado=None): # Añadido num_esperado o
          console.print("[red]No se cargó ninguna pregunta y no hubo errores específicos de bloque. Revise el formato general del archivo.[/red]")
 
 
-    return preguntas
\ No newline at end of file
+@perfilado.medido()
+def cargar_preguntas(ruta_archivo, num_esperado=None, motor=MOTOR_POR_DEFECTO, registro=None, problemas=None,
+                     destino=None, progreso=None): # Añadido num_esperado opcional
+    """
+    Carga las preguntas desde el archivo, con mejor tolerancia a variaciones de formato.
+    'registro' (RegistroParser) controla el log; por defecto, log completo en LOG_FILE.
+    Si se pasa la lista 'problemas', se rellena con los bloques que fallaron.
+    'destino' es el contenedor donde se añaden las preguntas (por defecto, una lista nueva).
+    'progreso' se pasa a iter_preguntas (avance en bytes); para cancelar la carga debe lanzar
+    una excepción que no derive de Exception (como TareaCancelada de la GUI), que se propaga.
+    """
+    preguntas = destino if destino is not None else []
+    preguntas_problematicas = problemas if problemas is not None else []
+    # Abrir el log una sola vez (sustituye al de la carga anterior)
+    registro = abrir_registro(registro)
+
+    try:
+        for pregunta in iter_preguntas(ruta_archivo, preguntas_problematicas, motor, registro, progreso):
+            preguntas.append(pregunta)
+
+    except FileNotFoundError:
+         console.print(f"[bold red]❌ Error: Archivo no encontrado en '{ruta_archivo}'[/bold red]")
+         return preguntas # Vacío
+    except Exception as e:
+        console.print(f"[bold red]❌ Error general al leer o procesar el archivo: {str(e)}[/bold red]")
+        # Loguear el error general también
+        registro.error_general(str(e))
+        return preguntas # Devolver lo que se haya podido parsear
+    finally:
+        registro.cerrar()
+
+    # --- Resumen Final del Parseo ---
+    resumen_carga(preguntas, preguntas_problematicas, registro, num_esperado)
+
+    return preguntas
@@ -0,0 +1,136 @@
+# core/registro_parser.py
+import json
+
+LOG_FILE = 'log_parser.txt'
+NIVELES = ('ninguno', 'errores', 'completo')
+FORMATOS = ('texto', 'jsonl')
+TAM_BUFFER = 1 << 16 # Buffer de escritura: el log se vuelca en bloques, no por pregunta
+
+
+class RegistroParser:
+    """
+    Log del parseo con un único archivo abierto por carga.
+    'nivel': 'ninguno' (sin log), 'errores' (solo bloques con problemas) o 'completo'.
+    'formato': 'texto' (legible) o 'jsonl' (un objeto JSON por línea, para diagnóstico).
+    """
+
+    def __init__(self, ruta=LOG_FILE, nivel='completo', formato='texto'):
+        if nivel not in NIVELES:
+            raise ValueError(f"Nivel de log desconocido: '{nivel}'. Opciones: {', '.join(NIVELES)}")
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de log desconocido: '{formato}'. Opciones: {', '.join(FORMATOS)}")
+        self.ruta = ruta
+        self.nivel = nivel
+        self.formato = formato
+        self._archivo = None
+        self._propio = False # Solo se cierra el archivo si lo abrió el registro
+
+    @property
+    def activo(self):
+        return self.nivel != 'ninguno'
+
+    def abrir(self, destino=None):
+        """
+        Abre el log (sobrescribiendo el de la carga anterior). Con 'destino' (p. ej.
+        un StringIO) se escribe ahí en lugar de en 'ruta'.
+        """
+        if self.activo and self._archivo is None:
+            self._propio = destino is None
+            self._archivo = destino if destino is not None else open(self.ruta, 'w', encoding='utf-8', buffering=TAM_BUFFER)
+        return self
+
+    def cerrar(self):
+        if self._archivo is not None:
+            if self._propio:
+                self._archivo.close()
+            self._archivo = None
+
+    def __enter__(self):
+        return self.abrir()
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def anexar(self, texto):
+        """Añade texto ya formateado (p. ej. el log de un trozo parseado en otro proceso)."""
+        if self._archivo is not None and texto:
+            self._archivo.write(texto)
+
+    def _escribir_json(self, registro):
+        self._archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    def pregunta(self, pregunta, correctas_raw):
+        """Registra una pregunta cargada correctamente (solo en nivel 'completo')."""
+        if self.nivel != 'completo' or self._archivo is None:
+            return
+        if self.formato == 'jsonl':
+            self._escribir_json({
+                'tipo': 'pregunta', 'numero': pregunta.numero, 'enunciado': pregunta.enunciado,
+                'opciones': pregunta.opciones, 'correctas_raw': correctas_raw,
+                'correctas': pregunta.correctas, 'es_multiple': pregunta.es_multiple,
+            })
+            return
+
+        letras_opciones_validas = [chr(65 + k) for k in range(len(pregunta.opciones))]
+        lineas = [
+            f"--- Pregunta {pregunta.numero} ---",
+            f"Enunciado: {pregunta.enunciado}",
+            f"Opciones ({len(pregunta.opciones)}): {letras_opciones_validas}",
+        ]
+        lineas.extend(f"  {chr(65+idx)}. {opt_text}" for idx, opt_text in enumerate(pregunta.opciones))
+        lineas.append(f"Correctas Detectadas (raw): {correctas_raw}")
+        lineas.append(f"Correctas Validadas: {pregunta.correctas}")
+        lineas.append(f"Es Múltiple: {pregunta.es_multiple}\n\n")
+        self._archivo.write("\n".join(lineas))
+
+    def error(self, num_pregunta_str, error_msg, contenido_pregunta):
+        """Registra un bloque que no se pudo procesar."""
+        if self._archivo is None:
+            return
+        if self.formato == 'jsonl':
+            self._escribir_json({'tipo': 'error', 'numero': num_pregunta_str,
+                                 'mensaje': error_msg, 'bloque': contenido_pregunta})
+            return
+        self._archivo.write(f"*** ERROR en pregunta ~{num_pregunta_str} ***\n{error_msg}\n"
+                            "--- Bloque de contenido ---\n"
+                            f"{contenido_pregunta}\n-------------------------\n\n")
+
+    def archivo(self, ruta_archivo):
+        """Marca el inicio de la sección de un archivo (carga de varios archivos)."""
+        if self._archivo is None:
+            return
+        if self.formato == 'jsonl':
+            self._escribir_json({'tipo': 'archivo', 'ruta': ruta_archivo})
+            return
+        self._archivo.write(f"===== Archivo: {ruta_archivo} =====\n\n")
+
+    def error_general(self, mensaje):
+        """Registra un error que interrumpió la lectura del archivo."""
+        if self._archivo is None:
+            return
+        if self.formato == 'jsonl':
+            self._escribir_json({'tipo': 'error_general', 'mensaje': mensaje})
+            return
+        self._archivo.write(f"*** ERROR GENERAL ***\n{mensaje}\n")
+
+
+def crear_desde_config(config):
+    """Crea el registro a partir de las claves 'log_parser_*' de la configuración."""
+    return RegistroParser(
+        ruta=config.get('log_parser_ruta', LOG_FILE),
+        nivel=config.get('log_parser_nivel', 'completo'),
+        formato=config.get('log_parser_formato', 'texto'),
+    )
+
+
+def leer_registro(ruta):
+    """Genera los registros (dicts) de un log en formato 'jsonl'."""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def leer_errores(ruta):
+    """Devuelve la lista de registros de error ('error' y 'error_general') de un log 'jsonl'."""
+    return [r for r in leer_registro(ruta) if r.get('tipo') in ('error', 'error_general')]
@@ -0,0 +1,366 @@
+# core/servidor.py
+# Servidor HTTP/JSON (asyncio, solo biblioteca estándar) para que muchos candidatos
+# hagan el examen a la vez sobre un único banco de preguntas en memoria.
+import asyncio
+import json
+import os
+import re
+import time
+from collections import deque
+from http import HTTPStatus
+from rich.console import Console
+from rich.table import Table
+
+try:
+    from . import exportador, sesion as sesion_examen
+except ImportError:
+    import exportador
+    import sesion as sesion_examen
+
+console = Console()
+
+HOST_POR_DEFECTO = '127.0.0.1'
+PUERTO_POR_DEFECTO = 8000
+MAX_CABECERA = 16 << 10
+MAX_CUERPO = 1 << 20
+MAX_SESIONES = 100000
+INACTIVIDAD_S = 4 * 3600 # Las sesiones sin actividad durante este tiempo se descartan
+MUESTRAS_LATENCIA = 100000 # Latencias guardadas por ruta (las más recientes)
+FORMATOS_EXPORTACION = ('txt', 'pdf', 'ambos', 'filas')
+ARCHIVO_FILAS = 'respuestas_%Y%m%d.csv' # 'filas': todas las sesiones se añaden a un archivo por día
+
+PATRON_SESION = re.compile(r'/sesiones/([0-9a-f]{32})(/[a-z]+)?')
+
+
+class ErrorPeticion(Exception):
+    """Error que se devuelve al cliente como {'error': mensaje} con el código HTTP indicado."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def pregunta_publica(pregunta, indice, total):
+    """La pregunta tal como se envía al candidato (sin las respuestas correctas)."""
+    return {
+        'indice': indice + 1,
+        'total': total,
+        'numero': pregunta.numero,
+        'enunciado': pregunta.enunciado,
+        'opciones': {chr(65 + i): opcion for i, opcion in enumerate(pregunta.opciones)},
+        'es_multiple': pregunta.es_multiple,
+        'num_correctas': len(pregunta.correctas) if pregunta.es_multiple else 1,
+    }
+
+
+def percentiles(valores, ps=(50, 95, 99)):
+    """{'p50': ..., ...} de una lista de valores (rango más cercano)."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return {f'p{p}': None for p in ps}
+    return {f'p{p}': ordenados[max(0, -(-len(ordenados) * p // 100) - 1)] for p in ps}
+
+
+class ServidorExamen:
+    """
+    Sesiones de examen en memoria sobre un banco compartido de solo lectura.
+    Rutas (JSON):
+      POST /sesiones                   {candidato, num_preguntas, aleatorio, modo} -> sesión y primera pregunta
+      GET  /sesiones/<id>              -> resumen y pregunta actual
+      POST /sesiones/<id>/respuestas   {respuesta: ['A'] o 'AC'} -> resultado y siguiente pregunta
+      POST /sesiones/<id>/finalizar    {exportar: 'txt'|'pdf'|'ambos'} -> resumen (y rutas exportadas)
+      GET  /estado                     -> sesiones activas y latencias por ruta
+    """
+
+    def __init__(self, preguntas, ruta_archivo, dir_resultados='.', max_sesiones=MAX_SESIONES,
+                 inactividad_s=INACTIVIDAD_S):
+        self.preguntas = preguntas
+        self.ruta_archivo = ruta_archivo
+        self.dir_resultados = dir_resultados
+        self.max_sesiones = max_sesiones
+        self.inactividad_s = inactividad_s
+        self.sesiones = {}
+        self.latencias = {} # Ruta -> deque de segundos
+        self.peticiones = 0
+        self.sesiones_creadas = 0
+        self.inicio = time.monotonic()
+
+    # --- Rutas ---
+
+    def _sesion(self, id_sesion):
+        sesion = self.sesiones.get(id_sesion)
+        if sesion is None:
+            raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"Sesión desconocida o ya finalizada: '{id_sesion}'.")
+        return sesion
+
+    def _estado_sesion(self, sesion):
+        estado = sesion.resumen()
+        pregunta = sesion.pregunta_actual()
+        estado['pregunta'] = pregunta_publica(pregunta, sesion.indice, len(sesion)) if pregunta else None
+        return estado
+
+    def crear_sesion(self, datos):
+        if len(self.sesiones) >= self.max_sesiones:
+            raise ErrorPeticion(HTTPStatus.SERVICE_UNAVAILABLE, "Se alcanzó el máximo de sesiones simultáneas.")
+        num_preguntas = datos.get('num_preguntas')
+        if num_preguntas is not None and (type(num_preguntas) is not int or num_preguntas <= 0): # bool no vale:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "'num_preguntas' debe ser un entero positivo.")
+        try:
+            sesion = sesion_examen.SesionExamen(self.preguntas, candidato=str(datos.get('candidato', '')),
+                                                num_preguntas=num_preguntas, aleatorio=bool(datos.get('aleatorio')),
+                                                modo=datos.get('modo', 'examen'))
+        except ValueError as e:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, str(e))
+        self.sesiones[sesion.id] = sesion
+        self.sesiones_creadas += 1
+        return HTTPStatus.CREATED, self._estado_sesion(sesion)
+
+    def responder(self, sesion, datos):
+        if 'respuesta' not in datos:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Falta 'respuesta'.")
+        if sesion.terminada:
+            raise ErrorPeticion(HTTPStatus.CONFLICT, "La sesión ya terminó; use /finalizar.")
+        pregunta = sesion.pregunta_actual()
+        try:
+            correcta = sesion.responder(datos['respuesta'])
+        except ValueError as e:
+            raise ErrorPeticion(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        estado = self._estado_sesion(sesion)
+        if sesion.modo == 'paso_a_paso': # Corrección inmediata
+            estado['correcta'] = correcta
+            estado['correctas'] = sorted(pregunta.correctas)
+        return HTTPStatus.OK, estado
+
+    async def finalizar(self, sesion, datos):
+        formato = datos.get('exportar')
+        if formato is not None and formato not in FORMATOS_EXPORTACION:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST,
+                                f"Formato de exportación desconocido. Opciones: {', '.join(FORMATOS_EXPORTACION)}")
+        resumen = sesion.finalizar()
+        del self.sesiones[sesion.id]
+        if formato:
+            resumen['exportado'] = await self._exportar(sesion, formato)
+        return HTTPStatus.OK, resumen
+
+    async def _exportar(self, sesion, formato):
+        """Exporta en un hilo aparte (FPDF es lento y bloquearía al resto de candidatos)."""
+        base = os.path.splitext(os.path.basename(self.ruta_archivo))[0]
+        candidato = exportador.nombre_candidato(sesion.candidato)
+        nombre = f"resultados_{base}_{candidato}_{time.strftime('%Y%m%d_%H%M%S')}_{sesion.id[:8]}"
+        resultados = sesion.resultados()
+        rutas = []
+        for extension, exportar in (('txt', exportador.exportar_txt), ('pdf', exportador.exportar_pdf)):
+            if formato in (extension, 'ambos'):
+                ruta = os.path.join(self.dir_resultados, f"{nombre}.{extension}")
+                await asyncio.to_thread(exportar, resultados, sesion.aciertos, len(resultados), ruta, sesion.acertadas)
+                if os.path.exists(ruta): # El exportador informa de los errores por consola
+                    rutas.append(ruta)
+        if formato == 'filas':
+            ruta, _ = await asyncio.to_thread(exportador.exportar_respuestas, [sesion],
+                                              os.path.join(self.dir_resultados, ARCHIVO_FILAS))
+            rutas.append(ruta)
+        return rutas
+
+    def estado(self):
+        return HTTPStatus.OK, {
+            'sesiones_activas': len(self.sesiones),
+            'sesiones_creadas': self.sesiones_creadas,
+            'preguntas_banco': len(self.preguntas),
+            'peticiones': self.peticiones,
+            'segundos_activo': round(time.monotonic() - self.inicio, 1),
+            'latencias_ms': self.resumen_latencias(),
+        }
+
+    async def despachar(self, metodo, ruta, datos):
+        """(estado HTTP, respuesta) de una petición ya leída."""
+        if ruta == '/estado' and metodo == 'GET':
+            return self.estado()
+        if ruta == '/sesiones' and metodo == 'POST':
+            return self.crear_sesion(datos)
+        m = PATRON_SESION.fullmatch(ruta)
+        if m:
+            sesion = self._sesion(m.group(1))
+            accion = m.group(2)
+            if accion is None and metodo == 'GET':
+                return HTTPStatus.OK, self._estado_sesion(sesion)
+            if accion == '/respuestas' and metodo == 'POST':
+                return self.responder(sesion, datos)
+            if accion == '/finalizar' and metodo == 'POST':
+                return await self.finalizar(sesion, datos)
+        raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {metodo} {ruta}")
+
+    # --- HTTP ---
+
+    async def atender(self, reader, writer):
+        """Atiende una conexión (con keep-alive) hasta que el cliente la cierra."""
+        try:
+            while True:
+                try:
+                    cabecera = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break # Conexión cerrada
+                except asyncio.LimitOverrunError:
+                    await self._escribir(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                         {'error': 'Cabecera demasiado grande.'}, False)
+                    break
+
+                inicio = time.perf_counter()
+                seguir = True
+                clave_ruta = 'otra'
+                datos = None
+                try:
+                    metodo, ruta, version, cabeceras = self._leer_cabecera(cabecera)
+                    seguir = self._mantener_conexion(version, cabeceras)
+                    clave_ruta = self._clave_ruta(metodo, ruta)
+                    datos = await self._leer_cuerpo(reader, cabeceras)
+                    estado, respuesta = await self.despachar(metodo, ruta, datos)
+                except ErrorPeticion as e:
+                    estado, respuesta = e.estado, {'error': str(e)}
+                    if datos is None: # Petición mal formada: no se sabe dónde empieza la siguiente
+                        seguir = False
+                except Exception as e:
+                    console.print(f"[red]❌ Error inesperado atendiendo la petición: {e}[/red]")
+                    estado, respuesta = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Error interno del servidor.'}
+                    seguir = False
+
+                await self._escribir(writer, estado, respuesta, seguir)
+                self._anotar_latencia(clave_ruta, time.perf_counter() - inicio)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _leer_cabecera(cabecera):
+        lineas = cabecera.decode('latin-1').split('\r\n')
+        partes = lineas[0].split(' ')
+        if len(partes) != 3:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Línea de petición inválida.")
+        metodo, ruta, version = partes
+        cabeceras = {}
+        for linea in lineas[1:]:
+            if linea:
+                nombre, _, valor = linea.partition(':')
+                cabeceras[nombre.strip().lower()] = valor.strip()
+        return metodo.upper(), ruta.split('?', 1)[0].rstrip('/') or '/', version, cabeceras
+
+    @staticmethod
+    def _clave_ruta(metodo, ruta):
+        """Ruta con el id de sesión sustituido, para agrupar latencias (las rutas desconocidas van a 'otra')."""
+        if ruta in ('/estado', '/sesiones'):
+            return f"{metodo} {ruta}"
+        m = PATRON_SESION.fullmatch(ruta)
+        if m and m.group(2) in (None, '/respuestas', '/finalizar'):
+            return f"{metodo} /sesiones/{{id}}{m.group(2) or ''}"
+        return 'otra'
+
+    @staticmethod
+    def _mantener_conexion(version, cabeceras):
+        conexion = cabeceras.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return conexion == 'keep-alive'
+        return conexion != 'close'
+
+    @staticmethod
+    async def _leer_cuerpo(reader, cabeceras):
+        try:
+            longitud = int(cabeceras.get('content-length', 0))
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Content-Length inválido.")
+        if longitud < 0:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Content-Length inválido.")
+        if longitud > MAX_CUERPO:
+            raise ErrorPeticion(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Cuerpo demasiado grande.")
+        if not longitud:
+            return {}
+        cuerpo = await reader.readexactly(longitud)
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo no es JSON válido.")
+        if not isinstance(datos, dict):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto JSON.")
+        return datos
+
+    @staticmethod
+    async def _escribir(writer, estado, respuesta, seguir):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(cuerpo)}\r\n"
+                     f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n".encode('latin-1') + cuerpo)
+        await writer.drain()
+
+    # --- Estadísticas y mantenimiento ---
+
+    def _anotar_latencia(self, clave_ruta, segundos):
+        self.peticiones += 1
+        muestras = self.latencias.get(clave_ruta)
+        if muestras is None:
+            muestras = self.latencias[clave_ruta] = deque(maxlen=MUESTRAS_LATENCIA)
+        muestras.append(segundos)
+
+    def resumen_latencias(self):
+        """Ruta -> {'peticiones', 'p50', 'p95', 'p99'} en milisegundos (sobre las muestras recientes)."""
+        resumen = {}
+        for clave_ruta, muestras in sorted(self.latencias.items()):
+            resumen[clave_ruta] = {'peticiones': len(muestras),
+                                   **{p: round(v * 1000, 3) for p, v in percentiles(muestras).items()}}
+        return resumen
+
+    def mostrar_latencias(self):
+        tabla = Table(title="Latencia de las peticiones (ms)")
+        tabla.add_column("Ruta", style="cyan")
+        for columna in ("Peticiones", "p50", "p95", "p99"):
+            tabla.add_column(columna, justify="right")
+        for clave_ruta, datos in self.resumen_latencias().items():
+            tabla.add_row(clave_ruta, str(datos['peticiones']), f"{datos['p50']:.3f}", f"{datos['p95']:.3f}",
+                          f"{datos['p99']:.3f}")
+        console.print(tabla)
+
+    def descartar_inactivas(self):
+        """Elimina las sesiones sin actividad reciente. Devuelve cuántas se eliminaron."""
+        limite = time.monotonic() - self.inactividad_s
+        inactivas = [id_sesion for id_sesion, s in self.sesiones.items() if s.ultima_actividad < limite]
+        for id_sesion in inactivas:
+            del self.sesiones[id_sesion]
+        return len(inactivas)
+
+    async def _mantenimiento(self, intervalo=60):
+        while True:
+            await asyncio.sleep(intervalo)
+            if descartadas := self.descartar_inactivas():
+                console.print(f"[yellow]⚠️ {descartadas} sesiones inactivas descartadas.[/yellow]")
+
+    async def ejecutar(self, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, al_iniciar=None):
+        """Sirve hasta que se cancela la tarea. 'al_iniciar' recibe el servidor asyncio ya escuchando."""
+        servidor = await asyncio.start_server(self.atender, host, puerto, limit=MAX_CABECERA, backlog=1024)
+        mantenimiento = asyncio.create_task(self._mantenimiento())
+        if al_iniciar:
+            al_iniciar(servidor)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            mantenimiento.cancel()
+
+
+def servir(preguntas, ruta_archivo, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, dir_resultados='.'):
+    """Arranca el servidor hasta Ctrl+C y muestra las latencias al terminar."""
+    servidor = ServidorExamen(preguntas, ruta_archivo, dir_resultados)
+
+    def al_iniciar(servidor_asyncio):
+        direcciones = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor_asyncio.sockets)
+        console.print(f"[green]✅ Servidor de examen escuchando en {direcciones} "
+                      f"({len(preguntas)} preguntas). Ctrl+C para detenerlo.[/green]")
+
+    try:
+        asyncio.run(servidor.ejecutar(host, puerto, al_iniciar))
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Servidor detenido.[/yellow]")
+    console.print(f"[cyan]{servidor.sesiones_creadas} sesiones creadas, {servidor.peticiones} peticiones atendidas.[/cyan]")
+    if servidor.peticiones:
+        servidor.mostrar_latencias()
+    return servidor
@@ -0,0 +1,182 @@
+# core/sesion.py
+# Estado de un examen independiente de la interfaz: pregunta actual, respuestas y resultado.
+import math
+import random
+import time
+import uuid
+from array import array
+from collections.abc import Sequence
+
+try:
+    from . import examen_runner, calificacion_masiva, calificador
+except ImportError:
+    import examen_runner
+    import calificacion_masiva
+    import calificador
+
+MODOS_SESION = ('examen', 'paso_a_paso') # Sin o con la corrección tras cada respuesta
+
+
+def validar_respuesta(pregunta, respuesta):
+    """
+    Letras elegidas (mayúsculas, ordenadas y sin repetir) a partir de una lista o
+    de un texto como 'AC'. Aplica las mismas reglas que la CLI; lanza ValueError
+    con el motivo si la respuesta no es válida para la pregunta.
+    """
+    letras = sorted({letra.upper() for letra in calificacion_masiva.letras_celda(respuesta)})
+    num_opciones = len(pregunta.opciones)
+    for letra in letras:
+        if len(letra) != 1 or not 'A' <= letra < chr(65 + num_opciones):
+            raise ValueError(f"La opción '{letra}' no es válida.")
+    if pregunta.es_multiple and len(letras) != len(pregunta.correctas):
+        raise ValueError(f"Debes seleccionar exactamente {len(pregunta.correctas)} opciones.")
+    if not pregunta.es_multiple and len(letras) > 1: # Como en la CLI, se admite dejarla en blanco
+        raise ValueError("Solo puedes seleccionar una opción.")
+    return letras
+
+
+def elegir_orden(preguntas, num_preguntas=None, aleatorio=None):
+    """
+    Índices en el banco de las preguntas de un examen: las 'num_preguntas' primeras
+    o, con 'aleatorio' (un random.Random), distintas al azar. En un banco perezoso
+    se omiten los bloques con formato inválido y solo se parsean los elegidos.
+    """
+    total = len(preguntas)
+    num_preguntas = total if num_preguntas is None else max(0, min(num_preguntas, total))
+    if hasattr(preguntas, 'indices_validos'):
+        return preguntas.indices_validos(num_preguntas, aleatorio)
+    return aleatorio.sample(range(total), num_preguntas) if aleatorio else range(num_preguntas)
+
+
+class PreguntasEnOrden(Sequence):
+    """Las preguntas del banco en el orden 'orden' (índices), sin copiarlas: cada una se pide al banco al usarla."""
+    __slots__ = ('banco', 'orden')
+
+    def __init__(self, banco, orden):
+        self.banco = banco
+        self.orden = orden
+
+    def __len__(self):
+        return len(self.orden)
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self.banco[i] for i in self.orden[posicion]]
+        return self.banco[self.orden[posicion]]
+
+
+class SesionExamen:
+    """
+    Examen de un candidato sobre un banco compartido de solo lectura. La sesión
+    solo guarda el orden de las preguntas (índices del banco) y las respuestas,
+    así que miles de sesiones pueden usar el mismo banco en memoria.
+    """
+    __slots__ = ('id', 'preguntas', 'candidato', 'modo', 'orden', 'respuestas', 'acertadas', 'tiempos', 'aciertos',
+                 'inicio', 'fin', 'ultima_actividad')
+
+    def __init__(self, preguntas, candidato='', num_preguntas=None, aleatorio=False, modo='examen',
+                 semilla=None, id_sesion=None, orden=None):
+        if modo not in MODOS_SESION:
+            raise ValueError(f"Modo de sesión desconocido: '{modo}'. Opciones: {', '.join(MODOS_SESION)}")
+        if orden is None: # 'orden' dado (índices del banco): restaurar una sesión guardada
+            orden = elegir_orden(preguntas, num_preguntas, random.Random(semilla) if aleatorio else None)
+
+        self.id = id_sesion or uuid.uuid4().hex
+        self.preguntas = preguntas
+        self.candidato = candidato
+        self.modo = modo
+        self.orden = array('L', orden)
+        self.respuestas = [] # Letras elegidas en cada pregunta, en orden
+        self.acertadas = bytearray() # 1 si la respuesta del mismo índice fue correcta
+        self.tiempos = array('d') # Segundos desde la respuesta anterior (o el inicio); NaN si no se midió
+        self.aciertos = 0
+        self.inicio = time.time()
+        self.fin = None
+        self.ultima_actividad = time.monotonic()
+
+    def __len__(self):
+        return len(self.orden)
+
+    @property
+    def indice(self):
+        """Posición (desde 0) de la pregunta que toca responder."""
+        return len(self.respuestas)
+
+    @property
+    def terminada(self):
+        return self.fin is not None or self.indice >= len(self.orden)
+
+    def pregunta_en(self, posicion):
+        """La pregunta en la posición 'posicion' (desde 0) del examen."""
+        return self.preguntas[self.orden[posicion]]
+
+    def pregunta_actual(self):
+        """La pregunta que toca responder, o None si ya no quedan."""
+        if self.terminada:
+            return None
+        return self.preguntas[self.orden[self.indice]]
+
+    def responder(self, respuesta):
+        """Valida y califica la respuesta a la pregunta actual y pasa a la siguiente. Devuelve si fue correcta."""
+        pregunta = self.pregunta_actual()
+        if pregunta is None:
+            raise ValueError("La sesión ya terminó.")
+        letras = validar_respuesta(pregunta, respuesta)
+        correcta = examen_runner.es_respuesta_correcta(pregunta, letras)
+        ahora = time.monotonic()
+        self.respuestas.append(letras)
+        self.acertadas.append(correcta)
+        self.tiempos.append(ahora - self.ultima_actividad)
+        self.aciertos += correcta
+        self.ultima_actividad = ahora
+        return correcta
+
+    def reproducir(self, respuestas):
+        """
+        Aplica de una vez respuestas ya validadas (p. ej. las de un diario): pares
+        (letras, numero) en orden desde la pregunta actual. Lanza ValueError si en
+        alguna posición ya no está la pregunta #numero (el banco cambió).
+        """
+        preguntas, orden = self.preguntas, self.orden
+        inicio = len(self.respuestas)
+        if inicio + len(respuestas) > len(orden):
+            raise ValueError("Hay más respuestas que preguntas en la sesión.")
+        for i, (letras, numero) in enumerate(respuestas, inicio):
+            pregunta = preguntas[orden[i]]
+            if str(pregunta.numero) != numero:
+                raise ValueError(f"La pregunta {i + 1} ya no es la #{numero}: el banco cambió desde que se inició la sesión.")
+            correcta = calificador.mascara_letras(letras) == pregunta.mascara
+            self.respuestas.append(list(letras))
+            self.acertadas.append(correcta)
+            self.tiempos.append(math.nan) # El tiempo no se guarda en el diario
+            self.aciertos += correcta
+        self.ultima_actividad = time.monotonic()
+
+    def finalizar(self):
+        """Cierra la sesión (aunque queden preguntas) y devuelve el resumen."""
+        if self.fin is None:
+            self.fin = time.time()
+        return self.resumen()
+
+    def resultados(self):
+        """Lista de (pregunta, respuesta) respondidas, como la espera el exportador."""
+        return [(self.preguntas[self.orden[i]], respuesta) for i, respuesta in enumerate(self.respuestas)]
+
+    def detalle(self):
+        """Lista de (pregunta, correcta, respuesta) respondidas, como la muestra la CLI."""
+        return [(self.preguntas[self.orden[i]], bool(self.acertadas[i]), respuesta)
+                for i, respuesta in enumerate(self.respuestas)]
+
+    def resumen(self):
+        respondidas = len(self.respuestas)
+        return {
+            'id': self.id,
+            'candidato': self.candidato,
+            'modo': self.modo,
+            'respondidas': respondidas,
+            'total': len(self.orden),
+            'aciertos': self.aciertos,
+            'porcentaje': round(self.aciertos / respondidas * 100, 2) if respondidas else 0.0,
+            'terminada': self.terminada,
+            'segundos': round((self.fin or time.time()) - self.inicio, 3),
+        }
@@ -0,0 +1,76 @@
+# core/teclado.py
+# Lectura de teclas sueltas (sin esperar Enter) para responder en la CLI.
+import contextlib
+import os
+import sys
+
+try:
+    import select
+    import termios
+    import tty
+except ImportError: # Windows
+    termios = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+ENTER = '\n'
+FIN = '' # Ctrl+D / fin de la entrada
+OTRA = None # Teclas especiales (flechas, F1...) que no se usan
+
+
+def disponible():
+    """True si la entrada es un terminal y se pueden leer teclas sueltas en esta plataforma."""
+    try:
+        return sys.stdin.isatty() and (termios is not None or msvcrt is not None)
+    except (AttributeError, ValueError): # stdin reemplazado o cerrado
+        return False
+
+
+def _leer_posix(fd):
+    dato = os.read(fd, 1)
+    if not dato or dato == b'\x04':
+        return FIN
+    if dato in (b'\r', b'\n'):
+        return ENTER
+    if dato == b'\x1b': # Secuencia de escape (flechas, F1...): leerla entera y descartarla
+        if select.select([fd], [], [], 0.01)[0] and os.read(fd, 1) in (b'[', b'O'):
+            while True:
+                dato = os.read(fd, 1)
+                if not dato or 0x40 <= dato[0] <= 0x7e: # Byte final de la secuencia
+                    break
+        return OTRA
+    return dato.decode('latin-1')
+
+
+def _leer_windows():
+    tecla = msvcrt.getwch()
+    if tecla in ('\x00', '\xe0'): # Tecla especial: llega en dos partes
+        msvcrt.getwch()
+        return OTRA
+    if tecla == '\x03':
+        raise KeyboardInterrupt
+    if tecla == '\x1a':
+        return FIN
+    if tecla == '\r':
+        return ENTER
+    return tecla
+
+
+@contextlib.contextmanager
+def teclas():
+    """
+    Pone el terminal en modo cbreak (sin eco ni espera de Enter; Ctrl+C sigue
+    funcionando) mientras dura el bloque, y devuelve una función que lee una tecla.
+    """
+    if termios is None:
+        yield _leer_windows
+        return
+    fd = sys.stdin.fileno()
+    anterior = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    try:
+        yield lambda: _leer_posix(fd)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, anterior)
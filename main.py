@@ -3,8 +3,10 @@ import tkinter as tk
 from tkinter import filedialog
 import os
 import sys
+import time
 from rich.console import Console
 from rich.prompt import Prompt # <--- IMPORTACIÓN AÑADIDA AQUÍ
+from rich.table import Table
 
 # Asegurarse de que los directorios core y ui estén en el path
 project_root = os.path.dirname(os.path.abspath(__file__))
@@ -13,7 +15,7 @@ sys.path.insert(0, os.path.join(project_root, 'core'))
 sys.path.insert(0, os.path.join(project_root, 'ui'))
 
 # Ahora importar módulos locales
-from core import parser, examen_runner, diagnostico, config as app_config
+from core import parser, examen_runner, diagnostico, registro_parser, cache, coleccion, calificacion_masiva, perfilado, servidor, diario, almacen, analisis, exportador, config as app_config
 from ui import gui
 
 console = Console()
@@ -30,15 +32,209 @@ def seleccionar_archivo_dialogo(initial_dir):
     root.destroy()
     return archivo
 
+def crear_registro(args, config):
+    """Registro del parser según la configuración; los argumentos de línea de comandos tienen prioridad."""
+    config_log = dict(config)
+    if getattr(args, 'log_nivel', None): config_log['log_parser_nivel'] = args.log_nivel
+    if getattr(args, 'log_formato', None): config_log['log_parser_formato'] = args.log_formato
+    if getattr(args, 'log_ruta', None): config_log['log_parser_ruta'] = args.log_ruta
+    return registro_parser.crear_desde_config(config_log)
+
+def ejecutar_calificacion(args):
+    """Subcomando 'calificar': califica hojas de respuestas sin interfaz."""
+    for ruta in (args.archivo, args.respuestas):
+        if not os.path.exists(ruta):
+            console.print(f"[bold red]❌ Archivo no encontrado: '{ruta}'.[/bold red]")
+            return 1
+
+    config = app_config.cargar_configuracion()
+    console.print(f"[cyan]Cargando preguntas desde: {args.archivo}[/cyan]")
+    with parser.sin_recolector():
+        preguntas = cache.cargar_desde_config(args.archivo, config, usar_cache=not args.no_cache,
+                                              motor=args.motor, registro=crear_registro(args, config))
+    if not preguntas:
+        console.print("[bold red]❌ No se pudieron cargar preguntas válidas del archivo.[/bold red]")
+        return 1
+    console.print(f"[green]✅ {len(preguntas)} preguntas cargadas correctamente.[/green]")
+
+    calificacion_masiva.calificar_archivo(preguntas, args.respuestas, ruta_salida=args.salida,
+                                          formato=args.formato, procesos=args.procesos)
+    return 0
+
+def ejecutar_servidor(args):
+    """Subcomando 'servir': carga el banco una vez y atiende exámenes por HTTP/JSON."""
+    if not os.path.exists(args.archivo) and not coleccion.es_coleccion(args.archivo):
+        console.print(f"[bold red]❌ Archivo no encontrado: '{args.archivo}'.[/bold red]")
+        return 1
+
+    config = app_config.cargar_configuracion()
+    console.print(f"[cyan]Cargando preguntas desde: {args.archivo}[/cyan]")
+    with parser.sin_recolector():
+        if coleccion.es_coleccion(args.archivo):
+            preguntas = coleccion.cargar_coleccion(args.archivo, config, usar_cache=not args.no_cache, motor=args.motor,
+                                                   registro=crear_registro(args, config))
+        else:
+            preguntas = cache.cargar_desde_config(args.archivo, config, usar_cache=not args.no_cache,
+                                                  motor=args.motor, registro=crear_registro(args, config))
+    if not preguntas:
+        console.print("[bold red]❌ No se pudieron cargar preguntas válidas del archivo.[/bold red]")
+        return 1
+
+    os.makedirs(args.dir_resultados, exist_ok=True)
+    servidor.servir(preguntas, args.archivo, host=args.host, puerto=args.puerto, dir_resultados=args.dir_resultados)
+    return 0
+
+def ejecutar_estadisticas(args):
+    """
+    Subcomando 'estadisticas': tasa de error de una pregunta, historial de un
+    candidato, análisis de ítems o preguntas más falladas.
+    """
+    ruta_db = args.db or app_config.cargar_configuracion().get('resultados_db') or almacen.RUTA_POR_DEFECTO
+    if not os.path.exists(ruta_db):
+        console.print(f"[bold red]❌ No existe el almacén de resultados '{ruta_db}'.[/bold red]")
+        return 1
+
+    with almacen.AlmacenResultados(ruta_db) as resultados:
+        if args.pregunta:
+            intentos, errores = resultados.tasa_error(args.pregunta, args.archivo, args.ultimos)
+            if not intentos:
+                console.print(f"[yellow]⚠️ La pregunta #{args.pregunta} no tiene intentos guardados.[/yellow]")
+            else:
+                console.print(f"Pregunta #{args.pregunta}: [bold]{errores / intentos:.1%}[/bold] de errores "
+                              f"({errores} de {intentos} intentos)")
+        elif args.candidato:
+            tabla = Table(title=f"Sesiones de {args.candidato}")
+            for columna in ("Fecha", "Archivo", "Interfaz", "Modo", "Respondidas", "Aciertos", "%"):
+                tabla.add_column(columna, overflow="fold")
+            for s in resultados.historial_candidato(args.candidato, args.limite):
+                porcentaje = s['aciertos'] / s['respondidas'] * 100 if s['respondidas'] else 0
+                tabla.add_row(time.strftime('%Y-%m-%d %H:%M', time.localtime(s['fin'])), os.path.basename(s['archivo']),
+                              s['interfaz'], s['modo'], f"{s['respondidas']}/{s['total']}", str(s['aciertos']),
+                              f"{porcentaje:.1f}")
+            console.print(tabla)
+        elif args.items or args.exportar:
+            return mostrar_analisis(args, resultados)
+        else:
+            tabla = Table(title="Preguntas con más errores")
+            for columna in ("Archivo", "Pregunta", "Intentos", "Errores", "%"):
+                tabla.add_column(columna, overflow="fold")
+            for archivo, numero, intentos, errores in resultados.estadisticas_preguntas(args.archivo, args.limite):
+                tabla.add_row(os.path.basename(archivo), str(numero), str(intentos), str(errores),
+                              f"{errores / intentos * 100:.1f}")
+            console.print(tabla)
+    return 0
+
+def mostrar_analisis(args, resultados):
+    """Análisis de ítems (dificultad, discriminación, distractores), de peor a mejor."""
+    try:
+        items = analisis.analizar(resultados, resultados.ruta + '.items.npz')
+    except ImportError as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return 1
+    filas = items.informe(analisis.nombres_items(resultados), args.ordenar, args.min_intentos, archivo=args.archivo)
+    if args.exportar:
+        exportar = exportador.exportar_analisis_csv if args.exportar.lower().endswith('.csv') else exportador.exportar_analisis_txt
+        exportar(filas, args.exportar)
+
+    tabla = Table(title=f"Análisis de ítems ({len(filas)} con al menos {args.min_intentos} intentos)")
+    for columna in ("Archivo", "Pregunta", "Intentos", "p", "r", "Opciones (* correcta)", "Revisar"):
+        tabla.add_column(columna, overflow="fold")
+    for fila in filas[:args.limite]:
+        opciones = ' '.join(f"{'*' if o['correcta'] else ''}{o['letra']}:{o['tasa']:.0%}" for o in fila['opciones'])
+        r = '-' if fila['discriminacion'] is None else f"{fila['discriminacion']:.2f}"
+        tabla.add_row(os.path.basename(fila['archivo']), str(fila['numero']), str(fila['intentos']),
+                      f"{fila['p']:.2f}", r, opciones, '; '.join(fila['alertas']))
+    console.print(tabla)
+    return 0
+
 def main():
     parser_args = argparse.ArgumentParser(description="Sistema de Examen v3.0")
     parser_args.add_argument('--interfaz', choices=['gui', 'cli'], help='Forzar modo GUI o CLI')
-    parser_args.add_argument('--archivo', type=str, help='Ruta al archivo de preguntas')
+    parser_args.add_argument('--archivo', type=str,
+                             help='Archivo de preguntas, o un directorio / patrón glob con varios archivos')
     parser_args.add_argument('--modo-cli', choices=['1', '2', '3', '4', '5', '6'],
                              help='Modo específico para CLI (1-5 Examen, 6 Diagnóstico)')
+    parser_args.add_argument('--motor', choices=list(parser.MOTORES), default=parser.MOTOR_POR_DEFECTO,
+                             help="Motor de parseo: 'estado' (una pasada, por defecto) o 'bloques' (anterior)")
+    parser_args.add_argument('--log-nivel', choices=list(registro_parser.NIVELES),
+                             help='Detalle del log del parser (por defecto, el de la configuración)')
+    parser_args.add_argument('--log-formato', choices=list(registro_parser.FORMATOS), help='Formato del log del parser')
+    parser_args.add_argument('--log-ruta', type=str, help='Ruta del log del parser')
+    parser_args.add_argument('--no-cache', action='store_true', help='Parsear siempre el archivo, sin usar la caché')
+    parser_args.add_argument('--procesos', type=int,
+                             help='Procesos para parsear archivos grandes (por defecto, todos los núcleos; 1 = en serie)')
+    parser_args.add_argument('--perezoso', action='store_true',
+                             help='Indexar el archivo y parsear cada pregunta solo al usarla (bancos muy grandes)')
+    parser_args.add_argument('--entrada', choices=list(examen_runner.MODOS_ENTRADA),
+                             help="CLI: responder con Enter ('linea') o con una sola tecla ('tecla')")
+    parser_args.add_argument('--reanudar', nargs='?', const='', metavar='DIARIO',
+                             help='Continuar el último examen que quedó a medias (o el del diario DIARIO)')
+    parser_args.add_argument('--perfil', '--profile', metavar='RUTA',
+                             help='Medir carga, pantallas, calificación y exportación; guarda una traza '
+                                  'Chrome trace-event (JSON) en RUTA y muestra un resumen por tramo')
     # Añadir otros argumentos si se desea (ej. --num-preguntas para modo 5)
 
+    subcomandos = parser_args.add_subparsers(dest='comando', metavar='comando')
+    args_calificar = subcomandos.add_parser('calificar', aliases=['grade'],
+                                            help='Calificar hojas de respuestas (CSV/JSONL) sin interfaz')
+    args_calificar.add_argument('--archivo', type=str, required=True, help='Ruta al archivo de preguntas')
+    args_calificar.add_argument('--respuestas', type=str, required=True, help='Hojas de respuestas (.csv o .jsonl)')
+    args_calificar.add_argument('--salida', type=str,
+                                help='Resultados JSONL (por defecto, <respuestas>_resultados.jsonl)')
+    args_calificar.add_argument('--formato', choices=list(calificacion_masiva.FORMATOS_HOJAS),
+                                help='Formato de las respuestas (por defecto, según la extensión)')
+    args_calificar.add_argument('--procesos', type=int,
+                                help='Procesos trabajadores (por defecto, automático según el tamaño)')
+    args_calificar.add_argument('--motor', choices=list(parser.MOTORES), default=parser.MOTOR_POR_DEFECTO,
+                                help='Motor de parseo')
+    args_calificar.add_argument('--no-cache', action='store_true', help='Parsear siempre el archivo, sin usar la caché')
+
+    args_servir = subcomandos.add_parser('servir', aliases=['serve'],
+                                         help='Servidor HTTP/JSON para que muchos candidatos hagan el examen a la vez')
+    args_servir.add_argument('--archivo', type=str, required=True,
+                             help='Archivo de preguntas, o un directorio / patrón glob con varios archivos')
+    args_servir.add_argument('--host', default=servidor.HOST_POR_DEFECTO, help='Dirección en la que escuchar')
+    args_servir.add_argument('--puerto', type=int, default=servidor.PUERTO_POR_DEFECTO, help='Puerto TCP')
+    args_servir.add_argument('--dir-resultados', default='.', help='Directorio donde se exportan los resultados')
+    args_servir.add_argument('--motor', choices=list(parser.MOTORES), default=parser.MOTOR_POR_DEFECTO,
+                             help='Motor de parseo')
+    args_servir.add_argument('--no-cache', action='store_true', help='Parsear siempre el archivo, sin usar la caché')
+
+    args_estadisticas = subcomandos.add_parser('estadisticas', aliases=['stats'],
+                                               help='Consultar el almacén de resultados (tasa de error, historial, análisis de ítems)')
+    args_estadisticas.add_argument('--db', type=str, help="Base de datos (por defecto, 'resultados_db' de la configuración)")
+    args_estadisticas.add_argument('--pregunta', type=str, help='Número de pregunta: tasa de error')
+    args_estadisticas.add_argument('--archivo', type=str, help='Solo las preguntas de este banco')
+    args_estadisticas.add_argument('--ultimos', type=int, help='Solo los últimos N intentos de la pregunta')
+    args_estadisticas.add_argument('--candidato', type=str, help='Historial de sesiones del candidato')
+    args_estadisticas.add_argument('--limite', type=int, default=20, help='Filas a mostrar')
+    args_estadisticas.add_argument('--items', action='store_true',
+                                   help='Análisis de ítems: dificultad, discriminación y opciones elegidas (requiere NumPy)')
+    args_estadisticas.add_argument('--ordenar', choices=list(analisis.ORDENES), default='discriminacion',
+                                   help='Criterio del análisis de ítems (de peor a mejor)')
+    args_estadisticas.add_argument('--min-intentos', type=int, default=30,
+                                   help='Análisis de ítems: solo preguntas con al menos N intentos')
+    args_estadisticas.add_argument('--exportar', type=str, metavar='RUTA',
+                                   help='Guardar el análisis de ítems completo en RUTA (.txt o .csv)')
+
     args = parser_args.parse_args()
+    if not args.perfil:
+        return ejecutar(args)
+    perfilado.activar()
+    try:
+        return ejecutar(args)
+    finally:
+        perfilado.finalizar(args.perfil)
+
+
+def ejecutar(args):
+    """Carga las preguntas y lanza la interfaz o el subcomando elegido."""
+    if args.comando in ('calificar', 'grade'):
+        return ejecutar_calificacion(args)
+    if args.comando in ('servir', 'serve'):
+        return ejecutar_servidor(args)
+    if args.comando in ('estadisticas', 'stats'):
+        return ejecutar_estadisticas(args)
 
     # --- Cargar Configuración ---
     # Nota: Cargar config aquí para obtener ultima_ruta para el diálogo
@@ -47,6 +243,18 @@ def main():
     modo_interfaz_preferido = args.interfaz or config.get('ultimo_modo_interfaz', 'gui')
 
 
+    # --- Sesión a reanudar (su diario indica archivo e interfaz si no se dan) ---
+    reanudacion = None
+    if args.reanudar is not None:
+        reanudacion = diario.buscar_pendiente(config, args.reanudar or None, args.archivo)
+        if reanudacion is None:
+            console.print("[yellow]⚠️ No hay ningún examen a medias que reanudar; se empieza uno nuevo.[/yellow]")
+        else:
+            cabecera = reanudacion[1].cabecera
+            args.archivo = args.archivo or cabecera.get('archivo')
+            modo_interfaz_preferido = args.interfaz or cabecera.get('interfaz', modo_interfaz_preferido)
+            args.interfaz = modo_interfaz_preferido
+
     # --- Seleccionar Archivo ---
     ruta_archivo = args.archivo # Prioridad: argumento de línea de comandos
     config_a_guardar = {} # Diccionario para guardar cambios de config
@@ -69,9 +277,9 @@ def main():
             ruta_archivo = seleccionar_archivo_dialogo(directorio_inicial)
 
     # Validar que el archivo seleccionado existe AHORA
-    if not ruta_archivo or not os.path.exists(ruta_archivo):
+    if not ruta_archivo or not (os.path.exists(ruta_archivo) or coleccion.es_coleccion(ruta_archivo)):
          console.print(f"[bold red]❌ Archivo no válido o no seleccionado: '{ruta_archivo}'. Saliendo.[/bold red]")
-         return
+         return 1
 
     console.print(f"[cyan]Usando archivo: {ruta_archivo}[/cyan]")
     config_a_guardar['ultima_ruta'] = ruta_archivo # Guardar la ruta que se usará
@@ -80,7 +288,22 @@ def main():
     # --- Cargar Preguntas ---
     # Se hace aquí DESPUÉS de seleccionar el archivo
     console.print(f"[cyan]Cargando preguntas desde: {ruta_archivo}[/cyan]")
-    preguntas = parser.cargar_preguntas(ruta_archivo)
+    es_coleccion = coleccion.es_coleccion(ruta_archivo)
+    if es_coleccion and args.perezoso:
+        console.print("[yellow]⚠️ --perezoso solo se aplica a un único archivo; se cargará el banco completo.[/yellow]")
+        args.perezoso = False
+
+    with parser.sin_recolector(): # Aún no hay ventana ni otros hilos
+        if es_coleccion:
+            # Directorio o patrón glob: varios archivos en paralelo, con números 'archivo:numero'
+            preguntas = coleccion.cargar_coleccion(ruta_archivo, config, usar_cache=not args.no_cache, motor=args.motor,
+                                                   registro=crear_registro(args, config), procesos=args.procesos)
+        elif args.perezoso:
+            preguntas = cache.cargar_perezoso_desde_config(ruta_archivo, config, usar_cache=not args.no_cache)
+        else:
+            preguntas = cache.cargar_desde_config(ruta_archivo, config, usar_cache=not args.no_cache,
+                                                  motor=args.motor, registro=crear_registro(args, config),
+                                                  procesos=args.procesos)
 
     if not preguntas:
         console.print("[bold red]❌ No se pudieron cargar preguntas válidas del archivo.[/bold red]")
@@ -88,13 +311,18 @@ def main():
         # Permitir continuar SOLO si se elige CLI explícitamente para diagnóstico
         if not (args.interfaz == 'cli' or args.modo_cli == '6'):
              input("Presione Enter para salir...")
-             return
+             return 1
         # Si es CLI y podría ser diagnóstico, pasamos lista vacía
+    elif args.perezoso:
+         console.print(f"[green]✅ {len(preguntas)} preguntas indexadas (se cargan al usarlas).[/green]")
+         console.print(f"   [cyan]Memoria del índice: {preguntas.memoria_bytes() / (1024 * 1024):.1f} MB[/cyan]")
+         input("Presione Enter para continuar...")
     else:
          console.print(f"[green]✅ {len(preguntas)} preguntas cargadas correctamente.[/green]")
-         preguntas_multiples = sum(1 for p in preguntas if p.es_multiple)
+         preguntas_multiples = preguntas.num_multiples()
          console.print(f"   [cyan]Selección única: {len(preguntas) - preguntas_multiples}[/cyan]")
          console.print(f"   [cyan]Selección múltiple: {preguntas_multiples}[/cyan]")
+         console.print(f"   [cyan]Memoria del banco: {preguntas.memoria_bytes() / (1024 * 1024):.1f} MB[/cyan]")
          input("Presione Enter para continuar...")
 
 
@@ -121,23 +349,28 @@ def main():
     # --- Ejecutar ---
     if modo_interfaz == 'cli':
         # Pasar preguntas incluso si está vacío para permitir diagnóstico
-        examen_runner.iniciar_cli(preguntas if preguntas else [], ruta_archivo, args.modo_cli)
+        examen_runner.iniciar_cli(preguntas if preguntas else [], ruta_archivo, args.modo_cli, args.entrada,
+                                  reanudacion if preguntas else None)
     else:
         # Solo iniciar GUI si hay preguntas
         if not preguntas:
              console.print("[bold red]No hay preguntas cargadas. No se puede iniciar la GUI.[/bold red]")
              console.print("[yellow]Use la interfaz CLI (opción 6) para diagnosticar el archivo.[/yellow]")
-             return
-        gui.iniciar_gui(ruta_archivo, preguntas) # Pasar preguntas ya cargadas
+             return 1
+        gui.iniciar_gui(ruta_archivo, preguntas, reanudacion) # Pasar preguntas ya cargadas
 
 if __name__ == "__main__":
+    codigo = 0 # Código de salida: los subcomandos sin interfaz (p. ej. 'calificar') lo usan en scripts
     try:
-        main()
+        codigo = main() or 0
     except KeyboardInterrupt:
         console.print("\n[bold yellow]Programa interrumpido por el usuario.[/bold yellow]")
+        codigo = 130
     except Exception as e:
         console.print(f"\n[bold red]Error inesperado en main: {str(e)}[/bold red]")
         # Mostrar traceback detallado
         console.print_exception(show_locals=True)
+        codigo = 1
     finally:
-        console.print("\n[bold cyan]Examen Aplicación Finalizado.[/bold cyan]")
\ No newline at end of file
+        console.print("\n[bold cyan]Examen Aplicación Finalizado.[/bold cyan]")
+    sys.exit(codigo)
\ No newline at end of file
@@ -0,0 +1,6 @@
+# tests/conftest.py
+# Permite importar 'core', 'bench' y 'ui' al lanzar pytest desde la raíz del proyecto.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
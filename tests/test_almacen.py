@@ -0,0 +1,54 @@
+# tests/test_almacen.py
+# Un almacén creado con el esquema 1 se migra al abrirlo sin perder lo guardado.
+import re
+import sqlite3
+
+import pytest
+
+from core import almacen
+from core.parser import Pregunta
+
+P1 = Pregunta('1', '¿Uno?', ['a', 'b', 'c', 'd'], ['D'], False)
+P2 = Pregunta('2', '¿Dos?', ['a', 'b'], ['A', 'B'], True)
+
+
+def crear_v1(ruta):
+    """Base de datos como la dejaba la versión 1: sin num_opciones ni mascara_correcta."""
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript(re.sub(r'\n    (num_opciones|mascara_correcta) INTEGER,[^\n]*', '', almacen.ESQUEMA))
+    conexion.execute("PRAGMA user_version=1")
+    conexion.commit()
+    return conexion
+
+
+def test_migracion_desde_v1(tmp_path):
+    ruta = str(tmp_path / 'resultados.sqlite3')
+    conexion = crear_v1(ruta)
+    conexion.execute("INSERT INTO preguntas (archivo, numero, hash) VALUES (?, ?, ?)",
+                     ('/banco.txt', '1', almacen.hash_pregunta(P1)))
+    conexion.commit()
+    conexion.close()
+
+    with almacen.AlmacenResultados(ruta) as resultados:
+        assert resultados.conexion.execute("PRAGMA user_version").fetchone()[0] == almacen.VERSION_ESQUEMA
+        columnas = {fila[1] for fila in resultados.conexion.execute("PRAGMA table_info(preguntas)")}
+        assert {'num_opciones', 'mascara_correcta'} <= columnas
+        assert resultados.conexion.execute("SELECT num_opciones FROM preguntas").fetchall() == [(None,)]
+
+        resultados.guardar_sesion('/banco.txt', [(P1, False, 'A'), (P2, True, 'AB')], candidato='ana', total=2)
+        filas = resultados.conexion.execute(
+            "SELECT id, numero, num_opciones, mascara_correcta FROM preguntas ORDER BY id").fetchall()
+    # La pregunta ya dada de alta conserva su id y recibe los datos nuevos
+    assert filas == [(1, '1', 4, 0b1000), (2, '2', 2, 0b11)]
+
+    with almacen.AlmacenResultados(ruta) as resultados: # Reabrir una base ya migrada
+        assert resultados.conexion.execute("SELECT COUNT(*) FROM respuestas").fetchone()[0] == 2
+
+
+def test_version_desconocida(tmp_path):
+    ruta = str(tmp_path / 'resultados.sqlite3')
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(f"PRAGMA user_version={almacen.VERSION_ESQUEMA + 1}")
+    conexion.close()
+    with pytest.raises(sqlite3.DatabaseError):
+        almacen.AlmacenResultados(ruta)
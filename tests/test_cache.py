@@ -0,0 +1,25 @@
+# tests/test_cache.py
+# La caché de bancos no devuelve lo parseado con otro motor u otras opciones.
+from bench import generador
+from core import cache, registro_parser
+
+
+def cargar(ruta, dir_cache, **opciones):
+    detalles = {}
+    preguntas = cache.cargar_preguntas(ruta, dir_cache=dir_cache, detalles=detalles,
+                                       registro=registro_parser.RegistroParser(nivel='ninguno'), **opciones)
+    return preguntas, detalles['de_cache']
+
+
+def test_entrada_por_motor(tmp_path):
+    ruta = str(tmp_path / 'banco.txt')
+    generador.generar_banco(ruta, 50, semilla=2)
+    dir_cache = str(tmp_path / 'cache')
+
+    estado, de_cache = cargar(ruta, dir_cache)
+    assert not de_cache
+    assert cargar(ruta, dir_cache, motor='estado')[1] # Motor por defecto: misma entrada
+    bloques, de_cache = cargar(ruta, dir_cache, motor='bloques')
+    assert not de_cache
+    assert list(bloques) == list(estado)
+    assert cargar(ruta, dir_cache, motor='bloques', procesos=1, progreso=lambda *_: None)[1]
@@ -0,0 +1,49 @@
+# tests/test_calificador.py
+# Calificar por máscaras de bits debe dar lo mismo que la comparación de conjuntos anterior.
+import itertools
+import random
+
+import pytest
+
+from core import calificador, examen_runner
+from core.parser import Pregunta
+
+
+def correcta_por_conjuntos(correctas, respuesta_usuario):
+    """La comparación original de examen_runner.es_respuesta_correcta."""
+    if not isinstance(respuesta_usuario, list):
+        respuesta_usuario = [respuesta_usuario] if isinstance(respuesta_usuario, str) else []
+    return set(r.upper() for r in respuesta_usuario if r) == set(correctas)
+
+
+CORRECTAS = (['A'], ['C'], ['A', 'C'], ['B', 'C', 'D'])
+RESPUESTAS = (
+    [], [''], ['A'], ['a'], ['C', 'A'], ['A', 'C', 'A'], ['c', 'A'], ['AC'], ['A', 'B'], ['B', 'D', 'C'],
+    ['b', 'c', 'd'], ['1'], ['A', '?'], 'A', 'a', 'AC', '', None, ['A', ''],
+)
+
+
+@pytest.mark.parametrize('correctas, respuesta', list(itertools.product(CORRECTAS, RESPUESTAS)))
+def test_mascara_igual_que_conjuntos(correctas, respuesta):
+    pregunta = Pregunta('1', '¿?', ['a', 'b', 'c', 'd'], correctas, len(correctas) > 1)
+    esperado = correcta_por_conjuntos(correctas, respuesta)
+    assert examen_runner.es_respuesta_correcta(pregunta, respuesta) == esperado
+    assert (calificador.mascara_respuesta(respuesta) == pregunta.mascara) == esperado
+
+
+@pytest.mark.parametrize('usar_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(
+    calificador.np is None, reason='NumPy no instalado'))])
+def test_calificar_lote_igual_que_conjuntos(usar_numpy):
+    aleatorio = random.Random(0)
+    letras = 'ABCDE'
+    correctas = [sorted(aleatorio.sample(letras, aleatorio.randint(1, 3))) for _ in range(30)]
+    sesiones = [[aleatorio.choice([c, sorted(aleatorio.sample(letras, aleatorio.randint(0, 3))), ['AB']])
+                 for c in correctas] for _ in range(20)]
+
+    aciertos, puntuaciones = calificador.calificar_lote(
+        [calificador.mascara_letras(c) for c in correctas],
+        [calificador.mascaras_respuestas(fila) for fila in sesiones], usar_numpy=usar_numpy)
+
+    esperado = [[correcta_por_conjuntos(c, r) for c, r in zip(correctas, fila)] for fila in sesiones]
+    assert [[bool(x) for x in fila] for fila in aciertos] == esperado
+    assert [int(p) for p in puntuaciones] == [sum(fila) for fila in esperado]
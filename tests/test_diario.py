@@ -0,0 +1,65 @@
+# tests/test_diario.py
+# Reanudar tras un cierre brusco: las respuestas anotadas en el diario se recuperan.
+import os
+import subprocess
+import sys
+import textwrap
+
+from core import diario
+from core.parser import Pregunta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BANCO = [Pregunta(str(n), f'¿Pregunta {n}?', ['a', 'b', 'c'], [letra], False)
+         for n, letra in zip(range(1, 6), 'ABCAB')]
+
+
+def escribir_y_caerse(directorio):
+    """Anota una sesión en un proceso aparte que termina sin cerrar el diario (como un corte)."""
+    codigo = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {RAIZ!r})
+        from core import diario
+        d = diario.crear_desde_config({{'diario_dir': {directorio!r}, 'diario_fsync_s': 0}})
+        d.iniciar_sesion('terminada', [0], 'examen', archivo='/banco.txt')
+        d.anotar('terminada', 0, ['A'], '1')
+        d.terminar_sesion('terminada')
+        d.iniciar_sesion('s1', [4, 2, 0, 1], 'examen', archivo='/banco.txt', candidato='ana')
+        d.anotar('s1', 0, ['A'], '5')
+        d.anotar('s1', 1, ['C'], '3')
+        d.anotar('s1', 0, ['B'], '5') # Cambiada al volver atrás: gana la última
+        d.anotar('s1', 2, [], '1')
+        print(d.ruta)
+        os._exit(1)
+    """)
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True)
+    assert salida.returncode == 1, salida.stderr
+    return salida.stdout.strip()
+
+
+def test_reanudar_tras_cierre_brusco(tmp_path):
+    directorio = str(tmp_path / 'diarios')
+    ruta = escribir_y_caerse(directorio)
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write("R\ts1\t3\tA") # Registro a medio escribir cuando se cortó
+
+    encontrada = diario.buscar_pendiente({'diario_dir': directorio}, ruta_archivo='/banco.txt')
+    assert encontrada is not None
+    ruta_pendiente, estado = encontrada
+    assert (ruta_pendiente, estado.id) == (ruta, 's1')
+    assert estado.respuestas == [('B', '5'), ('C', '3'), ('', '1')]
+
+    examen = diario.restaurar_sesion(BANCO, estado)
+    assert list(examen.orden) == [4, 2, 0, 1]
+    assert examen.indice == 3
+    assert examen.candidato == 'ana'
+    assert examen.aciertos == 2 # 5 -> B y 3 -> C correctas; la 1 en blanco
+
+
+def test_sesion_terminada_no_queda_pendiente(tmp_path):
+    ruta = str(tmp_path / 'a.diario')
+    with diario.Diario(ruta, intervalo_s=0) as d:
+        d.iniciar_sesion('s1', [0], 'examen')
+        d.terminar_sesion('s1')
+    assert not os.path.exists(ruta)
+    assert diario.buscar_pendiente({'diario_dir': str(tmp_path)}) is None
+    assert os.path.exists(ruta + diario.SUFIJO_TERMINADO)
@@ -0,0 +1,58 @@
+# tests/test_parser.py
+# El motor 'estado' debe dar exactamente lo mismo que el motor 'bloques' de referencia.
+import io
+
+import pytest
+
+from bench import generador
+from core import parser
+
+CASOS_LIMITE = (
+    "1:\n¿Uno?\nA. a\nB. b\nCorrect Answer: A\n",
+    "Texto previo\n1:\n¿Uno?\nA. a\nB. b\nCorrect Answer: B.\n2:\n",
+    "1:   \n  ¿Espacios?  \n A. a\nB.b\n\ncorrect answer:a\n",
+    "1:\n¿Sin correcta?\nA. a\nB. b\n2:\n¿Dos?\nA. a\nB. b\nCorrect Answer: C\n",
+    "1:\n¿Varias?\nA. a\nB. b\nC. c\nCorrect Answer: A\nCorrect Answer: C\n3: no es cabecera\n",
+    "1:\nEnunciado\nen dos líneas\nA. opción\nque sigue\nB. b\nCorrect Answer: B extra\n",
+    "",
+    "1:",
+)
+
+
+def parsear(texto, motor):
+    problemas = []
+    preguntas = [tuple(p) for p in parser.iter_preguntas_de(io.StringIO(texto), problemas, motor,
+                                                            mostrar_errores=False)]
+    return preguntas, problemas
+
+
+@pytest.mark.parametrize('texto', CASOS_LIMITE)
+def test_motores_equivalentes_en_casos_limite(texto):
+    assert parsear(texto, 'estado') == parsear(texto, 'bloques')
+
+
+def test_motores_equivalentes_en_banco_sintetico():
+    texto = ''.join(generador.generar_bloques(500, proporcion_malformadas=0.2, semilla=3))
+    preguntas, problemas = parsear(texto, 'estado')
+    assert (preguntas, problemas) == parsear(texto, 'bloques')
+    assert preguntas and problemas
+
+
+@pytest.mark.parametrize('tam_lectura', [1, 2, 3, 5, 7, 16, 64])
+def test_cabeceras_en_el_limite_de_los_trozos(monkeypatch, tam_lectura):
+    # Trozos diminutos: las cabeceras 'N:' caen partidas entre dos lecturas en todas las posiciones
+    texto = ''.join(generador.generar_bloques(40, proporcion_malformadas=0.2, semilla=tam_lectura))
+    referencia = parsear(texto, 'bloques')
+    monkeypatch.setattr(parser, 'TAM_LECTURA', tam_lectura)
+    assert parsear(texto, 'estado') == referencia
+
+
+def test_cargar_preguntas_lee_crlf_como_lf(tmp_path):
+    texto = ''.join(generador.generar_bloques(50, semilla=1))
+    (tmp_path / 'lf.txt').write_bytes(texto.encode('utf-8'))
+    (tmp_path / 'crlf.txt').write_bytes(texto.replace('\n', '\r\n').encode('utf-8'))
+    registro = parser.RegistroParser(nivel='ninguno')
+    for motor in parser.MOTORES:
+        lf = parser.cargar_preguntas(str(tmp_path / 'lf.txt'), motor=motor, registro=registro)
+        assert parser.cargar_preguntas(str(tmp_path / 'crlf.txt'), motor=motor, registro=registro) == lf
+        assert len(lf) == 50
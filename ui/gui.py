@@ -4,29 +4,85 @@ import random
 import os # Para path de config
 import sys # Para path
 import time # Para Exportación
+import uuid # Id de la sesión en el diario
 from tkinter import filedialog # Para Abrir Archivo
+from tkinter import ttk # Barra de progreso de las tareas en segundo plano
 
 # Asegurarse de que el directorio raíz esté en el path para encontrar 'core'
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from core import parser, examen_runner, exportador, config as app_config
+from core import parser, examen_runner, exportador, registro_parser, cache, coleccion, perfilado, diario, almacen, config as app_config
+from core import sesion as sesion_examen
 from ui.popup_correcto import mostrar_popup_correcto
 from ui.popup_incorrecto import mostrar_popup_incorrecto
+from ui.tareas import TareaFondo
+from ui.widgets import GrupoOpciones
 
 class SimuladorExamenGUI:
-    def __init__(self, root, preguntas_originales, ruta_archivo):
+    def __init__(self, root, preguntas_originales, ruta_archivo, reanudar=None):
         self.root = root
-        self.preguntas_originales = preguntas_originales # Mantener lista original
-        self.preguntas_actuales = list(preguntas_originales) # Copia para el examen actual
+        self.preguntas_originales = preguntas_originales # Banco completo (columnar o perezoso): no se copia
+        self.orden_actual = list(sesion_examen.elegir_orden(preguntas_originales)) # Índices en el banco del examen actual
+        self.preguntas_actuales = sesion_examen.PreguntasEnOrden(preguntas_originales, self.orden_actual)
         self.ruta_archivo = ruta_archivo
         self.indice_actual = 0
         self.resultados_examen = [] # Almacena tuplas: (pregunta_obj, respuesta_usuario_lista)
+        self.tiempos_examen = [] # Segundos desde que se mostró cada pregunta hasta responderla (None: sin medir)
+        self.pregunta_mostrada_en = time.perf_counter()
         self.modo_examen = "paso_a_paso" # 'paso_a_paso', 'examen_completo'
+        self.diario = diario.DIARIO_NULO # Cada respuesta se anota aquí (ver core/diario.py)
+        self.id_sesion = None
+        self.inicio_sesion = time.time()
+        self.tarea = None # TareaFondo en curso (carga o exportación); solo una a la vez
 
+        if reanudar is not None:
+            self.reanudar_sesion(reanudar)
+        else:
+            self.iniciar_diario()
         self.setup_ui()
         self.mostrar_pregunta_actual()
 
+    def iniciar_diario(self, ruta_diario=None):
+        """Abre el diario (una vez por ventana) y anota el inicio del examen actual."""
+        if self.diario is diario.DIARIO_NULO:
+            self.diario = diario.crear_desde_config(app_config.cargar_configuracion(), ruta_diario)
+        if ruta_diario is None:
+            self.id_sesion = uuid.uuid4().hex
+            self.inicio_sesion = time.time()
+            self.diario.iniciar_sesion(self.id_sesion, self.orden_actual, self.modo_sesion(), inicio=self.inicio_sesion,
+                                       archivo=os.path.abspath(self.ruta_archivo), interfaz='gui')
+
+    def modo_sesion(self):
+        """Modo del examen actual con los nombres de core/sesion.py."""
+        return 'examen' if self.modo_examen == "examen_completo" else 'paso_a_paso'
+
+    def terminar_diario(self):
+        """Marca como terminado el examen actual en el diario (ya no se podrá reanudar)."""
+        if self.id_sesion is not None:
+            self.diario.terminar_sesion(self.id_sesion)
+            self.id_sesion = None
+
+    def reanudar_sesion(self, reanudar):
+        """Restaura orden, modo y respuestas de la sesión del diario 'reanudar' = (ruta_diario, estado)."""
+        ruta_diario, estado = reanudar
+        try:
+            examen = diario.restaurar_sesion(self.preguntas_originales, estado)
+        except ValueError as e:
+            messagebox.showerror("No se puede reanudar", f"No se puede reanudar la sesión de:\n{ruta_diario}\n\n{e}")
+            self.iniciar_diario()
+            return
+        self.orden_actual = list(examen.orden)
+        self.preguntas_actuales = sesion_examen.PreguntasEnOrden(self.preguntas_originales, self.orden_actual)
+        self.resultados_examen = examen.resultados()
+        self.tiempos_examen = [None] * len(self.resultados_examen) # El diario no guarda los tiempos
+        self.indice_actual = examen.indice
+        self.modo_examen = "examen_completo" if examen.modo == 'examen' else "paso_a_paso"
+        self.id_sesion = examen.id
+        self.inicio_sesion = examen.inicio
+        self.iniciar_diario(ruta_diario)
+        self.diario.continuar_sesion(examen.id)
+
     def setup_ui(self):
         self.root.title(f"Simulador de Examen - {os.path.basename(self.ruta_archivo)}")
         self.root.geometry("850x550") # Más alto para feedback/botones
@@ -40,6 +96,7 @@ class SimuladorExamenGUI:
         self.file_menu = Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Archivo", menu=self.file_menu)
         self.file_menu.add_command(label="Abrir Archivo...", command=self.abrir_archivo)
+        self.file_menu.add_command(label="Abrir Directorio...", command=self.abrir_directorio)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Salir", command=self.root.quit)
 
@@ -79,6 +136,10 @@ class SimuladorExamenGUI:
 
         self.frame_opciones = tk.Frame(self.root, bg="white")
         self.frame_opciones.pack(fill="both", expand=True, anchor="nw", padx=20) # Expandir para opciones largas
+        # Checkbuttons reutilizados entre preguntas (ver ui/widgets.py)
+        self.opciones = GrupoOpciones(self.frame_opciones, font=("Arial", 12), anchor="nw", justify="left",
+                                      wraplength=750, bg="white", padx=10, pady=2)
+        self.vars_opciones = []
 
         self.frame_botones = tk.Frame(self.root, bg="white")
         self.frame_botones.pack(fill="x", pady=10, padx=20)
@@ -89,11 +150,21 @@ class SimuladorExamenGUI:
         self.boton_siguiente = tk.Button(self.frame_botones, text="Siguiente ➡", command=self.procesar_respuesta_y_avanzar, font=("Arial", 12, "bold"))
         self.boton_siguiente.pack(side="right", padx=5)
 
+        # Barra de estado de las tareas en segundo plano (oculta mientras no hay ninguna)
+        self.frame_estado = tk.Frame(self.root, bg="white")
+        self.estado_label = tk.Label(self.frame_estado, text="", font=("Arial", 10), bg="white", anchor="w")
+        self.estado_label.pack(side="left", fill="x", expand=True)
+        self.boton_cancelar = tk.Button(self.frame_estado, text="Cancelar", command=self.cancelar_tarea, font=("Arial", 10))
+        self.boton_cancelar.pack(side="right", padx=5)
+        self.barra_progreso = ttk.Progressbar(self.frame_estado, length=250)
+        self.barra_progreso.pack(side="right", padx=5)
+
         # Espacio para feedback en modo examen completo (opcional)
         # self.feedback_label = tk.Label(self.root, text="", font=("Arial", 10), bg="white")
         # self.feedback_label.pack(pady=5)
 
 
+    @perfilado.medido('gui.mostrar_pregunta_actual')
     def mostrar_pregunta_actual(self):
         if not self.preguntas_actuales or self.indice_actual >= len(self.preguntas_actuales):
             self.finalizar_examen()
@@ -112,36 +183,27 @@ class SimuladorExamenGUI:
         self.pregunta_text.insert("1.0", f"{self.indice_actual + 1}. {p.enunciado}")
         self.pregunta_text.config(state="disabled")
 
-        # Limpiar opciones anteriores
-        for widget in self.frame_opciones.winfo_children():
-            widget.destroy()
-
-        # Crear checkboxes para opciones
-        self.vars_opciones = []
         letras_validas = [chr(65 + i) for i in range(len(p.opciones))]
 
-        for i, opcion_texto in enumerate(p.opciones):
-            var = tk.BooleanVar() # Usar BooleanVar para checkboxes
-            letra = letras_validas[i]
-            cb = tk.Checkbutton(self.frame_opciones, text=f"{letra}. {opcion_texto}", variable=var,
-                                font=("Arial", 12), anchor="nw", justify="left", wraplength=750, # Ajustar wraplength
-                                bg="white", padx=10, pady=2)
-            cb.pack(fill="x", anchor="w")
-            self.vars_opciones.append((var, letra)) # Guardar variable y letra asociada
-
         # Restaurar selección si se está navegando hacia atrás/adelante en modo examen
+        marcadas = set()
         if self.modo_examen == "examen_completo" and self.indice_actual < len(self.resultados_examen):
             pregunta_guardada, respuesta_guardada = self.resultados_examen[self.indice_actual]
             if pregunta_guardada.numero == p.numero and respuesta_guardada: # Si hay respuesta guardada para esta pregunta
-                 for var, letra in self.vars_opciones:
-                      if letra in respuesta_guardada:
-                           var.set(True)
+                 marcadas = {i for i, letra in enumerate(letras_validas) if letra in respuesta_guardada}
+
+        # Reutilizar los checkboxes: solo cambian texto, marca y cuántos se ven
+        self.opciones.mostrar([f"{letra}. {texto}" for letra, texto in zip(letras_validas, p.opciones)], marcadas)
+        self.vars_opciones = list(zip(self.opciones.variables, letras_validas)) # (variable, letra) de cada opción
+
+        self.pregunta_mostrada_en = time.perf_counter()
 
         # Actualizar estado botones navegación
         self.boton_anterior.config(state="normal" if self.indice_actual > 0 and self.modo_examen == "examen_completo" else "disabled")
         self.boton_siguiente.config(text="Siguiente ➡" if self.indice_actual < num_total - 1 else "Finalizar Examen")
 
 
+    @perfilado.medido('gui.procesar_respuesta_y_avanzar')
     def procesar_respuesta_y_avanzar(self):
             if not self.preguntas_actuales or self.indice_actual >= len(self.preguntas_actuales):
                 # Si el índice está fuera de rango (ya terminó), no hacer nada o finalizar explícitamente
@@ -166,7 +228,11 @@ class SimuladorExamenGUI:
             # --- Guardar Respuesta ---
             while len(self.resultados_examen) <= self.indice_actual:
                 self.resultados_examen.append(None)
+                self.tiempos_examen.append(None)
             self.resultados_examen[self.indice_actual] = (p, seleccionadas)
+            self.tiempos_examen[self.indice_actual] = time.perf_counter() - self.pregunta_mostrada_en
+            if self.id_sesion is not None:
+                self.diario.anotar(self.id_sesion, self.indice_actual, seleccionadas, p.numero)
 
             # --- Deshabilitar Botón ANTES de mostrar popup ---
             self.boton_siguiente.config(state="disabled")
@@ -216,11 +282,14 @@ class SimuladorExamenGUI:
              self.mostrar_pregunta_actual()
 
 
+    @perfilado.medido('gui.finalizar_examen')
     def finalizar_examen(self):
         """Muestra el resumen final, calcula resultados y ofrece exportar."""
         # Deshabilitar botones de navegación
         self.boton_siguiente.config(state="disabled", text="Examen Finalizado")
         self.boton_anterior.config(state="disabled")
+        id_sesion = self.id_sesion
+        self.terminar_diario()
 
         # Limpiar area de pregunta/opciones (opcional)
         # for widget in self.frame_opciones.winfo_children(): widget.destroy()
@@ -234,12 +303,21 @@ class SimuladorExamenGUI:
 
         aciertos = 0
         resultados_validos = [] # Lista de (pregunta, respuesta_usr) para exportar
-        for resultado in self.resultados_examen:
-             if resultado: # Ignorar Nones si el examen se interrumpió
-                  pregunta_obj, respuesta_usr = resultado
-                  resultados_validos.append((pregunta_obj, respuesta_usr))
-                  if examen_runner.es_respuesta_correcta(pregunta_obj, respuesta_usr):
-                      aciertos += 1
+        detalle = [] # (pregunta, correcta, respuesta_usr) para el almacén de resultados
+        tiempos = [] # Segundos de cada respuesta válida, para exportar filas
+        with perfilado.tramo('gui.calificar', respondidas=num_respondidas):
+            for resultado, tiempo in zip(self.resultados_examen, self.tiempos_examen):
+                 if resultado: # Ignorar Nones si el examen se interrumpió
+                      pregunta_obj, respuesta_usr = resultado
+                      resultados_validos.append((pregunta_obj, respuesta_usr))
+                      tiempos.append(tiempo)
+                      correcta = examen_runner.es_respuesta_correcta(pregunta_obj, respuesta_usr)
+                      detalle.append((pregunta_obj, correcta, respuesta_usr))
+                      if correcta:
+                          aciertos += 1
+        almacen.guardar_desde_config(app_config.cargar_configuracion(), self.ruta_archivo, detalle, id_sesion=id_sesion,
+                                     interfaz='gui', modo=self.modo_sesion(), inicio=self.inicio_sesion,
+                                     total=len(self.preguntas_actuales))
 
         total_preguntas_evaluadas = len(resultados_validos)
         puntuacion = (aciertos / total_preguntas_evaluadas) * 100 if total_preguntas_evaluadas > 0 else 0
@@ -252,37 +330,63 @@ class SimuladorExamenGUI:
         resumen_texto += "¿Desea guardar los resultados detallados?"
 
         if messagebox.askyesno("Resultados Finales", resumen_texto):
-            self.exportar_resultados_gui(resultados_validos, aciertos, total_preguntas_evaluadas)
+            self.exportar_resultados_gui(resultados_validos, aciertos, total_preguntas_evaluadas,
+                                         [correcta for _, correcta, _ in detalle], tiempos, id_sesion)
 
 
-    def exportar_resultados_gui(self, resultados_export, aciertos, total):
+    @perfilado.medido('gui.exportar_resultados_gui')
+    def exportar_resultados_gui(self, resultados_export, aciertos, total, correctas=None, tiempos=None, id_sesion=None):
          """Pregunta formato y guarda resultados desde GUI."""
-         formato = simpledialog.askstring("Exportar Resultados", "Seleccione formato (txt, pdf, ambos):", initialvalue="txt")
+         formato = simpledialog.askstring("Exportar Resultados",
+                                          "Seleccione formato (txt, pdf, ambos; filas: una fila por respuesta, para análisis):",
+                                          initialvalue="txt")
          if not formato: return # Cancelado
 
          formato = formato.lower().strip()
+         if formato not in ["txt", "pdf", "ambos", "filas"]:
+              messagebox.showwarning("Formato Inválido", "Formato no reconocido. No se exportó nada.")
+              return
          timestamp = time.strftime("%Y%m%d_%H%M%S")
          base_name = os.path.splitext(os.path.basename(self.ruta_archivo))[0]
          ruta_base = os.path.dirname(self.ruta_archivo) # Guardar en el mismo dir
-
-         try:
-            exportado = False
-            if formato in ["txt", "ambos"]:
-                ruta_txt = os.path.join(ruta_base, f"resultados_{base_name}_{timestamp}.txt")
-                exportador.exportar_txt(resultados_export, aciertos, total, ruta_txt)
-                exportado = True
-            if formato in ["pdf", "ambos"]:
-                ruta_pdf = os.path.join(ruta_base, f"resultados_{base_name}_{timestamp}.pdf")
-                exportador.exportar_pdf(resultados_export, aciertos, total, ruta_pdf)
-                exportado = True
-
-            if exportado:
-                 messagebox.showinfo("Exportación Exitosa", f"Resultados guardados correctamente en:\n{ruta_base}")
-            else:
-                 messagebox.showwarning("Formato Inválido", "Formato no reconocido. No se exportó nada.")
-
-         except Exception as e:
-            messagebox.showerror("Error de Exportación", f"No se pudieron guardar los resultados:\n{e}")
+         config = app_config.cargar_configuracion()
+         pasos = len(resultados_export) * (2 if formato == "ambos" else 1) # Respuestas a escribir, para la barra
+
+         def exportar(progreso):
+              """Se ejecuta en el hilo de la tarea: no toca Tk. Si se cancela, borra lo que dejó a medias."""
+              escritos = []
+              hechas = 0
+              def avance(i, _n):
+                   progreso(hechas + i, pasos)
+              try:
+                   if formato in ["txt", "ambos"]:
+                        ruta_txt = os.path.join(ruta_base, f"resultados_{base_name}_{timestamp}.txt")
+                        escritos.append(ruta_txt)
+                        with open(ruta_txt, 'w', encoding='utf-8', buffering=exportador.TAM_BUFFER) as f:
+                             exportador.escribir_txt(f, resultados_export, aciertos, total, correctas, progreso=avance)
+                        hechas += len(resultados_export)
+                   if formato in ["pdf", "ambos"]:
+                        ruta_pdf = os.path.join(ruta_base, f"resultados_{base_name}_{timestamp}.pdf")
+                        pdf = exportador.documento_pdf(resultados_export, aciertos, total, correctas, progreso=avance)
+                        escritos.append(ruta_pdf)
+                        exportador.guardar_pdf(pdf, ruta_pdf)
+                   if formato == "filas": # Se añade a un archivo acumulado: nunca se borra
+                        sesion_export = exportador.ResultadoSesion(almacen.candidato_por_defecto(config), id_sesion or '',
+                                                                   resultados_export, aciertos, total, correctas, tiempos)
+                        ruta_filas, _ = exportador.exportar_respuestas([sesion_export], config.get('exportar_filas') or 'respuestas_%Y%m%d.csv')
+                        return os.path.abspath(ruta_filas)
+              except BaseException:
+                   for ruta in escritos:
+                        if os.path.exists(ruta):
+                             os.remove(ruta)
+                   raise
+              return ruta_base
+
+         self.iniciar_tarea(
+              "Exportando resultados...", exportar,
+              al_terminar=lambda ruta: messagebox.showinfo("Exportación Exitosa", f"Resultados guardados correctamente en:\n{ruta}"),
+              al_fallar=lambda e: messagebox.showerror("Error de Exportación", f"No se pudieron guardar los resultados:\n{e}"),
+              total=pasos)
 
 
     def cambiar_modo(self):
@@ -300,16 +404,21 @@ class SimuladorExamenGUI:
 
     def reiniciar_examen(self, randomize=False):
          """Limpia resultados y reinicia desde la primera pregunta."""
+         self.terminar_diario() # El examen anterior se abandona
          self.indice_actual = 0
          self.resultados_examen = []
-         self.preguntas_actuales = list(self.preguntas_originales) # Restaurar desde original
+         self.tiempos_examen = []
+         self.orden_actual = list(sesion_examen.elegir_orden(self.preguntas_originales)) # Restaurar desde original
          if randomize:
-              random.shuffle(self.preguntas_actuales)
+              random.shuffle(self.orden_actual)
+         self.preguntas_actuales = sesion_examen.PreguntasEnOrden(self.preguntas_originales, self.orden_actual)
+         self.iniciar_diario()
          self.boton_siguiente.config(state="normal") # Reactivar botón
          self.mostrar_pregunta_actual()
          print("Examen reiniciado.") # Log a consola
 
 
+    @perfilado.medido('gui.abrir_archivo')
     def abrir_archivo(self):
         """Abre un nuevo archivo de preguntas."""
         config = app_config.cargar_configuracion()
@@ -320,16 +429,98 @@ class SimuladorExamenGUI:
             filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
         )
         if nueva_ruta and os.path.exists(nueva_ruta):
-             # Cargar nuevas preguntas
-             nuevas_preguntas = parser.cargar_preguntas(nueva_ruta)
-             if nuevas_preguntas:
-                  self.ruta_archivo = nueva_ruta
-                  self.preguntas_originales = nuevas_preguntas
-                  app_config.guardar_configuracion({'ultima_ruta': nueva_ruta})
-                  self.root.title(f"Simulador de Examen - {os.path.basename(self.ruta_archivo)}")
-                  self.reiniciar_examen(randomize=False) # Reiniciar con el nuevo archivo
-             else:
-                  messagebox.showerror("Error al Cargar", f"No se pudieron cargar preguntas válidas desde:\n{nueva_ruta}")
+             # Cargar nuevas preguntas en segundo plano; el examen actual sigue hasta que terminen
+             registro = registro_parser.crear_desde_config(config)
+             def cargar(progreso): # Avance en KB leídos; cancelar detiene el parseo entre trozos
+                  return cache.cargar_desde_config(nueva_ruta, config, registro=registro,
+                                                   progreso=lambda leidos, total: progreso(leidos // 1024, total // 1024, 'KB'))
+             self.iniciar_tarea(f"Cargando {os.path.basename(nueva_ruta)}...", cargar,
+                                al_terminar=lambda nuevas_preguntas: self.usar_preguntas(nueva_ruta, nuevas_preguntas),
+                                al_fallar=lambda e: self.error_al_cargar(nueva_ruta, e))
+
+
+    @perfilado.medido('gui.abrir_directorio')
+    def abrir_directorio(self):
+        """Abre todos los archivos .txt de un directorio como un solo banco."""
+        config = app_config.cargar_configuracion()
+        initial_dir = os.path.dirname(config.get('ultima_ruta', '.'))
+        nuevo_dir = filedialog.askdirectory(title="Abrir Directorio de Preguntas", initialdir=initial_dir)
+        if nuevo_dir and os.path.isdir(nuevo_dir):
+             registro = registro_parser.crear_desde_config(config)
+             self.iniciar_tarea(f"Cargando {os.path.basename(nuevo_dir)}...",
+                                lambda progreso: coleccion.cargar_coleccion(nuevo_dir, config, registro=registro, progreso=progreso),
+                                al_terminar=lambda nuevas_preguntas: self.usar_preguntas(nuevo_dir, nuevas_preguntas),
+                                al_fallar=lambda e: self.error_al_cargar(nuevo_dir, e))
+
+
+    def usar_preguntas(self, nueva_ruta, nuevas_preguntas):
+        """Sustituye el banco actual por el recién cargado y reinicia el examen."""
+        if nuevas_preguntas:
+             self.ruta_archivo = nueva_ruta
+             self.preguntas_originales = nuevas_preguntas
+             app_config.guardar_configuracion({'ultima_ruta': nueva_ruta})
+             self.root.title(f"Simulador de Examen - {os.path.basename(self.ruta_archivo)}")
+             self.reiniciar_examen(randomize=False) # Reiniciar con el nuevo archivo
+        else:
+             messagebox.showerror("Error al Cargar", f"No se pudieron cargar preguntas válidas desde:\n{nueva_ruta}")
+
+
+    def error_al_cargar(self, ruta, error):
+        messagebox.showerror("Error al Cargar", f"No se pudieron cargar preguntas desde:\n{ruta}\n\n{error}")
+
+
+    def iniciar_tarea(self, descripcion, funcion, al_terminar, al_fallar=None, total=None):
+        """
+        Ejecuta funcion(progreso) en segundo plano (ver ui/tareas.py) mostrando la barra
+        de estado. Sin 'total' la barra es indeterminada hasta el primer aviso de progreso.
+        """
+        if self.tarea is not None:
+             messagebox.showwarning("Tarea en Curso", "Espere a que termine (o cancele) la tarea actual.")
+             return
+        self.descripcion_tarea = descripcion
+        self.estado_label.config(text=descripcion)
+        self.boton_cancelar.config(state="normal")
+        if total:
+             self.barra_progreso.config(mode="determinate", maximum=total, value=0)
+        else:
+             self.barra_progreso.config(mode="indeterminate")
+             self.barra_progreso.start(15)
+        self.frame_estado.pack(side="bottom", fill="x", padx=20, pady=(0, 10))
+
+        def terminar(resultado):
+             self.fin_tarea()
+             al_terminar(resultado)
+
+        def fallar(error):
+             self.fin_tarea()
+             print(f"Error en tarea '{descripcion}': {error}") # Log a consola
+             if al_fallar:
+                  al_fallar(error)
+
+        self.tarea = TareaFondo(self.root, funcion, terminar, fallar, al_progresar=self.progreso_tarea,
+                                al_cancelar=self.fin_tarea).iniciar()
+
+
+    def progreso_tarea(self, hechas, total, texto=''):
+        if str(self.barra_progreso.cget("mode")) != "determinate":
+             self.barra_progreso.stop()
+             self.barra_progreso.config(mode="determinate")
+        self.barra_progreso.config(maximum=max(total, 1), value=hechas)
+        self.estado_label.config(text=f"{self.descripcion_tarea} {hechas}/{total} {texto}".rstrip())
+
+
+    def cancelar_tarea(self):
+        """Pide cancelar la tarea; la barra desaparece cuando el trabajador lo confirma."""
+        if self.tarea is not None:
+             self.tarea.cancelar()
+             self.boton_cancelar.config(state="disabled")
+             self.estado_label.config(text=f"Cancelando: {self.descripcion_tarea}")
+
+
+    def fin_tarea(self):
+        self.barra_progreso.stop()
+        self.frame_estado.pack_forget()
+        self.tarea = None
 
 
     def callback_despues_de_popup(self):
@@ -353,7 +544,10 @@ class SimuladorExamenGUI:
 
 
 # --- Función de Arranque ---
-def iniciar_gui(ruta_archivo:str, preguntas: list):
+def iniciar_gui(ruta_archivo:str, preguntas: list, reanudar=None):
     root = tk.Tk()
-    app = SimuladorExamenGUI(root, preguntas, ruta_archivo)
-    root.mainloop()
\ No newline at end of file
+    app = SimuladorExamenGUI(root, preguntas, ruta_archivo, reanudar)
+    try:
+        root.mainloop()
+    finally:
+        app.diario.cerrar() # Si el examen quedó a medias, el diario permite reanudarlo
\ No newline at end of file
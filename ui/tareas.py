@@ -0,0 +1,97 @@
+# tareas.py
+# Trabajos largos (cargar bancos, exportar resultados) fuera del hilo de Tkinter.
+# El trabajador solo habla con la ventana a través de una cola; la ventana la
+# revisa con root.after, así que Tk nunca se toca desde otro hilo.
+
+import queue
+import threading
+import time
+
+INTERVALO_MS = 50 # Cada cuánto revisa la ventana la cola del trabajador
+MIN_AVISO_S = 0.05 # Como mucho un aviso de progreso por intervalo
+
+
+class TareaCancelada(BaseException):
+    """
+    La lanza el aviso de progreso cuando el usuario ha pedido cancelar. Como
+    asyncio.CancelledError, no deriva de Exception: los 'except Exception' del
+    trabajo (p. ej. el del parser) no la confunden con un error y la dejan pasar.
+    """
+
+
+class TareaFondo:
+    """
+    Ejecuta funcion(progreso) en un hilo. 'progreso(hechas, total, texto='')' la
+    llama la propia función para informar de su avance; lanza TareaCancelada si se
+    canceló. Los callbacks (al_progresar, al_terminar, al_fallar, al_cancelar) se
+    llaman siempre desde el hilo de Tk.
+    """
+
+    def __init__(self, root, funcion, al_terminar, al_fallar=None, al_progresar=None, al_cancelar=None,
+                 intervalo_ms=INTERVALO_MS):
+        self.root = root
+        self.funcion = funcion
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.al_progresar = al_progresar
+        self.al_cancelar = al_cancelar
+        self.intervalo_ms = intervalo_ms
+        self.cola = queue.Queue()
+        self.cancelada = threading.Event()
+        self.hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._ultimo_aviso = 0.0
+        self.activa = False
+
+    def iniciar(self):
+        self.activa = True
+        self.hilo.start()
+        self.root.after(self.intervalo_ms, self._revisar)
+        return self
+
+    def cancelar(self):
+        """Pide al trabajador que pare; el resultado que llegue después se descarta."""
+        self.cancelada.set()
+
+    def progreso(self, hechas, total, texto=''):
+        """Aviso del trabajador (se llama desde su hilo)."""
+        if self.cancelada.is_set():
+            raise TareaCancelada()
+        ahora = time.monotonic()
+        if hechas >= total or ahora - self._ultimo_aviso >= MIN_AVISO_S:
+            self._ultimo_aviso = ahora
+            self.cola.put(('progreso', (hechas, total, texto)))
+
+    def _ejecutar(self):
+        try:
+            self.cola.put(('fin', self.funcion(self.progreso)))
+        except TareaCancelada:
+            self.cola.put(('cancelada', None))
+        except Exception as e:
+            self.cola.put(('error', e))
+
+    def _revisar(self):
+        """Vacía la cola en el hilo de Tk y vuelve a programarse hasta que el trabajador acaba."""
+        ultimo_progreso = None
+        try:
+            while True:
+                tipo, valor = self.cola.get_nowait()
+                if tipo == 'progreso':
+                    ultimo_progreso = valor # Solo interesa el más reciente
+                else:
+                    self._acabar(tipo, valor)
+                    return
+        except queue.Empty:
+            pass
+        if ultimo_progreso is not None and self.al_progresar and not self.cancelada.is_set():
+            self.al_progresar(*ultimo_progreso)
+        self.root.after(self.intervalo_ms, self._revisar)
+
+    def _acabar(self, tipo, valor):
+        self.activa = False
+        if tipo == 'fin' and not self.cancelada.is_set():
+            self.al_terminar(valor)
+        elif tipo == 'error' and not self.cancelada.is_set():
+            if self.al_fallar:
+                self.al_fallar(valor)
+        elif self.al_cancelar:
+            self.al_cancelar()
@@ -11,3 +11,44 @@ def crear_titulo(parent, texto):
 
 def crear_checkbox(parent, texto, variable):
     return tk.Checkbutton(parent, text=texto, variable=variable, anchor="w", justify="left", wraplength=700)
+
+
+class GrupoOpciones:
+    """
+    Checkbuttons de las opciones de una pregunta que se reutilizan de una pregunta
+    a otra: se crean solo cuando hace falta uno más que los que ya hay (el máximo
+    de opciones visto) y al navegar solo cambian su texto, su marca y cuáles se ven.
+    """
+
+    def __init__(self, parent, **estilo):
+        self.parent = parent
+        self.estilo = estilo # Opciones de tk.Checkbutton comunes a todos
+        self.botones = []
+        self.variables = [] # BooleanVar de cada botón (las de los visibles son las de la pregunta actual)
+        self.textos = [] # Texto que muestra cada botón, para no reconfigurarlo si no cambia
+        self.visibles = 0
+
+    def mostrar(self, textos, marcadas=()):
+        """Muestra un botón por texto, marcados los de los índices 'marcadas'."""
+        while len(self.botones) < len(textos):
+            var = tk.BooleanVar()
+            self.botones.append(tk.Checkbutton(self.parent, variable=var, **self.estilo))
+            self.variables.append(var)
+            self.textos.append(None)
+
+        for i, texto in enumerate(textos):
+            if self.textos[i] != texto:
+                self.botones[i].config(text=texto)
+                self.textos[i] = texto
+            self.variables[i].set(i in marcadas)
+
+        # Los visibles son siempre los primeros: pack los añade al final, en orden
+        for boton in self.botones[self.visibles:len(textos)]:
+            boton.pack(fill="x", anchor="w")
+        for boton in self.botones[len(textos):self.visibles]:
+            boton.pack_forget()
+        self.visibles = len(textos)
+
+    def marcadas(self):
+        """Índices de los botones visibles que están marcados."""
+        return [i for i in range(self.visibles) if self.variables[i].get()]